@@ -0,0 +1,87 @@
+from collections import Counter
+
+from .graph import CompactGraph
+from .ordering import LEVELS, get_topological_order
+
+
+def trace_path(previous: list[int], end: int) -> list[int]:
+    path = []
+
+    while end >= 0:
+        path.append(end)
+        end = previous[end]
+
+    path.reverse()
+    return path
+
+
+def degree_counts(counts: Counter) -> dict[str, int]:
+    return {str(degree): count for degree, count in sorted(counts.items())}
+
+
+def graph_stats(graph: CompactGraph) -> dict:
+    """Shape of the graph from one sweep in topological order.
+
+    A node's level is the number of edges on the longest path ending at
+    it, so with unit node costs the critical path is the path to a node
+    of the highest level; ``previous`` remembers the predecessor each
+    level came from.
+    """
+    n_nodes = graph.n_nodes
+    offsets, targets = graph.offsets, graph.targets
+    levels = [0] * n_nodes
+    previous = [-1] * n_nodes
+
+    for v in get_topological_order(graph):
+        next_level = levels[v] + 1
+        for u in targets[offsets[v]:offsets[v + 1]]:
+            if levels[u] < next_level:
+                levels[u] = next_level
+                previous[u] = v
+
+    graph.derived.setdefault(LEVELS, levels)
+
+    in_degrees = [0] * n_nodes
+    for u in targets:
+        in_degrees[u] += 1
+    out_degrees = [offsets[v + 1] - offsets[v] for v in range(n_nodes)]
+    level_widths = [0] * (max(levels) + 1 if n_nodes else 0)
+    for level in levels:
+        level_widths[level] += 1
+
+    path = trace_path(previous, max(range(n_nodes), key=levels.__getitem__)) if n_nodes else []
+    names = graph.node_names
+
+    return {
+        "nodes": n_nodes,
+        "edges": graph.n_edges,
+        "sources": [names[v] for v in range(n_nodes) if not in_degrees[v]],
+        "sinks": [names[v] for v in range(n_nodes) if not out_degrees[v]],
+        "critical_path": {"length": len(path), "nodes": [names[v] for v in path]},
+        "level_widths": level_widths,
+        "in_degrees": degree_counts(Counter(in_degrees)),
+        "out_degrees": degree_counts(Counter(out_degrees)),
+    }
+
+
+def critical_path(graph: CompactGraph, costs: list[float]) -> tuple[float, list[int]]:
+    """Heaviest path when node ``v`` costs ``costs[v]``, and its weight."""
+    n_nodes = graph.n_nodes
+    offsets, targets = graph.offsets, graph.targets
+    # Weight of the heaviest path ending at each node, that node included.
+    finish = list(costs)
+    previous = [-1] * n_nodes
+
+    for v in get_topological_order(graph):
+        reached = finish[v]
+        for u in targets[offsets[v]:offsets[v + 1]]:
+            weight = reached + costs[u]
+            if finish[u] < weight:
+                finish[u] = weight
+                previous[u] = v
+
+    if not n_nodes:
+        return 0, []
+
+    end = max(range(n_nodes), key=finish.__getitem__)
+    return finish[end], trace_path(previous, end)
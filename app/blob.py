@@ -0,0 +1,76 @@
+import struct
+import sys
+import zlib
+from array import array
+
+from .graph import CompactGraph
+from .ordering import TOPOLOGICAL_ORDER, get_topological_order
+
+# Frame: magic, node count, edge count, then one zlib stream holding the
+# node names joined by "\n" (names are ASCII letters only), the CSR
+# offsets and targets and the topological order as little-endian int32.
+MAGIC = b"DAG1"
+HEADER = struct.Struct("<4sII")
+COMPRESSION_LEVEL = 1
+
+
+class BlobFormatError(ValueError):
+    pass
+
+
+def int32_bytes(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array("i", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def int32_array(data: memoryview) -> array:
+    values = array("i")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def encode_graph(graph: CompactGraph) -> bytes:
+    names = "\n".join(graph.node_names).encode("ascii")
+    order = array("i", get_topological_order(graph))
+
+    compressor = zlib.compressobj(COMPRESSION_LEVEL)
+    body = b"".join((
+        compressor.compress(struct.pack("<I", len(names))),
+        compressor.compress(names),
+        compressor.compress(int32_bytes(graph.offsets)),
+        compressor.compress(int32_bytes(graph.targets)),
+        compressor.compress(int32_bytes(order)),
+        compressor.flush(),
+    ))
+
+    return HEADER.pack(MAGIC, graph.n_nodes, graph.n_edges) + body
+
+
+def decode_graph(data: bytes, version: int) -> CompactGraph:
+    magic, n_nodes, n_edges = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise BlobFormatError("Unknown graph blob format")
+
+    payload = memoryview(zlib.decompress(memoryview(data)[HEADER.size:]))
+    names_length, = struct.unpack_from("<I", payload)
+    position = 4
+    names = bytes(payload[position:position + names_length]).decode("ascii").split("\n")
+    position += names_length
+
+    offsets = int32_array(payload[position:position + 4 * (n_nodes + 1)])
+    position += 4 * (n_nodes + 1)
+    targets = int32_array(payload[position:position + 4 * n_edges])
+    position += 4 * n_edges
+    order = int32_array(payload[position:position + 4 * n_nodes])
+
+    if len(names) != n_nodes or len(order) != n_nodes:
+        raise BlobFormatError("Truncated graph blob")
+
+    graph = CompactGraph.from_csr(names, offsets, targets, version)
+    graph.derived[TOPOLOGICAL_ORDER] = order.tolist()
+
+    return graph
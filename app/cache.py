@@ -0,0 +1,248 @@
+from collections import OrderedDict
+from functools import partial
+
+from .graph import CompactGraph
+from .settings import GRAPH_CACHE_MAX_BYTES, GRAPH_CACHE_MAX_ENTRIES, NAME_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES
+
+
+class GraphCache:
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bumped on every invalidation. A reader remembers it before querying
+        # the database and only publishes its result if nothing was
+        # invalidated in between, so a stale read can't outlive a delete.
+        self.epoch = 0
+        self._entries: OrderedDict[int, CompactGraph] = OrderedDict()
+        # The size each entry is accounted at. Structures derived from a
+        # cached graph grow it after the put, and are added as they appear.
+        self._sizes: dict[int, int] = {}
+
+    def __contains__(self, graph_id: int) -> bool:
+        return graph_id in self._entries
+
+    def peek(self, graph_id: int) -> CompactGraph | None:
+        return self._entries.get(graph_id)
+
+    def get(self, graph_id: int) -> CompactGraph | None:
+        graph = self._entries.get(graph_id)
+
+        if graph is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(graph_id)
+        self.hits += 1
+        return graph
+
+    def put(self, graph_id: int, graph: CompactGraph, epoch: int | None = None):
+        if epoch is not None and epoch != self.epoch:
+            return
+        if self.max_entries <= 0 or graph.nbytes > self.max_bytes:
+            return
+
+        self._discard(graph_id)
+        self._entries[graph_id] = graph
+        self._sizes[graph_id] = graph.nbytes
+        self.current_bytes += graph.nbytes
+        graph.derived.on_resize = partial(self._resized, graph_id)
+        self._evict()
+
+    def invalidate(self, graph_id: int):
+        self.epoch += 1
+        self._discard(graph_id)
+
+    def clear(self):
+        self.epoch += 1
+        for graph in self._entries.values():
+            graph.derived.on_resize = None
+        self._entries.clear()
+        self._sizes.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _resized(self, graph_id: int, delta: int):
+        if graph_id in self._sizes:
+            self._sizes[graph_id] += delta
+            self.current_bytes += delta
+            self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+            graph_id = next(iter(self._entries))
+            self._discard(graph_id)
+            self.evictions += 1
+
+    def _discard(self, graph_id: int):
+        graph = self._entries.pop(graph_id, None)
+        if graph is not None:
+            graph.derived.on_resize = None
+            self.current_bytes -= self._sizes.pop(graph_id)
+
+
+class CachedResponses:
+    __slots__ = ("version", "bodies", "nbytes")
+
+    def __init__(self, version: int):
+        self.version = version
+        self.bodies: dict[str, bytes] = {}
+        self.nbytes = 0
+
+
+class ResponseCache:
+    """Encoded response bodies per graph, valid for a single graph version."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[int, CachedResponses] = OrderedDict()
+
+    def get(self, graph_id: int, version: int, view: str) -> bytes | None:
+        entry = self._entries.get(graph_id)
+        body = None
+
+        if entry is not None and entry.version == version:
+            body = entry.bodies.get(view)
+
+        if body is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(graph_id)
+        self.hits += 1
+        return body
+
+    def put(self, graph_id: int, version: int, view: str, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+
+        entry = self._entries.get(graph_id)
+
+        if entry is None or entry.version != version:
+            self.invalidate(graph_id)
+            entry = self._entries[graph_id] = CachedResponses(version)
+        elif view in entry.bodies:
+            return
+
+        entry.bodies[view] = body
+        entry.nbytes += len(body)
+        self.current_bytes += len(body)
+        self._entries.move_to_end(graph_id)
+
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def invalidate(self, graph_id: int):
+        entry = self._entries.pop(graph_id, None)
+        if entry is not None:
+            self.current_bytes -= entry.nbytes
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class NameCache:
+    """Interned node names by id, and ids by name.
+
+    An interned name never changes and its id is never reused, so entries
+    are only ever evicted, never invalidated. Only ids of committed names
+    may be put here.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._names: OrderedDict[int, str] = OrderedDict()
+        self._ids: dict[str, int] = {}
+
+    def get_name(self, name_id: int) -> str | None:
+        name = self._names.get(name_id)
+
+        if name is None:
+            self.misses += 1
+            return None
+
+        self._names.move_to_end(name_id)
+        self.hits += 1
+        return name
+
+    def get_names(self, name_ids: set[int]) -> dict[int, str]:
+        """Names of the ids that are cached, in one pass for a whole read."""
+        entries = self._names
+        names = {name_id: entries[name_id] for name_id in name_ids if name_id in entries}
+
+        for name_id in names:
+            entries.move_to_end(name_id)
+        self.hits += len(names)
+        self.misses += len(name_ids) - len(names)
+        return names
+
+    def get_id(self, name: str) -> int | None:
+        name_id = self._ids.get(name)
+
+        if name_id is None:
+            self.misses += 1
+            return None
+
+        self._names.move_to_end(name_id)
+        self.hits += 1
+        return name_id
+
+    def put(self, name_id: int, name: str):
+        if self.max_entries <= 0 or name_id in self._names:
+            return
+
+        self._names[name_id] = name
+        self._ids[name] = name_id
+
+        while len(self._names) > self.max_entries:
+            _, evicted = self._names.popitem(last=False)
+            del self._ids[evicted]
+
+    def clear(self):
+        self._names.clear()
+        self._ids.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._names),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+graph_cache = GraphCache(GRAPH_CACHE_MAX_ENTRIES, GRAPH_CACHE_MAX_BYTES)
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_BYTES)
+name_cache = NameCache(NAME_CACHE_MAX_ENTRIES)
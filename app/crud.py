@@ -1,169 +1,1004 @@
+import asyncio
 import queue
+from array import array
+from typing import AsyncIterator
+from weakref import WeakValueDictionary
 from fastapi.exceptions import RequestValidationError
-from sqlalchemy import exists, select
+from sqlalchemy import ARRAY, and_, any_, bindparam, delete, exists, func, insert, literal, or_, select, union, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
 
 from fastapi import HTTPException
 
 from . import schemas
-from .models import Graph, Node, Edge
+from .analytics import critical_path
+from .blob import decode_graph, encode_graph
+from .cache import graph_cache, name_cache, response_cache
+from .db import LocalSession, engine
+from .executor import check_named_graph, check_wire_graph
+from .graph import CompactGraph
+from .metrics import span
+from .ordering import TOPOLOGICAL_ORDER, carry_over_ordering, extend_topological_order
+from .reachability import DESCENDANTS, SUBGRAPH_DIRECTIONS, induced_subgraph, is_reachable, neighbourhood, reachable_nodes
+from .serialization import GRAPH_VIEW, build_view, dump_json
+from .settings import (BATCH_MAX_GRAPHS, GRAPH_STORAGE, NODE_NAMES, REACHABILITY_MEMORY_MAX_EDGES, STREAM_FETCH_SIZE,
+                       STREAM_INSERT_CHUNK_SIZE)
+from .shared_cache import shared_cache
+from .streaming import ChunkWriter, encode_adjacency, encode_edge, encode_node, iter_ndjson
+from .validation import GraphBuilder, GraphValidationError, resolve_additions, topological_order, validate_graph_names
+from .wire import encode_graph_wire
+from .models import Graph, GraphBlob, Node, NodeName, Edge
+
+BLOB_STORAGE = "blob"
+INTERNED_NAMES = "interned"
+
+# One lock per graph that is being mutated right now; entries disappear
+# once no coroutine holds or waits on them.
+graph_locks: WeakValueDictionary[int, asyncio.Lock] = WeakValueDictionary()
+
+# Graphs whose edge count was found above REACHABILITY_MEMORY_MAX_EDGES,
+# oldest first. Counting a million edges takes longer than the CTE it
+# decides on, so it is done once per graph. A graph that has shrunk since
+# is still answered correctly, only by CTE.
+large_graphs: dict[int, None] = {}
+LARGE_GRAPHS_MAX = 4096
+
+
+def any_of(column, values: list, key: str):
+    # One array parameter on PostgreSQL however long the list is; other
+    # databases get an expanding IN.
+    if engine.dialect.name == "postgresql":
+        return column == any_(bindparam(key, values, type_=ARRAY(column.type)))
+    return column.in_(values)
+
+
+def node_name_in(names: list[str]):
+    # Nodes written with interned names are matched by the ids of those
+    # names. On PostgreSQL the ids are collected once into an array, so
+    # both halves of the OR stay index lookups.
+    name_ids = select(NodeName.id).where(any_of(NodeName.name, names, "interned_names"))
+    if engine.dialect.name == "postgresql":
+        interned = Node.name_id == any_(func.array(name_ids.scalar_subquery()))
+    else:
+        interned = Node.name_id.in_(name_ids)
+
+    return or_(any_of(Node.name, names, "names"), interned)
+
+
+async def db_intern_names(db: AsyncSession, names: list[str]) -> dict[str, int]:
+    """Ids of the names in node_names, inserting the ones that are new.
+
+    Ids of names inserted here aren't cached: nobody else sees them before
+    the commit, and nobody ever does after a rollback. They are cached
+    by the next write or read that finds them.
+    """
+    name_ids = {}
+    missed = set()
+
+    for name in names:
+        name_id = name_cache.get_id(name)
+        if name_id is None:
+            missed.add(name)
+        else:
+            name_ids[name] = name_id
+
+    if missed:
+        # Sorted, so writers sharing new names insert them in the same
+        # order and wait for each other instead of deadlocking.
+        upsert = pg_insert if engine.dialect.name == "postgresql" else sqlite_insert
+        result = await db.execute(
+            upsert(NodeName).on_conflict_do_nothing(index_elements=[NodeName.name]).returning(NodeName.id, NodeName.name),
+            [{"name": name} for name in sorted(missed)]
+        )
+        name_ids.update((name, name_id) for name_id, name in result.tuples())
+
+        existing = [name for name in missed if name not in name_ids]
+        if existing:
+            result = await db.execute(
+                select(NodeName.id, NodeName.name).where(any_of(NodeName.name, existing, "names")))
+            for name_id, name in result.tuples():
+                name_cache.put(name_id, name)
+                name_ids[name] = name_id
+
+    return name_ids
+
+
+async def db_node_rows(db: AsyncSession, graphs: list[tuple[int, list[str]]]) -> list[dict]:
+    """Rows of new nodes for the (graph id, node names) pairs, with the
+    names inline or interned depending on NODE_NAMES."""
+    if NODE_NAMES != INTERNED_NAMES:
+        return [{"name": name, "graph_id": graph_id} for graph_id, names in graphs for name in names]
+
+    name_ids = await db_intern_names(db, [name for _, names in graphs for name in names])
+    return [{"name_id": name_ids[name], "graph_id": graph_id} for graph_id, names in graphs for name in names]
+
+
+async def db_node_names(db: AsyncSession, rows: list[tuple[str | None, int | None]]) -> list[str]:
+    """Names of nodes read as (name, name_id) pairs, None for a missing
+    node of an outer join. Interned names are decoded through the name
+    cache; the ones it misses take one query."""
+    name_ids = {name_id for _, name_id in rows}
+    name_ids.discard(None)
+    if not name_ids:
+        return [name for name, _ in rows]
+
+    names = name_cache.get_names(name_ids)
+
+    missed = [name_id for name_id in name_ids if name_id not in names]
+    if missed:
+        result = await db.execute(select(NodeName.id, NodeName.name).where(any_of(NodeName.id, missed, "name_ids")))
+        for name_id, name in result.tuples():
+            name_cache.put(name_id, name)
+            names[name_id] = name
 
-def raise_validation_error(message: str, loc: list[str] = None):
+    return [name if name_id is None else names[name_id] for name, name_id in rows]
+
+
+async def db_name_pairs(db: AsyncSession, rows: list[tuple], first: int, second: int) -> list[tuple[str, str]]:
+    """Pairs of names from columns ``first`` and ``second`` of the rows,
+    each followed by its name_id column, as in rows of joined edges."""
+    if all(row[first + 1] is None and row[second + 1] is None for row in rows):
+        return [(row[first], row[second]) for row in rows]
+
+    names = await db_node_names(db, [(row[first], row[first + 1]) for row in rows] +
+                                [(row[second], row[second + 1]) for row in rows])
+    return list(zip(names, names[len(rows):]))
+
+
+def validation_error(message: str, loc: list[str] = None, ctx: dict = None) -> dict:
     if loc is None:
         loc = []
 
-    errors = [
-        {
-            "loc": loc,
-            "msg": message,
-            "type": "value_error"
-        }
-    ]
+    error = {
+        "loc": loc,
+        "msg": message,
+        "type": "value_error"
+    }
+    if ctx is not None:
+        error["ctx"] = ctx
+
+    return error
+
+
+def raise_validation_error(message: str, loc: list[str] = None, ctx: dict = None):
+    errors = [validation_error(message, loc, ctx)]
     raise RequestValidationError(
         errors=errors
     )
 
 async def db_create_graph(db: AsyncSession, graph: schemas.GraphCreate) -> schemas.GraphCreateResponse:
-    adj_list = dict()
-    nodes_status = dict()
+    try:
+        compact_graph = await check_named_graph(
+            [node.name for node in graph.nodes],
+            [(edge.source, edge.target) for edge in graph.edges]
+        )
+    except GraphValidationError as e:
+        raise_validation_error(e.message, e.loc, e.ctx)
 
-    for node in graph.nodes:
-        adj_list[node.name] = []
-        nodes_status[node.name] = 0
+    return await db_save_new_graph(db, compact_graph)
 
-    for edge in graph.edges:
-        if edge.source not in adj_list:
-            raise_validation_error(f"Node {edge.source} not found in the graph", ["body", "edges", "source"])
-        if edge.target not in adj_list:
-            raise_validation_error(f"Node {edge.target} not found in the graph", ["body", "edges", "target"])
-        adj_list[edge.source].append(edge.target)
 
-    for node in graph.nodes:
-        node_name = node.name
+async def db_create_graph_wire(db: AsyncSession, body: bytes, wire_format: str) -> schemas.GraphCreateResponse:
+    # Compact bodies are decoded straight into index arrays, without a
+    # Pydantic object per node and edge.
+    try:
+        compact_graph = await check_wire_graph(body, wire_format)
+    except GraphValidationError as e:
+        raise_validation_error(e.message, e.loc, e.ctx)
+
+    return await db_save_new_graph(db, compact_graph)
+
 
-        if nodes_status[node_name] == 0:
-            dfs_stack = []
+async def db_save_new_graph(db: AsyncSession, compact_graph: CompactGraph) -> schemas.GraphCreateResponse:
+    graph_id = await db_insert_graph_rows(db, compact_graph)
+
+    if GRAPH_STORAGE == BLOB_STORAGE:
+        await db_save_blob(db, graph_id, compact_graph)
+
+    await db.commit()
 
-            dfs_stack.append(node_name)
+    graph_cache.put(graph_id, compact_graph)
 
-            while (len(dfs_stack) > 0):
-                v = dfs_stack[-1]
+    return schemas.GraphCreateResponse(id=graph_id)
 
-                if nodes_status[v] != 0:
-                    nodes_status[v] = 1
-                    dfs_stack.pop()
-                    continue
-                else:
-                    nodes_status[v] = 2
 
-                for v_neighbour in adj_list[v]:
-                    if nodes_status[v_neighbour] == 2:
-                        # raise HTTPException(422, "Graph is not DAG")
-                        raise_validation_error("Graph is not DAG", ["body", "edges"])
-                    elif nodes_status[v_neighbour] == 0:
-                        dfs_stack.append(v_neighbour)
+async def db_create_graphs(db: AsyncSession, graphs: list[schemas.GraphBatchItem]) -> schemas.GraphBatchCreateResponse:
+    # Graphs that fail validation are reported in their place in the
+    # results; the others are all written in one transaction.
+    async def check(i: int, graph: schemas.GraphBatchItem) -> CompactGraph | dict:
+        try:
+            node_names = [node.name for node in graph.nodes]
+            edges = [(edge.source, edge.target) for edge in graph.edges]
+            validate_graph_names(node_names, edges)
+            return await check_named_graph(node_names, edges)
+        except GraphValidationError as e:
+            return validation_error(e.message, ["body", "graphs", str(i)] + e.loc[1:], e.ctx)
 
-    graph_db = Graph()
-    db.add(graph_db)
+    # Graphs large enough for the validation pool are checked side by side.
+    checked = await asyncio.gather(*(check(i, graph) for i, graph in enumerate(graphs)))
+    valid = [graph for graph in checked if isinstance(graph, CompactGraph)]
+    graph_ids = iter([])
 
-    await db.flush()
+    if valid:
+        ids = await db_insert_graphs_rows(db, valid)
 
-    nodes_entity = dict()
+        if GRAPH_STORAGE == BLOB_STORAGE:
+            await db.execute(insert(GraphBlob), [
+                {"graph_id": graph_id, "version": graph.version, "data": encode_graph(graph)}
+                for graph_id, graph in zip(ids, valid)
+            ])
 
-    for node in graph.nodes:
-        node_db = Node(
-            name=node.name,
-            graph_id=graph_db.id
+        await db.commit()
+
+        for graph_id, graph in zip(ids, valid):
+            graph_cache.put(graph_id, graph)
+        graph_ids = iter(ids)
+
+    return schemas.GraphBatchCreateResponse(results=[
+        schemas.GraphBatchResult(id=next(graph_ids)) if isinstance(graph, CompactGraph)
+        else schemas.GraphBatchResult(detail=[graph])
+        for graph in checked
+    ])
+
+
+async def db_insert_graphs_rows(db: AsyncSession, graphs: list[CompactGraph]) -> list[int]:
+    # One INSERT per table for the whole batch. RETURNING rows come back
+    # in parameter order, so node ids map back to (graph, index) by
+    # position.
+    result = await db.execute(insert(Graph).returning(Graph.id, sort_by_parameter_order=True),
+                              [{"version": graph.version} for graph in graphs])
+    graph_ids = result.scalars().all()
+    n_edges = sum(graph.n_edges for graph in graphs)
+
+    with span("insert-nodes", n_edges):
+        result = await db.execute(
+            insert(Node).returning(Node.id, sort_by_parameter_order=True),
+            await db_node_rows(db, [(graph_id, graph.node_names) for graph_id, graph in zip(graph_ids, graphs)])
         )
-        db.add(node_db)
-        nodes_entity[node.name] = node_db
+        node_ids = array("q", result.scalars())
 
-    await db.flush()
+    if n_edges:
+        with span("insert-edges", n_edges):
+            edge_rows = []
+            start = 0
 
-    try:
-        for edge in graph.edges:
-            edge_db = Edge(
-                source_id=nodes_entity[edge.source].id,
-                target_id=nodes_entity[edge.target].id,
-                graph_id=graph_db.id
+            for graph_id, graph in zip(graph_ids, graphs):
+                edge_rows.extend({
+                    "source_id": node_ids[start + source],
+                    "target_id": node_ids[start + target],
+                    "graph_id": graph_id
+                } for source, target in graph.edge_pairs())
+                start += graph.n_nodes
+
+            await db.execute(insert(Edge), edge_rows)
+
+    return graph_ids
+
+
+async def db_insert_graph_rows(db: AsyncSession, graph: CompactGraph) -> int:
+    # One INSERT per table: node ids come back through RETURNING in
+    # parameter order, so edges can be resolved without building ORM
+    # objects.
+    result = await db.execute(insert(Graph).values().returning(Graph.id))
+    graph_id = result.scalar_one()
+
+    with span("insert-nodes", graph.n_edges):
+        result = await db.execute(
+            insert(Node).returning(Node.id, sort_by_parameter_order=True),
+            await db_node_rows(db, [(graph_id, graph.node_names)])
+        )
+        node_ids = array("q", result.scalars())
+
+    if graph.n_edges:
+        with span("insert-edges", graph.n_edges):
+            await db.execute(
+                insert(Edge),
+                [{
+                    "source_id": node_ids[source],
+                    "target_id": node_ids[target],
+                    "graph_id": graph_id
+                } for source, target in graph.edge_pairs()]
             )
-            db.add(edge_db)
 
-        await db.commit()
-    except IntegrityError:
+    return graph_id
+
+
+async def db_create_graph_stream(db: AsyncSession, chunks: AsyncIterator[bytes]) -> schemas.GraphCreateResponse:
+    # Nodes are written in chunks while the body is still arriving. Edges
+    # are kept as two int arrays and written once the whole graph has been
+    # validated, so nothing but the compact index outlives a chunk.
+    result = await db.execute(insert(Graph).values().returning(Graph.id))
+    graph_id = result.scalar_one()
+
+    builder = GraphBuilder()
+    node_ids = array("q")
+    pending_nodes = []
+
+    async def flush_nodes():
+        # An edge may mention a node before its own line, so builder
+        # indexes don't follow the order of node lines; ids are put at
+        # the index of their node.
+        with span("insert-nodes", len(builder.sources)):
+            result = await db.execute(
+                insert(Node).returning(Node.id, sort_by_parameter_order=True),
+                await db_node_rows(db, [(graph_id, pending_nodes)])
+            )
+            node_ids.frombytes(bytes(8 * (len(builder.node_names) - len(node_ids))))
+            node_index = builder.node_index
+            for name, node_id in zip(pending_nodes, result.scalars()):
+                node_ids[node_index[name]] = node_id
+        pending_nodes.clear()
+
+    try:
+        async for line_no, item in iter_ndjson(chunks):
+            loc = ["body", str(line_no)]
+
+            if "name" in item:
+                builder.add_node(item["name"], loc)
+                pending_nodes.append(item["name"])
+                if len(pending_nodes) >= STREAM_INSERT_CHUNK_SIZE:
+                    await flush_nodes()
+            elif "source" in item and "target" in item:
+                builder.add_edge(item["source"], item["target"], loc)
+            else:
+                raise GraphValidationError("Line should describe a node or an edge", loc)
+
+        if pending_nodes:
+            await flush_nodes()
+
+        with span("validate", len(builder.sources)):
+            compact_graph = builder.build()
+        with span("cycle-check", compact_graph.n_edges):
+            compact_graph.derived[TOPOLOGICAL_ORDER] = topological_order(compact_graph)
+    except GraphValidationError as e:
         await db.rollback()
-        raise_validation_error("There are duplicate edges in the graph", ["body", "edges"])
+        raise_validation_error(e.message, e.loc, e.ctx)
+
+    edge_rows = []
+
+    with span("insert-edges", compact_graph.n_edges):
+        for source, target in compact_graph.edge_pairs():
+            edge_rows.append({"source_id": node_ids[source], "target_id": node_ids[target], "graph_id": graph_id})
+            if len(edge_rows) >= STREAM_INSERT_CHUNK_SIZE:
+                await db.execute(insert(Edge), edge_rows)
+                edge_rows.clear()
+
+        if edge_rows:
+            await db.execute(insert(Edge), edge_rows)
+
+    if GRAPH_STORAGE == BLOB_STORAGE:
+        await db_save_blob(db, graph_id, compact_graph)
+
+    await db.commit()
+
+    graph_cache.put(graph_id, compact_graph)
+
+    return schemas.GraphCreateResponse(id=graph_id)
+
+
+async def db_load_graph(db: AsyncSession, graph_id: int) -> CompactGraph:
+    graph = graph_cache.get(graph_id)
+
+    if graph is not None:
+        return graph
+
+    epoch = graph_cache.epoch
+
+    with span("fetch", 0) as fetch_span:
+        graph = await db_fetch_graph(db, graph_id)
+        fetch_span.n_edges = graph.n_edges
+
+    graph_cache.put(graph_id, graph, epoch)
+
+    return graph
+
+
+async def db_load_graphs(db: AsyncSession, graph_ids: list[int]) -> dict[int, CompactGraph]:
+    """Graphs with the given ids that exist, from the cache or read
+    together in a fixed number of queries."""
+    if len(graph_ids) > BATCH_MAX_GRAPHS:
+        raise_validation_error(f"At most {BATCH_MAX_GRAPHS} graphs can be read at once", ["query", "ids"])
+
+    graphs = {}
+    missed = []
+
+    for graph_id in graph_ids:
+        graph = graph_cache.get(graph_id)
+        if graph is None:
+            missed.append(graph_id)
+        else:
+            graphs[graph_id] = graph
+
+    if missed:
+        epoch = graph_cache.epoch
+
+        with span("fetch", 0) as fetch_span:
+            fetched = await db_read_graphs(db, missed)
+            fetch_span.n_edges = sum(graph.n_edges for graph in fetched.values())
 
-    return schemas.GraphCreateResponse(id=graph_db.id)
+        for graph_id, graph in fetched.items():
+            graph_cache.put(graph_id, graph, epoch)
+        graphs.update(fetched)
 
+    return graphs
 
-async def db_get_graph(db: AsyncSession, graph_id: int) -> schemas.GraphReadResponse:
-    query = select(Graph).options(
-        joinedload(Graph.nodes),
-        joinedload(Graph.edges).joinedload(Edge.source_node),
-        joinedload(Graph.edges).joinedload(Edge.target_node)
-    ).where(Graph.id == graph_id)
+
+async def db_read_graphs(db: AsyncSession, graph_ids: list[int]) -> dict[int, CompactGraph]:
+    # One query for versions (and blobs), then, for graphs that need their
+    # rows, one for the nodes and one for the edges of all of them.
+    query = select(Graph.id, Graph.version).where(Graph.id.in_(graph_ids))
+    if GRAPH_STORAGE == BLOB_STORAGE:
+        query = query.add_columns(GraphBlob.version, GraphBlob.data).outerjoin(GraphBlob, GraphBlob.graph_id == Graph.id)
 
     result = await db.execute(query)
-    graph_db = result.scalar()
+    graphs = {}
+    versions = {}
+
+    for row in result:
+        graph_id, version = row[0], row[1]
+        if GRAPH_STORAGE == BLOB_STORAGE and row[2] == version:
+            graphs[graph_id] = decode_graph(row[3], version)
+        else:
+            versions[graph_id] = version
+
+    if shared_cache.enabled:
+        for graph_id, version in list(versions.items()):
+            graph = await shared_cache.get_graph(graph_id, version)
+            if graph is not None:
+                graphs[graph_id] = graph
+                del versions[graph_id]
+
+    if versions:
+        result = await db.execute(
+            select(Node.graph_id, Node.id, Node.name, Node.name_id).where(Node.graph_id.in_(list(versions)))
+        )
+        node_rows = result.tuples().all()
+        node_names = {graph_id: [] for graph_id in versions}
+        node_index = {}
+
+        names = await db_node_names(db, [(name, name_id) for _, _, name, name_id in node_rows])
+        for (graph_id, node_id, _, _), name in zip(node_rows, names):
+            graph_names = node_names[graph_id]
+            node_index[node_id] = len(graph_names)
+            graph_names.append(name)
+
+        result = await db.execute(
+            select(Edge.graph_id, Edge.source_id, Edge.target_id).where(Edge.graph_id.in_(list(versions)))
+        )
+        sources = {graph_id: array("i") for graph_id in versions}
+        targets = {graph_id: array("i") for graph_id in versions}
+
+        for graph_id, source_id, target_id in result.tuples():
+            sources[graph_id].append(node_index[source_id])
+            targets[graph_id].append(node_index[target_id])
+
+        for graph_id, version in versions.items():
+            graph = graphs[graph_id] = CompactGraph(node_names[graph_id], sources[graph_id], targets[graph_id], version)
+            if shared_cache.enabled:
+                await shared_cache.put_graph(graph_id, graph)
+
+    return graphs
 
-    if graph_db is None:
+
+async def get_encoded_graphs(db: AsyncSession, graph_ids: list[int]) -> bytes:
+    # Each graph goes in as its cached GET /api/graph/{id} body.
+    graphs = await db_load_graphs(db, graph_ids)
+    bodies = [await get_encoded_view(graph_id, graphs[graph_id], GRAPH_VIEW) for graph_id in graph_ids if graph_id in graphs]
+    missing = [graph_id for graph_id in graph_ids if graph_id not in graphs]
+
+    return b'{"graphs":[' + b",".join(bodies) + b'],"missing":' + dump_json(missing) + b"}"
+
+
+async def db_fetch_graph(db: AsyncSession, graph_id: int) -> CompactGraph:
+    if not shared_cache.enabled:
+        return await db_read_graph(db, graph_id)
+
+    # Shared entries are keyed by version, so when another worker has
+    # already loaded this version only the version is read here.
+    result = await db.execute(select(Graph.version).where(Graph.id == graph_id))
+    version = result.scalar()
+
+    if version is None:
         raise HTTPException(404, "Graph entity not found")
 
-    return schemas.GraphReadResponse(
-        id=graph_id,
-        nodes=[schemas.Node(name=node.name) for node in graph_db.nodes],
-        edges=[schemas.Edge(
-            source=edge.source_node.name,
-            target=edge.target_node.name
-        ) for edge in graph_db.edges]
-    )
+    graph = await shared_cache.get_graph(graph_id, version)
 
+    if graph is None:
+        graph = await db_read_graph(db, graph_id)
+        await shared_cache.put_graph(graph_id, graph)
 
-async def db_get_adj_list(db: AsyncSession, graph_id: int, transpose: bool = False) -> schemas.AdjacencyListResponse:
-    regular_graph = await db_get_graph(db, graph_id)
+    return graph
 
-    adj_list = dict()
 
-    for node in regular_graph.nodes:
-        adj_list[node.name] = []
+async def db_read_graph(db: AsyncSession, graph_id: int) -> CompactGraph:
+    if GRAPH_STORAGE == BLOB_STORAGE:
+        result = await db.execute(
+            select(Graph.version, GraphBlob.version, GraphBlob.data).outerjoin(
+                GraphBlob, GraphBlob.graph_id == Graph.id
+            ).where(Graph.id == graph_id)
+        )
+        row = result.first()
 
-    for edge in regular_graph.edges:
-        if not transpose:
-            adj_list[edge.source].append(edge.target)
+        if row is None:
+            raise HTTPException(404, "Graph entity not found")
+
+        # A blob is missing or behind when the graph was written while the
+        # service ran in rows mode.
+        version, blob_version, data = row
+        if blob_version == version:
+            graph = decode_graph(data, version)
         else:
-            adj_list[edge.target].append(edge.source)
+            graph = await db_read_graph_rows(db, graph_id, version)
+    else:
+        result = await db.execute(select(Graph.version).where(Graph.id == graph_id))
+        version = result.scalar()
+
+        if version is None:
+            raise HTTPException(404, "Graph entity not found")
 
-    return schemas.AdjacencyListResponse(
-        adjacency_list=adj_list
+        graph = await db_read_graph_rows(db, graph_id, version)
+
+    return graph
+
+
+async def db_read_graph_rows(db: AsyncSession, graph_id: int, version: int) -> CompactGraph:
+    # Two flat selects instead of joinedload: the nodes x edges row product
+    # is never built and no ORM entities are materialised.
+    result = await db.execute(select(Node.id, Node.name, Node.name_id).where(Node.graph_id == graph_id))
+    node_rows = result.tuples().all()
+
+    node_index = {node_id: i for i, (node_id, _, _) in enumerate(node_rows)}
+
+    result = await db.execute(select(Edge.source_id, Edge.target_id).where(Edge.graph_id == graph_id))
+    sources = array("i")
+    targets = array("i")
+
+    for source_id, target_id in result.tuples():
+        sources.append(node_index[source_id])
+        targets.append(node_index[target_id])
+
+    names = await db_node_names(db, [(name, name_id) for _, name, name_id in node_rows])
+    return CompactGraph(names, sources, targets, version)
+
+
+async def db_save_blob(db: AsyncSession, graph_id: int, graph: CompactGraph):
+    upsert = pg_insert if engine.dialect.name == "postgresql" else sqlite_insert
+    query = upsert(GraphBlob).values(graph_id=graph_id, version=graph.version, data=encode_graph(graph))
+    query = query.on_conflict_do_update(
+        index_elements=[GraphBlob.graph_id],
+        set_={"version": query.excluded.version, "data": query.excluded.data}
     )
+    await db.execute(query)
 
 
-async def db_delete_node(db: AsyncSession, graph_id: int, node_name: str):
-    query = select(Node).where(Node.graph_id == graph_id,
-                               Node.name == node_name)
+async def db_check_graph_exists(db: AsyncSession, graph_id: int):
+    result = await db.execute(select(Graph.id).where(Graph.id == graph_id))
+
+    if result.scalar() is None:
+        raise HTTPException(404, "Graph entity not found")
+
+
+async def db_stream_graph(graph_id: int, ndjson: bool) -> AsyncIterator[bytes]:
+    # Streaming outlives the request-scoped session, so the generator opens
+    # its own and reads through server-side cursors, one partition at a time.
+    async with LocalSession() as db:
+        if not ndjson:
+            yield f'{{"id":{graph_id},"nodes":['.encode()
+
+        query = select(Node.name, Node.name_id).where(Node.graph_id == graph_id).order_by(Node.id)
+        result = await db.stream(query.execution_options(yield_per=STREAM_FETCH_SIZE))
+        writer = ChunkWriter(ndjson)
+
+        async for rows in result.partitions():
+            yield writer.write([encode_node(name) for name in await db_node_names(db, rows)])
+
+        if not ndjson:
+            yield b'],"edges":['
+
+        source_node = aliased(Node)
+        target_node = aliased(Node)
+        query = select(source_node.name, source_node.name_id, target_node.name, target_node.name_id).select_from(
+            Edge
+        ).join(
+            source_node, Edge.source_id == source_node.id
+        ).join(
+            target_node, Edge.target_id == target_node.id
+        ).where(Edge.graph_id == graph_id)
+        result = await db.stream(query.execution_options(yield_per=STREAM_FETCH_SIZE))
+        writer = ChunkWriter(ndjson)
+
+        async for rows in result.partitions():
+            yield writer.write([encode_edge(source, target) for source, target in await db_name_pairs(db, rows, 0, 2)])
+
+        if not ndjson:
+            yield b"]}"
+
+
+async def db_stream_adj_list(graph_id: int, ndjson: bool, transpose: bool = False) -> AsyncIterator[bytes]:
+    # Rows come ordered by node, so each node's list is complete and can be
+    # written as soon as the next node shows up.
+    if not transpose:
+        node_column, neighbour_column = Edge.source_id, Edge.target_id
+    else:
+        node_column, neighbour_column = Edge.target_id, Edge.source_id
+
+    neighbour = aliased(Node)
+    query = select(Node.id, Node.name, Node.name_id, neighbour.name, neighbour.name_id).select_from(Node).outerjoin(
+        Edge, and_(Edge.graph_id == Node.graph_id, node_column == Node.id)
+    ).outerjoin(
+        neighbour, neighbour_column == neighbour.id
+    ).where(Node.graph_id == graph_id).order_by(Node.id)
+
+    async with LocalSession() as db:
+        if not ndjson:
+            yield b'{"adjacency_list":{'
+
+        result = await db.stream(query.execution_options(yield_per=STREAM_FETCH_SIZE))
+        writer = ChunkWriter(ndjson)
+        current_id = None
+        current_name = None
+        adjacent = []
+
+        async for rows in result.partitions():
+            items = []
+            names = await db_name_pairs(db, rows, 1, 3)
+            for (node_id, *_), (node_name, neighbour_name) in zip(rows, names):
+                if node_id != current_id:
+                    if current_id is not None:
+                        items.append(encode_adjacency(current_name, adjacent, ndjson))
+                    current_id, current_name, adjacent = node_id, node_name, []
+                if neighbour_name is not None:
+                    adjacent.append(neighbour_name)
+            yield writer.write(items)
+
+        if current_id is not None:
+            yield writer.write([encode_adjacency(current_name, adjacent, ndjson)])
+
+        if not ndjson:
+            yield b"}}"
+
+
+async def get_encoded_view(graph_id: int, graph: CompactGraph, view: str) -> bytes:
+    body = response_cache.get(graph_id, graph.version, view)
+
+    if body is None and shared_cache.enabled:
+        body = await shared_cache.get_body(graph_id, graph.version, view)
+        if body is not None:
+            response_cache.put(graph_id, graph.version, view, body)
+
+    if body is None:
+        with span("build-view", graph.n_edges):
+            content = build_view(graph_id, graph, view)
+        with span("serialize", graph.n_edges):
+            body = dump_json(content)
+        response_cache.put(graph_id, graph.version, view, body)
+        if shared_cache.enabled:
+            await shared_cache.put_body(graph_id, graph.version, view, body)
+
+    return body
+
+
+async def get_encoded_wire(graph_id: int, graph: CompactGraph, wire_format: str) -> bytes:
+    body = response_cache.get(graph_id, graph.version, wire_format)
+
+    if body is None and shared_cache.enabled:
+        body = await shared_cache.get_body(graph_id, graph.version, wire_format)
+        if body is not None:
+            response_cache.put(graph_id, graph.version, wire_format, body)
+
+    if body is None:
+        with span("serialize", graph.n_edges):
+            body = encode_graph_wire(graph_id, graph, wire_format)
+        response_cache.put(graph_id, graph.version, wire_format, body)
+        if shared_cache.enabled:
+            await shared_cache.put_body(graph_id, graph.version, wire_format, body)
+
+    return body
+
+
+async def db_get_reachability_graph(db: AsyncSession, graph_id: int) -> CompactGraph | None:
+    # Graphs too large to be worth loading are answered by recursive CTEs
+    # instead, unless they are already in the cache.
+    if graph_id not in graph_cache:
+        if graph_id in large_graphs:
+            return None
+
+        result = await db.execute(select(func.count()).where(Edge.graph_id == graph_id))
+        if result.scalar() > REACHABILITY_MEMORY_MAX_EDGES:
+            if len(large_graphs) >= LARGE_GRAPHS_MAX:
+                del large_graphs[next(iter(large_graphs))]
+            large_graphs[graph_id] = None
+            return None
+
+    return await db_load_graph(db, graph_id)
+
+
+async def db_get_node_id(db: AsyncSession, graph_id: int, node_name: str) -> int:
+    result = await db.execute(select(Node.id).where(Node.graph_id == graph_id, node_name_in([node_name])))
+    node_id = result.scalar()
+
+    if node_id is None:
+        raise HTTPException(404, "Graph entity not found")
+
+    return node_id
+
+
+def get_node_index(graph: CompactGraph, node_name: str) -> int:
+    index = graph.node_index.get(node_name)
+
+    if index is None:
+        raise HTTPException(404, "Graph entity not found")
+
+    return index
 
+
+def reachable_ids_cte(graph_id: int, node_id: int, direction: str, depth: int | None = None):
+    if direction == DESCENDANTS:
+        from_column, to_column = Edge.source_id, Edge.target_id
+    else:
+        from_column, to_column = Edge.target_id, Edge.source_id
+
+    name = f"reached_{direction}"
+
+    if depth is None:
+        # UNION (not UNION ALL) drops ids that were already reached, so
+        # every node is expanded once.
+        reached = select(literal(node_id).label("id")).cte(name, recursive=True)
+        reached = reached.union(
+            select(to_column).join(reached, from_column == reached.c.id).where(Edge.graph_id == graph_id)
+        )
+    else:
+        # With the distance in the row a node can be expanded once per
+        # distance, so at most depth + 1 times.
+        reached = select(literal(node_id).label("id"), literal(0).label("depth")).cte(name, recursive=True)
+        reached = reached.union(
+            select(to_column, reached.c.depth + 1).join(reached, from_column == reached.c.id).where(
+                Edge.graph_id == graph_id, reached.c.depth < depth
+            )
+        )
+
+    return reached
+
+
+async def db_get_related_nodes(db: AsyncSession, graph_id: int, node_name: str, direction: str) -> list[str]:
+    graph = await db_get_reachability_graph(db, graph_id)
+
+    if graph is not None:
+        nodes = reachable_nodes(graph, get_node_index(graph, node_name), direction)
+    else:
+        node_id = await db_get_node_id(db, graph_id, node_name)
+        reached = reachable_ids_cte(graph_id, node_id, direction)
+        query = select(Node.name, Node.name_id).join(reached, Node.id == reached.c.id).where(
+            Node.id != node_id).order_by(Node.id)
+        result = await db.execute(query)
+        nodes = await db_node_names(db, result.tuples().all())
+
+    return nodes
+
+
+async def db_get_subgraph(db: AsyncSession, graph_id: int, node_name: str, direction: str,
+                          depth: int | None) -> tuple[list[str], list[tuple[str, str]]]:
+    directions = SUBGRAPH_DIRECTIONS[direction]
+    graph = await db_get_reachability_graph(db, graph_id)
+
+    if graph is not None:
+        selected = neighbourhood(graph, get_node_index(graph, node_name), directions, depth)
+        return induced_subgraph(graph, selected)
+
+    node_id = await db_get_node_id(db, graph_id, node_name)
+    reached = [select(reachable_ids_cte(graph_id, node_id, direction, depth).c.id) for direction in directions]
+    reached = union(*reached) if len(reached) > 1 else reached[0]
+
+    result = await db.execute(select(Node.name, Node.name_id).where(Node.id.in_(reached)).order_by(Node.id))
+    nodes = await db_node_names(db, result.tuples().all())
+
+    source_node = aliased(Node)
+    target_node = aliased(Node)
+    query = select(source_node.name, source_node.name_id, target_node.name, target_node.name_id).select_from(Edge).join(
+        source_node, Edge.source_id == source_node.id
+    ).join(
+        target_node, Edge.target_id == target_node.id
+    ).where(Edge.graph_id == graph_id, Edge.source_id.in_(reached), Edge.target_id.in_(reached))
     result = await db.execute(query)
-    node_db = result.scalar()
 
-    if node_db is None:
+    return nodes, await db_name_pairs(db, result.tuples().all(), 0, 2)
+
+
+async def db_is_reachable(db: AsyncSession, graph_id: int, source: str, target: str) -> bool:
+    graph = await db_get_reachability_graph(db, graph_id)
+
+    if graph is not None:
+        return is_reachable(graph, get_node_index(graph, source), get_node_index(graph, target))
+
+    source_id = await db_get_node_id(db, graph_id, source)
+    target_id = await db_get_node_id(db, graph_id, target)
+    reached = reachable_ids_cte(graph_id, source_id, DESCENDANTS)
+    result = await db.execute(select(exists().where(reached.c.id == target_id)))
+    return result.scalar()
+
+
+async def db_get_critical_path(db: AsyncSession, graph_id: int, request: schemas.CriticalPathRequest) -> schemas.CriticalPath:
+    graph = await db_load_graph(db, graph_id)
+    node_index = graph.node_index
+    costs = [request.default_cost] * graph.n_nodes
+
+    for name, cost in request.costs.items():
+        index = node_index.get(name)
+        if index is None:
+            raise_validation_error(f"Node {name} not found in the graph", ["body", "costs", name])
+        costs[index] = cost
+
+    with span("critical-path", graph.n_edges):
+        length, path = critical_path(graph, costs)
+
+    return schemas.CriticalPath(length=length, nodes=[graph.node_names[v] for v in path])
+
+
+def without_named_nodes(graph: CompactGraph, removed_names: list[str], version: int) -> CompactGraph | None:
+    # The graph is patched in memory instead of being reloaded, and its
+    # topological order and levels are carried over incrementally.
+    removed = {graph.node_index.get(name) for name in removed_names}
+    if None in removed:
+        return None
+
+    new_graph, new_index = graph.without_nodes(removed, version)
+    carry_over_ordering(graph, new_graph, new_index, removed)
+
+    return new_graph
+
+
+async def publish_graph(graph_id: int, graph: CompactGraph | None):
+    graph_cache.invalidate(graph_id)
+    response_cache.invalidate(graph_id)
+
+    if graph is not None:
+        graph_cache.put(graph_id, graph)
+
+    # Other workers drop their copies; entries in the shared store are
+    # per version and stay valid.
+    if shared_cache.enabled:
+        await shared_cache.announce(graph_id)
+
+
+def graph_lock(graph_id: int) -> asyncio.Lock:
+    lock = graph_locks.get(graph_id)
+
+    if lock is None:
+        lock = graph_locks[graph_id] = asyncio.Lock()
+
+    return lock
+
+
+async def db_lock_graph(db: AsyncSession, graph_id: int) -> int:
+    # The row lock serialises mutators across processes; the asyncio lock
+    # taken around it keeps coroutines of this process from queueing on
+    # the database connection pool instead.
+    result = await db.execute(select(Graph.version).where(Graph.id == graph_id).with_for_update())
+    version = result.scalar()
+
+    if version is None:
         raise HTTPException(404, "Graph entity not found")
 
+    return version
+
+
+async def db_add_to_graph(db: AsyncSession, graph_id: int, node_names: list[str], edges: list[tuple[str, str]]):
+    async with graph_lock(graph_id):
+        version = await db_lock_graph(db, graph_id)
+
+        graph = await db_load_graph(db, graph_id)
+        if graph.version != version:
+            graph_cache.invalidate(graph_id)
+            graph = await db_load_graph(db, graph_id)
+
+        try:
+            with span("validate", graph.n_edges):
+                sources, targets = resolve_additions(graph, node_names, edges)
+                new_graph = graph.with_additions(node_names, sources, targets, version + 1)
+            with span("cycle-check", new_graph.n_edges):
+                new_graph.derived[TOPOLOGICAL_ORDER] = extend_topological_order(graph, new_graph, sources, targets)
+        except GraphValidationError as e:
+            await db.rollback()
+            raise_validation_error(e.message, e.loc, e.ctx)
+
+        node_ids = {}
+
+        if node_names:
+            with span("insert-nodes", new_graph.n_edges):
+                result = await db.execute(
+                    insert(Node).returning(Node.id, sort_by_parameter_order=True),
+                    await db_node_rows(db, [(graph_id, node_names)])
+                )
+                node_ids.update(zip(node_names, result.scalars()))
+
+        if edges:
+            with span("insert-edges", new_graph.n_edges):
+                old_names = list({name for edge in edges for name in edge if name not in node_ids})
+                if old_names:
+                    result = await db.execute(
+                        select(Node.id, Node.name, Node.name_id).where(
+                            Node.graph_id == graph_id,
+                            node_name_in(old_names)
+                        )
+                    )
+                    rows = result.tuples().all()
+                    names = await db_node_names(db, [(name, name_id) for _, name, name_id in rows])
+                    node_ids.update((name, node_id) for name, (node_id, _, _) in zip(names, rows))
+
+                await db.execute(
+                    insert(Edge),
+                    [{
+                        "source_id": node_ids[source],
+                        "target_id": node_ids[target],
+                        "graph_id": graph_id
+                    } for source, target in edges]
+                )
+
+        await db.execute(update(Graph).where(Graph.id == graph_id).values(version=version + 1))
+
+        if GRAPH_STORAGE == BLOB_STORAGE:
+            await db_save_blob(db, graph_id, new_graph)
+
+        await db.commit()
+
+        await publish_graph(graph_id, new_graph)
+
+    return None
 
-    await db.delete(node_db)
 
-    await db.flush()
+async def db_delete_nodes(db: AsyncSession, graph_id: int, node_names: list[str]):
+    async with graph_lock(graph_id):
+        version = await db_lock_graph(db, graph_id)
+        await db_delete_locked_nodes(db, graph_id, version, list(dict.fromkeys(node_names)))
+
+    return None
+
+
+async def db_delete_locked_nodes(db: AsyncSession, graph_id: int, version: int, node_names: list[str]):
+    # In blob mode the blob has to be rewritten, so the graph is needed even
+    # when it isn't cached.
+    graph = graph_cache.peek(graph_id)
+    if graph is not None and graph.version != version:
+        graph = None
+    if graph is None and GRAPH_STORAGE == BLOB_STORAGE:
+        graph = await db_load_graph(db, graph_id)
+
+    # A single set-based statement; the edges of the deleted nodes go with
+    # them through ON DELETE CASCADE.
+    result = await db.execute(
+        delete(Node).where(
+            Node.graph_id == graph_id, node_name_in(node_names)
+        ).returning(Node.id).execution_options(synchronize_session=False)
+    )
+
+    if len(result.all()) != len(node_names):
+        await db.rollback()
+        raise HTTPException(404, "Graph entity not found")
 
     query = select(exists().where(Node.graph_id == graph_id))
     result = await db.execute(query)
 
+    new_graph = None
+
     if not result.scalar():
-        query = select(Graph).where(Graph.id == graph_id)
-        result = await db.execute(query)
-        await db.delete(result.scalar())
+        await db.execute(delete(Graph).where(Graph.id == graph_id))
+    else:
+        result = await db.execute(
+            update(Graph).where(Graph.id == graph_id).values(version=Graph.version + 1).returning(Graph.version))
+        version = result.scalar_one()
+
+        if graph is not None:
+            new_graph = without_named_nodes(graph, node_names, version)
+
+        if new_graph is not None and GRAPH_STORAGE == BLOB_STORAGE:
+            await db_save_blob(db, graph_id, new_graph)
 
     await db.commit()
 
-    return None
+    await publish_graph(graph_id, new_graph)
+
+
+async def db_delete_node(db: AsyncSession, graph_id: int, node_name: str):
+    return await db_delete_nodes(db, graph_id, [node_name])
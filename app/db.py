@@ -1,10 +1,79 @@
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from .settings import DATABASE_URL
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .metrics import Counter, Gauge, Histogram, registry
+from .settings import (DATABASE_URL, DATABASE_ECHO, DATABASE_POOL_SIZE, DATABASE_MAX_OVERFLOW, DATABASE_POOL_TIMEOUT,
+                       DATABASE_POOL_PRE_PING, DATABASE_POOL_RECYCLE, DATABASE_STATEMENT_CACHE_SIZE,
+                       DATABASE_STATEMENT_TIMEOUT_MS)
+
+pool_wait_seconds = registry.register(Histogram(
+    "db_pool_wait_seconds", "Time spent getting a connection from the pool, including opening new ones."))
+pool_timeouts = registry.register(Counter(
+    "db_pool_timeouts_total", "Connection requests that gave up after the pool timeout."))
+
+
+class MeteredPool(AsyncAdaptedQueuePool):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_timeouts.inc()
+            raise
+        finally:
+            pool_wait_seconds.observe(time.perf_counter() - start)
+
+
+def connect_args() -> dict:
+    if make_url(DATABASE_URL).get_driver_name() != "asyncpg":
+        return {}
+
+    args = {
+        # asyncpg's own cache and the one SQLAlchemy keeps on top of it.
+        "statement_cache_size": DATABASE_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": DATABASE_STATEMENT_CACHE_SIZE,
+    }
+    if DATABASE_STATEMENT_TIMEOUT_MS:
+        args["server_settings"] = {"statement_timeout": str(DATABASE_STATEMENT_TIMEOUT_MS)}
+
+    return args
+
+
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=DATABASE_ECHO,
+    poolclass=MeteredPool,
+    pool_size=DATABASE_POOL_SIZE,
+    max_overflow=DATABASE_MAX_OVERFLOW,
+    pool_timeout=DATABASE_POOL_TIMEOUT,
+    pool_pre_ping=DATABASE_POOL_PRE_PING,
+    pool_recycle=DATABASE_POOL_RECYCLE,
+    connect_args=connect_args(),
+)
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def enable_foreign_keys(dbapi_connection, connection_record):
+        # SQLite ignores foreign keys, and with them ON DELETE CASCADE,
+        # unless asked per connection.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys = ON")
+        cursor.close()
 
-engine = create_async_engine(DATABASE_URL, echo=True)
 LocalSession = sessionmaker(
     bind=engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
+
+for name, help, read in (
+    ("db_pool_size", "Connections the pool keeps open.", lambda: engine.pool.size()),
+    ("db_pool_checked_out", "Connections currently in use.", lambda: engine.pool.checkedout()),
+    ("db_pool_checked_in", "Idle connections in the pool.", lambda: engine.pool.checkedin()),
+    ("db_pool_overflow", "Connections open beyond the pool size.", lambda: max(engine.pool.overflow(), 0)),
+):
+    registry.register(Gauge(name, help, read))
@@ -0,0 +1,136 @@
+"""Runs the CPU-bound checks of a new graph off the event loop.
+
+Resolving names, finding duplicates and the cycle check take seconds for
+a graph with a million edges, and every other request on the worker
+waits meanwhile. Graphs with at least VALIDATION_PROCESS_MIN_EDGES edges
+are therefore checked in a process pool; smaller ones inline, where a
+round trip to another process would cost more than the check itself.
+
+Graphs go to the pool and back as concatenated names with an array of
+their lengths, and int arrays, which pickle as flat buffers instead of
+millions of small objects. The lengths keep the framing independent of
+what the names contain, so a name that isn't valid reaches the checks
+unchanged and fails the same way as inline.
+"""
+import asyncio
+import multiprocessing
+from array import array
+from collections.abc import Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from .graph import CompactGraph
+from .metrics import span
+from .ordering import TOPOLOGICAL_ORDER
+from .settings import VALIDATION_PROCESS_MIN_EDGES, VALIDATION_PROCESSES
+from .validation import build_compact_graph, topological_order
+from .wire import COMPACT_JSON, INT32, MSGPACK, decode_graph_wire
+
+# The fewest bytes an edge takes in each wire format ("1,2," over the two
+# index lists of compact JSON, two fixints in msgpack), so body size
+# divided by it never underestimates the edge count.
+MIN_EDGE_BYTES = {COMPACT_JSON: 4, MSGPACK: 2, INT32: 8}
+
+pool: Executor | None = None
+
+
+def get_pool() -> Executor:
+    global pool
+
+    if pool is None:
+        # spawn: forking a process with a running event loop and open
+        # database connections is not safe.
+        pool = ProcessPoolExecutor(VALIDATION_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+
+    return pool
+
+
+def shutdown():
+    global pool
+
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+        pool = None
+
+
+def offloaded(n_edges: int) -> bool:
+    return VALIDATION_PROCESSES > 0 and n_edges >= VALIDATION_PROCESS_MIN_EDGES
+
+
+Names = tuple[str, array]
+
+
+def join_names(names: Iterable[str]) -> Names:
+    names = list(names)
+    return "".join(names), array("i", map(len, names))
+
+
+def split_names(names: Names) -> list[str]:
+    text, lengths = names
+    result = []
+    start = 0
+
+    for length in lengths:
+        result.append(text[start:start + length])
+        start += length
+
+    return result
+
+
+def pack(graph: CompactGraph) -> tuple[Names, array, array, array]:
+    order = array("i", topological_order(graph))
+    return join_names(graph.node_names), graph.offsets, graph.targets, order
+
+
+def unpack(result: tuple[Names, array, array, array]) -> CompactGraph:
+    names, offsets, targets, order = result
+    graph = CompactGraph.from_csr(split_names(names), offsets, targets)
+    graph.derived[TOPOLOGICAL_ORDER] = order.tolist()
+    return graph
+
+
+def named_graph_task(names: Names, sources: Names, targets: Names) -> tuple[Names, array, array, array]:
+    edges = zip(split_names(sources), split_names(targets))
+    return pack(build_compact_graph(split_names(names), edges))
+
+
+def wire_graph_task(body: bytes, wire_format: str) -> tuple[Names, array, array, array]:
+    return pack(decode_graph_wire(body, wire_format))
+
+
+async def run_in_pool(task, *args) -> CompactGraph:
+    result = await asyncio.get_running_loop().run_in_executor(get_pool(), task, *args)
+    return unpack(result)
+
+
+async def check_named_graph(node_names: list[str], edges: list[tuple[str, str]]) -> CompactGraph:
+    """Build a graph from names and check it, raising GraphValidationError."""
+    n_edges = len(edges)
+
+    if offloaded(n_edges):
+        with span("validate-process", n_edges):
+            return await run_in_pool(named_graph_task, join_names(node_names),
+                                     join_names(source for source, _ in edges),
+                                     join_names(target for _, target in edges))
+
+    with span("validate", n_edges):
+        graph = build_compact_graph(node_names, edges)
+    with span("cycle-check", n_edges):
+        graph.derived[TOPOLOGICAL_ORDER] = topological_order(graph)
+    return graph
+
+
+async def check_wire_graph(body: bytes, wire_format: str) -> CompactGraph:
+    n_edges = len(body) // MIN_EDGE_BYTES[wire_format]
+
+    if offloaded(n_edges):
+        with span("validate-process", n_edges) as validate_span:
+            graph = await run_in_pool(wire_graph_task, body, wire_format)
+            validate_span.n_edges = graph.n_edges
+            return graph
+
+    with span("validate", 0) as validate_span:
+        graph = decode_graph_wire(body, wire_format)
+        validate_span.n_edges = graph.n_edges
+    with span("cycle-check", graph.n_edges):
+        graph.derived[TOPOLOGICAL_ORDER] = topological_order(graph)
+    return graph
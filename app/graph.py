@@ -0,0 +1,255 @@
+import sys
+from array import array
+from itertools import groupby
+from operator import itemgetter
+
+
+def build_csr(n_nodes: int, keys: array, values: array) -> tuple[array, array]:
+    offsets = array("i", bytes(4 * (n_nodes + 1)))
+
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(n_nodes):
+        offsets[i + 1] += offsets[i]
+
+    result = array("i", bytes(4 * len(keys)))
+    position = offsets[:-1]
+
+    for key, value in zip(keys, values):
+        result[position[key]] = value
+        position[key] += 1
+
+    return offsets, result
+
+
+# Lists longer than this are sized from their largest item.
+EXACT_SIZE_MAX_ITEMS = 4096
+
+
+def value_nbytes(value) -> int:
+    # Lists of derived data hold ints, each a separate object. Bitsets
+    # (one per node, up to REACHABILITY_CLOSURE_MAX_NODES) differ in size
+    # and are summed; node indexes and levels are all about the size of
+    # the largest, which is much cheaper to find.
+    size = sys.getsizeof(value)
+    if isinstance(value, list) and value:
+        if len(value) <= EXACT_SIZE_MAX_ITEMS:
+            size += sum(map(sys.getsizeof, value))
+        else:
+            size += len(value) * sys.getsizeof(max(value))
+    return size
+
+
+class Derived(dict):
+    """Structures computed from a graph, with the memory they take counted
+    in ``nbytes``. ``on_resize`` is told about every change, so a cache
+    holding the graph can keep its accounting up to date."""
+
+    __slots__ = ("nbytes", "on_resize", "_sizes")
+
+    def __init__(self):
+        super().__init__()
+        self.nbytes = 0
+        self.on_resize = None
+        self._sizes = {}
+
+    def __setitem__(self, key, value):
+        size = value_nbytes(value)
+        super().__setitem__(key, value)
+        self._resize(size - self._sizes.get(key, 0))
+        self._sizes[key] = size
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._resize(-self._sizes.pop(key))
+
+    def setdefault(self, key, value=None):
+        if key not in self:
+            self[key] = value
+        return self[key]
+
+    def pop(self, key, *default):
+        if key not in self:
+            return super().pop(key, *default)
+        value = self[key]
+        del self[key]
+        return value
+
+    def clear(self):
+        super().clear()
+        self._sizes.clear()
+        self._resize(-self.nbytes)
+
+    def _resize(self, delta: int):
+        self.nbytes += delta
+        if delta and self.on_resize is not None:
+            self.on_resize(delta)
+
+
+class CompactGraph:
+    """Graph with node names interned to dense ints and edges kept as CSR.
+
+    Node ``i`` is ``node_names[i]``. Its successors are
+    ``targets[offsets[i]:offsets[i + 1]]`` and its predecessors are
+    ``reverse_sources[reverse_offsets[i]:reverse_offsets[i + 1]]``.
+    The reverse CSR is built on first use. ``derived`` holds structures
+    computed from the graph on demand (closures and the like), which live
+    and die with this version of the graph; ``nbytes`` counts them too.
+    """
+
+    __slots__ = ("node_names", "version", "offsets", "targets", "derived", "_nbytes", "_reverse", "_node_index")
+
+    def __init__(self, node_names: list[str], sources: array, targets: array, version: int = 1,
+                 node_index: dict[str, int] | None = None):
+        self._set_csr(node_names, *build_csr(len(node_names), sources, targets), version, node_index)
+
+    def _set_csr(self, node_names, offsets: array, targets: array, version: int, node_index: dict[str, int] | None):
+        self.node_names = tuple(node_names)
+        self.version = version
+        self.offsets, self.targets = offsets, targets
+        self.derived = Derived()
+        self._reverse = None
+        self._node_index = node_index
+        # Counts the reverse CSR up front so the size a cache accounted for
+        # doesn't change once it is built.
+        self._nbytes = (
+            sys.getsizeof(self.node_names)
+            + sum(sys.getsizeof(name) for name in self.node_names)
+            + 2 * 4 * (len(self.offsets) + len(self.targets))
+        )
+
+    @classmethod
+    def from_csr(cls, node_names, offsets: array, targets: array, version: int = 1,
+                 node_index: dict[str, int] | None = None) -> "CompactGraph":
+        graph = cls.__new__(cls)
+        graph._set_csr(node_names, offsets, targets, version, node_index)
+        return graph
+
+    @classmethod
+    def from_edges(cls, node_names: list[str], edges: list[tuple[str, str]], version: int = 1) -> "CompactGraph":
+        node_index = {name: i for i, name in enumerate(node_names)}
+        sources = array("i", [node_index[source] for source, _ in edges])
+        targets = array("i", [node_index[target] for _, target in edges])
+        return cls(node_names, sources, targets, version, node_index)
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes + self.derived.nbytes
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.node_names)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.targets)
+
+    @property
+    def reverse_offsets(self) -> array:
+        return self._reverse_csr()[0]
+
+    @property
+    def reverse_sources(self) -> array:
+        return self._reverse_csr()[1]
+
+    def _reverse_csr(self) -> tuple[array, array]:
+        if self._reverse is None:
+            self._reverse = build_csr(self.n_nodes, self.targets, self.edge_sources())
+        return self._reverse
+
+    @property
+    def node_index(self) -> dict[str, int]:
+        if self._node_index is None:
+            self._node_index = {name: i for i, name in enumerate(self.node_names)}
+        return self._node_index
+
+    def successors(self, v: int) -> array:
+        return self.targets[self.offsets[v]:self.offsets[v + 1]]
+
+    def predecessors(self, v: int) -> array:
+        offsets, sources = self._reverse_csr()
+        return sources[offsets[v]:offsets[v + 1]]
+
+    def edge_pairs(self):
+        offsets, targets = self.offsets, self.targets
+        for v in range(self.n_nodes):
+            for i in range(offsets[v], offsets[v + 1]):
+                yield v, targets[i]
+
+    def edge_sources(self) -> array:
+        offsets = self.offsets
+        return array("i", [v for v in range(self.n_nodes) for _ in range(offsets[v + 1] - offsets[v])])
+
+    def edges(self) -> list[tuple[str, str]]:
+        names = self.node_names
+        return [(names[s], names[t]) for s, t in self.edge_pairs()]
+
+    def adjacency_list(self, transpose: bool = False) -> dict[str, list[str]]:
+        names = self.node_names
+
+        if not transpose:
+            offsets, neighbours = self.offsets, self.targets
+        else:
+            offsets, neighbours = self._reverse_csr()
+
+        return {
+            names[v]: [names[u] for u in neighbours[offsets[v]:offsets[v + 1]]]
+            for v in range(len(names))
+        }
+
+    def without_nodes(self, removed: set[int], version: int) -> tuple["CompactGraph", list[int]]:
+        """Return the graph with ``removed`` nodes and their edges dropped,
+        plus the old-to-new index mapping (-1 for removed nodes)."""
+        new_index = []
+        node_names = []
+
+        for v, name in enumerate(self.node_names):
+            if v in removed:
+                new_index.append(-1)
+            else:
+                new_index.append(len(node_names))
+                node_names.append(name)
+
+        sources = array("i")
+        targets = array("i")
+
+        for source, target in self.edge_pairs():
+            if new_index[source] >= 0 and new_index[target] >= 0:
+                sources.append(new_index[source])
+                targets.append(new_index[target])
+
+        return CompactGraph(node_names, sources, targets, version), new_index
+
+    def with_additions(self, node_names: list[str], sources: array, targets: array,
+                       version: int) -> "CompactGraph":
+        """Return the graph with ``node_names`` appended (they get indices
+        from ``n_nodes`` on) and the ``sources[i] -> targets[i]`` edges added.
+
+        The new edges are merged into the existing CSR: runs of nodes that
+        gain no edges are copied as whole slices.
+        """
+        node_index = dict(self.node_index)
+        for name in node_names:
+            node_index[name] = len(node_index)
+
+        old_offsets = self.offsets + array("i", [self.n_edges]) * len(node_names)
+        old_targets = self.targets
+        offsets = array("i")
+        new_targets = array("i")
+        start = 0
+        shift = 0
+
+        for source, group in groupby(sorted(zip(sources, targets)), key=itemgetter(0)):
+            segment = old_offsets[start:source + 1]
+            offsets.extend([offset + shift for offset in segment] if shift else segment)
+            new_targets.extend(old_targets[old_offsets[start]:old_offsets[source + 1]])
+            added = [target for _, target in group]
+            new_targets.extend(added)
+            shift += len(added)
+            start = source + 1
+
+        segment = old_offsets[start:]
+        offsets.extend([offset + shift for offset in segment] if shift else segment)
+        new_targets.extend(old_targets[old_offsets[start]:])
+
+        return CompactGraph.from_csr(self.node_names + tuple(node_names), offsets, new_targets, version, node_index)
@@ -1,24 +1,37 @@
 from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
-from .routers import router
+from .routers import router, graphs_router, cache_router, metrics_router
 from contextlib import asynccontextmanager
 from .db import engine
-from .models import Base
+from . import executor
+from .metrics import MetricsMiddleware
+from .migrations import run_migrations
+from .settings import SHARED_CACHE_TTL, SHARED_CACHE_URL
+from .shared_cache import open_store, shared_cache
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await run_migrations(conn)
+
+    if SHARED_CACHE_URL:
+        await shared_cache.start(open_store(SHARED_CACHE_URL), SHARED_CACHE_TTL)
 
     yield
 
+    await shared_cache.stop()
+    executor.shutdown()
     await engine.dispose()
 
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 app.include_router(router)
+app.include_router(graphs_router)
+app.include_router(cache_router)
+app.include_router(metrics_router)
 
 
 
@@ -0,0 +1,171 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Only what the service needs: histograms and counters with fixed label
+names, and gauges read from a callback when metrics are scraped. On top
+of those, request latency per route and timings of named stages of the
+hot paths, labelled with the size of the graph involved.
+"""
+from bisect import bisect_left, bisect_right
+from time import perf_counter
+from typing import Callable
+
+from .settings import METRICS_ENABLED
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def format_labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                     for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self):
+        for label_values, value in self.values.items():
+            yield self.name, format_labels(self.labels, label_values), value
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, read: Callable[[], float]):
+        self.name = name
+        self.help = help
+        self.read = read
+
+    def samples(self):
+        yield self.name, "", self.read()
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # Per label set: one count per bucket plus +Inf, then the sum.
+        self.series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self):
+        for label_values, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else format_value(bound)
+                yield (f"{self.name}_bucket",
+                       format_labels(self.labels + ("le",), label_values + (le,)), cumulative)
+            yield f"{self.name}_count", format_labels(self.labels, label_values), cumulative
+            yield f"{self.name}_sum", format_labels(self.labels, label_values), series[-1]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# Checked on every observation, so instrumentation can be switched off at
+# runtime (the overhead benchmark does).
+enabled = METRICS_ENABLED
+
+request_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "Request latency until the last byte of the response is sent.",
+    labels=("method", "route", "status")))
+stage_seconds = registry.register(Histogram(
+    "dag_stage_duration_seconds", "Time spent in a stage of request processing.",
+    labels=("stage", "graph_size")))
+
+GRAPH_SIZE_BOUNDS = (1_000, 10_000, 100_000, 1_000_000)
+GRAPH_SIZE_LABELS = ("<1k", "<10k", "<100k", "<1M", ">=1M")
+
+
+def graph_size_label(n_edges: int) -> str:
+    return GRAPH_SIZE_LABELS[bisect_right(GRAPH_SIZE_BOUNDS, n_edges)]
+
+
+class span:
+    """Times a ``with`` block as ``stage`` of a graph with ``n_edges`` edges."""
+
+    __slots__ = ("stage", "n_edges", "start")
+
+    def __init__(self, stage: str, n_edges: int):
+        self.stage = stage
+        self.n_edges = n_edges
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if enabled:
+            stage_seconds.observe(perf_counter() - self.start, self.stage, graph_size_label(self.n_edges))
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware: no request objects are built and streamed
+    bodies pass through untouched."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not enabled:
+            return await self.app(scope, receive, send)
+
+        start = perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope.
+            route = scope.get("route")
+            request_seconds.observe(perf_counter() - start, scope["method"],
+                                    route.path if route is not None else "unmatched", status)
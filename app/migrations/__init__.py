@@ -0,0 +1,58 @@
+"""Schema migrations, applied in order when the application starts.
+
+Every ``vNNNN_<name>`` module of this package defines ``async def
+upgrade(conn)``. The numbers of applied migrations are kept in the
+``schema_version`` table, so each migration runs once per database.
+Databases other than PostgreSQL are created from the models instead.
+"""
+import importlib
+import pkgutil
+from types import ModuleType
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.models import Base
+
+# Key of the transaction-level advisory lock taken while migrating, so that
+# several workers starting at once don't run the same migration twice.
+MIGRATION_LOCK_KEY = 0x6461_6701
+
+
+async def create_schema(conn: AsyncConnection):
+    # The migrations are written for PostgreSQL. Other databases (SQLite
+    # for local benchmarks) get the current schema straight from the models.
+    await conn.run_sync(Base.metadata.create_all)
+
+
+def migrations() -> list[tuple[int, ModuleType]]:
+    found = []
+
+    for module in pkgutil.iter_modules(__path__):
+        if module.name.startswith("v") and module.name[1:5].isdigit():
+            found.append((int(module.name[1:5]), importlib.import_module(f"{__name__}.{module.name}")))
+
+    return sorted(found, key=lambda migration: migration[0])
+
+
+async def current_version(conn: AsyncConnection) -> int:
+    result = await conn.execute(text("SELECT max(version) FROM schema_version"))
+    return result.scalar() or 0
+
+
+async def run_migrations(conn: AsyncConnection):
+    if conn.dialect.name != "postgresql":
+        await create_schema(conn)
+        return
+
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    await conn.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY)"))
+
+    version = await current_version(conn)
+
+    for number, migration in migrations():
+        if number <= version:
+            continue
+
+        await migration.upgrade(conn)
+        await conn.execute(text("INSERT INTO schema_version (version) VALUES (:version)"), {"version": number})
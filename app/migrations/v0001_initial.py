@@ -0,0 +1,32 @@
+"""Tables as ``Base.metadata.create_all`` used to create them.
+
+Databases created before migrations existed already have these, hence
+``IF NOT EXISTS`` throughout.
+"""
+from sqlalchemy import text
+
+STATEMENTS = [
+    "CREATE TABLE IF NOT EXISTS graphs (id SERIAL PRIMARY KEY)",
+    "CREATE INDEX IF NOT EXISTS ix_graphs_id ON graphs (id)",
+    """CREATE TABLE IF NOT EXISTS nodes (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255),
+        graph_id INTEGER REFERENCES graphs (id),
+        UNIQUE (name, graph_id)
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_nodes_id ON nodes (id)",
+    "CREATE INDEX IF NOT EXISTS ix_nodes_name ON nodes (name)",
+    """CREATE TABLE IF NOT EXISTS edges (
+        id SERIAL PRIMARY KEY,
+        source_id INTEGER REFERENCES nodes (id),
+        target_id INTEGER REFERENCES nodes (id),
+        graph_id INTEGER REFERENCES graphs (id),
+        UNIQUE (graph_id, source_id, target_id)
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_edges_id ON edges (id)",
+]
+
+
+async def upgrade(conn):
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
@@ -0,0 +1,6 @@
+"""Version counter of a graph, bumped on every change."""
+from sqlalchemy import text
+
+
+async def upgrade(conn):
+    await conn.execute(text("ALTER TABLE graphs ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1"))
@@ -0,0 +1,69 @@
+"""Keys and indexes for lookups scoped to a graph.
+
+* The standalone indexes on ``id`` duplicate the primary keys and the one
+  on ``nodes.name`` is never used without ``graph_id``; all are dropped.
+* ``nodes`` is keyed by ``(graph_id, name)`` and ``(graph_id, id)``.
+* Edges reference ``nodes (graph_id, id)`` with ``ON DELETE CASCADE``, and
+  ``nodes`` references ``graphs`` the same way, so deleting a node or a
+  graph is a single statement. The cascades are served by the
+  ``(graph_id, source_id, target_id)`` and ``(graph_id, target_id)``
+  indexes on ``edges``.
+* With ``BIGINT_IDS`` set, ids become ``BIGINT``.
+"""
+from sqlalchemy import text
+
+from app.settings import BIGINT_IDS
+
+DROP_STATEMENTS = [
+    "DROP INDEX IF EXISTS ix_graphs_id",
+    "DROP INDEX IF EXISTS ix_nodes_id",
+    "DROP INDEX IF EXISTS ix_nodes_name",
+    "DROP INDEX IF EXISTS ix_edges_id",
+    """ALTER TABLE edges
+        DROP CONSTRAINT IF EXISTS edges_source_id_fkey,
+        DROP CONSTRAINT IF EXISTS edges_target_id_fkey,
+        DROP CONSTRAINT IF EXISTS edges_graph_id_fkey""",
+    """ALTER TABLE nodes
+        DROP CONSTRAINT IF EXISTS nodes_graph_id_fkey,
+        DROP CONSTRAINT IF EXISTS nodes_name_graph_id_key""",
+    """ALTER TABLE edges
+        RENAME CONSTRAINT edges_graph_id_source_id_target_id_key TO uq_edges_graph_id_source_id_target_id""",
+]
+
+BIGINT_STATEMENTS = [
+    "ALTER TABLE graphs ALTER COLUMN id TYPE BIGINT",
+    "ALTER SEQUENCE graphs_id_seq AS BIGINT",
+    "ALTER TABLE nodes ALTER COLUMN id TYPE BIGINT, ALTER COLUMN graph_id TYPE BIGINT",
+    "ALTER SEQUENCE nodes_id_seq AS BIGINT",
+    """ALTER TABLE edges
+        ALTER COLUMN id TYPE BIGINT,
+        ALTER COLUMN source_id TYPE BIGINT,
+        ALTER COLUMN target_id TYPE BIGINT,
+        ALTER COLUMN graph_id TYPE BIGINT""",
+    "ALTER SEQUENCE edges_id_seq AS BIGINT",
+]
+
+CREATE_STATEMENTS = [
+    """ALTER TABLE nodes
+        ALTER COLUMN name SET NOT NULL,
+        ALTER COLUMN graph_id SET NOT NULL,
+        ADD CONSTRAINT uq_nodes_graph_id_name UNIQUE (graph_id, name),
+        ADD CONSTRAINT uq_nodes_graph_id_id UNIQUE (graph_id, id),
+        ADD CONSTRAINT nodes_graph_id_fkey FOREIGN KEY (graph_id) REFERENCES graphs (id) ON DELETE CASCADE""",
+    "CREATE INDEX ix_edges_graph_id_target_id ON edges (graph_id, target_id)",
+    """ALTER TABLE edges
+        ALTER COLUMN source_id SET NOT NULL,
+        ALTER COLUMN target_id SET NOT NULL,
+        ALTER COLUMN graph_id SET NOT NULL,
+        ADD CONSTRAINT fk_edges_source FOREIGN KEY (graph_id, source_id)
+            REFERENCES nodes (graph_id, id) ON DELETE CASCADE,
+        ADD CONSTRAINT fk_edges_target FOREIGN KEY (graph_id, target_id)
+            REFERENCES nodes (graph_id, id) ON DELETE CASCADE""",
+]
+
+
+async def upgrade(conn):
+    statements = DROP_STATEMENTS + (BIGINT_STATEMENTS if BIGINT_IDS else []) + CREATE_STATEMENTS
+
+    for statement in statements:
+        await conn.execute(text(statement))
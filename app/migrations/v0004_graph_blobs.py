@@ -0,0 +1,18 @@
+"""One compressed blob per graph for the ``blob`` storage mode.
+
+The blob is compressed already, so TOAST is told not to try again.
+"""
+from sqlalchemy import text
+
+from app.settings import BIGINT_IDS
+
+
+async def upgrade(conn):
+    id_type = "BIGINT" if BIGINT_IDS else "INTEGER"
+
+    await conn.execute(text(f"""CREATE TABLE graph_blobs (
+        graph_id {id_type} PRIMARY KEY REFERENCES graphs (id) ON DELETE CASCADE,
+        version INTEGER NOT NULL,
+        data BYTEA NOT NULL
+    )"""))
+    await conn.execute(text("ALTER TABLE graph_blobs ALTER COLUMN data SET STORAGE EXTERNAL"))
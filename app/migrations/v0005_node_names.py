@@ -0,0 +1,29 @@
+"""Node names interned in a table shared by all graphs.
+
+``node_names`` maps every distinct name to an integer id. A node keeps
+either its ``name`` or a ``name_id``; which one is written depends on
+``NODE_NAMES``, so both columns are nullable and exactly one is set.
+The unique keys on ``(graph_id, name)`` and ``(graph_id, name_id)``
+become partial indexes, which rebuilds the first one.
+"""
+from sqlalchemy import text
+
+STATEMENTS = [
+    """CREATE TABLE node_names (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        CONSTRAINT uq_node_names_name UNIQUE (name)
+    )""",
+    """ALTER TABLE nodes
+        ALTER COLUMN name DROP NOT NULL,
+        ADD COLUMN name_id INTEGER CONSTRAINT fk_nodes_name_id REFERENCES node_names (id),
+        ADD CONSTRAINT ck_nodes_name CHECK ((name IS NULL) <> (name_id IS NULL)),
+        DROP CONSTRAINT uq_nodes_graph_id_name""",
+    "CREATE UNIQUE INDEX uq_nodes_graph_id_name ON nodes (graph_id, name) WHERE name IS NOT NULL",
+    "CREATE UNIQUE INDEX uq_nodes_graph_id_name_id ON nodes (graph_id, name_id) WHERE name_id IS NOT NULL",
+]
+
+
+async def upgrade(conn):
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
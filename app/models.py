@@ -1,52 +1,97 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint
+from sqlalchemy import (BigInteger, CheckConstraint, Column, Integer, LargeBinary, String, ForeignKey, ForeignKeyConstraint,
+                        Index, UniqueConstraint)
 from sqlalchemy.orm import relationship, declarative_base
 
+from .settings import BIGINT_IDS
+
 Base = declarative_base()
 
+IdType = BigInteger if BIGINT_IDS else Integer
+
+
+class NodeName(Base):
+    __tablename__ = 'node_names'
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('name', name='uq_node_names_name'),
+    )
+
 
 class Node(Base):
     __tablename__ = 'nodes'
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(255), index=True)
-    graph_id = Column(Integer, ForeignKey('graphs.id'))
+    id = Column(IdType, primary_key=True)
+    # Exactly one of the two is set: the name itself, or the id of the
+    # name in node_names when the node was written with interned names.
+    name = Column(String(255))
+    name_id = Column(Integer, ForeignKey('node_names.id', name='fk_nodes_name_id'))
+    graph_id = Column(IdType, ForeignKey('graphs.id', ondelete='CASCADE'), nullable=False)
 
+    # Every lookup is scoped to a graph, so graph_id leads every index.
+    # (graph_id, id) is the target of the edges' composite foreign keys.
+    # The name indexes are partial, so a node only takes space in the
+    # one it is looked up by.
     __table_args__ = (
-        UniqueConstraint('name', 'graph_id'),
+        CheckConstraint('(name IS NULL) <> (name_id IS NULL)', name='ck_nodes_name'),
+        Index('uq_nodes_graph_id_name', 'graph_id', 'name', unique=True,
+              postgresql_where=name.isnot(None), sqlite_where=name.isnot(None)),
+        Index('uq_nodes_graph_id_name_id', 'graph_id', 'name_id', unique=True,
+              postgresql_where=name_id.isnot(None), sqlite_where=name_id.isnot(None)),
+        UniqueConstraint('graph_id', 'id', name='uq_nodes_graph_id_id'),
     )
 
     edges_in = relationship(
-        "Edge", foreign_keys="Edge.target_id", back_populates="target_node", cascade="all, delete-orphan")
+        "Edge", primaryjoin="Node.id == foreign(Edge.target_id)", back_populates="target_node",
+        cascade="all, delete-orphan", passive_deletes=True)
     edges_out = relationship(
-        "Edge", foreign_keys="Edge.source_id", back_populates="source_node", cascade="all, delete-orphan")
+        "Edge", primaryjoin="Node.id == foreign(Edge.source_id)", back_populates="source_node",
+        cascade="all, delete-orphan", passive_deletes=True)
 
     graph = relationship("Graph", back_populates="nodes")
 
 
 class Edge(Base):
     __tablename__ = 'edges'
-    id = Column(Integer, primary_key=True, index=True)
-    source_id = Column(Integer, ForeignKey('nodes.id'))
-    target_id = Column(Integer, ForeignKey('nodes.id'))
+    id = Column(IdType, primary_key=True)
+    source_id = Column(IdType, nullable=False)
+    target_id = Column(IdType, nullable=False)
+
+    graph_id = Column(IdType, nullable=False)
 
-    graph_id = Column(Integer, ForeignKey('graphs.id'))
+    source_node = relationship("Node", primaryjoin="Node.id == foreign(Edge.source_id)",
+                               back_populates="edges_out")
+    target_node = relationship("Node", primaryjoin="Node.id == foreign(Edge.target_id)",
+                               back_populates="edges_in")
 
-    source_node = relationship("Node", foreign_keys=[
-                               source_id], back_populates="edges_out")
-    target_node = relationship("Node", foreign_keys=[
-                               target_id], back_populates="edges_in")
-    
+    # Edges reference nodes of their own graph through (graph_id, node id),
+    # so the cascade from a deleted node is served by the indexes below,
+    # and the graph itself is implied by those keys.
     __table_args__ = (
-        UniqueConstraint('graph_id', 'source_id', 'target_id'),
+        ForeignKeyConstraint(['graph_id', 'source_id'], ['nodes.graph_id', 'nodes.id'],
+                             name='fk_edges_source', ondelete='CASCADE'),
+        ForeignKeyConstraint(['graph_id', 'target_id'], ['nodes.graph_id', 'nodes.id'],
+                             name='fk_edges_target', ondelete='CASCADE'),
+        UniqueConstraint('graph_id', 'source_id', 'target_id', name='uq_edges_graph_id_source_id_target_id'),
+        Index('ix_edges_graph_id_target_id', 'graph_id', 'target_id'),
     )
 
-    graph = relationship("Graph", back_populates="edges")
+    graph = relationship("Graph", primaryjoin="Graph.id == foreign(Edge.graph_id)", back_populates="edges")
 
 
 class Graph(Base):
     __tablename__ = 'graphs'
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(IdType, primary_key=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     nodes = relationship("Node", back_populates="graph",
-                         cascade="all, delete-orphan")
-    edges = relationship("Edge", back_populates="graph",
-                         cascade="all, delete-orphan")
+                         cascade="all, delete-orphan", passive_deletes=True)
+    edges = relationship("Edge", primaryjoin="Graph.id == foreign(Edge.graph_id)", back_populates="graph",
+                         cascade="all, delete-orphan", passive_deletes=True)
+
+
+class GraphBlob(Base):
+    __tablename__ = 'graph_blobs'
+    graph_id = Column(IdType, ForeignKey('graphs.id', ondelete='CASCADE'), primary_key=True)
+    version = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
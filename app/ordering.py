@@ -0,0 +1,159 @@
+from array import array
+
+from .graph import CompactGraph
+from .validation import GraphValidationError, find_cycle, topological_order
+
+TOPOLOGICAL_ORDER = "topological_order"
+LEVELS = "levels"
+
+
+def get_topological_order(graph: CompactGraph) -> list[int]:
+    order = graph.derived.get(TOPOLOGICAL_ORDER)
+
+    if order is None:
+        order = graph.derived[TOPOLOGICAL_ORDER] = topological_order(graph)
+
+    return order
+
+
+def get_levels(graph: CompactGraph) -> list[int]:
+    # Level is the length of the longest path from any root, so a node's
+    # level is final once all of its predecessors have been seen.
+    levels = graph.derived.get(LEVELS)
+
+    if levels is None:
+        offsets, targets = graph.offsets, graph.targets
+        levels = [0] * graph.n_nodes
+
+        for v in get_topological_order(graph):
+            next_level = levels[v] + 1
+            for u in targets[offsets[v]:offsets[v + 1]]:
+                if levels[u] < next_level:
+                    levels[u] = next_level
+
+        graph.derived[LEVELS] = levels
+
+    return levels
+
+
+def carry_over_ordering(old: CompactGraph, new: CompactGraph, new_index: list[int], removed: set[int]):
+    """Derive the ordering of ``new`` (``old`` minus ``removed`` nodes)
+    from the one already computed for ``old``.
+
+    Dropping nodes from a topological order leaves a topological order.
+    Levels can only change for descendants of the removed nodes, so only
+    those are recomputed, in order, from their remaining predecessors.
+    """
+    order = old.derived.get(TOPOLOGICAL_ORDER)
+
+    if order is None:
+        return
+
+    new_order = [new_index[v] for v in order if new_index[v] >= 0]
+    new.derived[TOPOLOGICAL_ORDER] = new_order
+
+    levels = old.derived.get(LEVELS)
+
+    if levels is None:
+        return
+
+    affected = bytearray(new.n_nodes)
+    offsets, targets = old.offsets, old.targets
+    stack = list(removed)
+    seen = set(removed)
+
+    while stack:
+        v = stack.pop()
+        for u in targets[offsets[v]:offsets[v + 1]]:
+            if u not in seen:
+                seen.add(u)
+                stack.append(u)
+                affected[new_index[u]] = 1
+
+    new_levels = [levels[v] for v in range(old.n_nodes) if new_index[v] >= 0]
+    reverse_offsets, reverse_sources = new.reverse_offsets, new.reverse_sources
+
+    for v in new_order:
+        if affected[v]:
+            new_levels[v] = max((new_levels[u] + 1 for u in reverse_sources[reverse_offsets[v]:reverse_offsets[v + 1]]),
+                                default=0)
+
+    new.derived[LEVELS] = new_levels
+
+
+def extend_topological_order(old: CompactGraph, new: CompactGraph, sources: array, targets: array) -> list[int]:
+    """Derive the topological order of ``new`` (``old`` plus the
+    ``sources[i] -> targets[i]`` edges and possibly new nodes) from the
+    one computed for ``old``.
+
+    Only edges that point backwards in the old order need work. Each of
+    them spans a window of positions from its target to its source;
+    overlapping windows are merged. A cycle can't leave the window it
+    starts in, and nodes outside every window keep their places, so
+    Kahn's algorithm is run over each window alone. If the windows cover
+    most of the graph, the whole graph is sorted instead.
+    """
+    n_nodes = new.n_nodes
+    has_incoming = bytearray(n_nodes)
+    for target in targets:
+        has_incoming[target] = 1
+
+    # New nodes without incoming edges go first, so edges from them into
+    # the old graph already point forwards.
+    added = range(old.n_nodes, n_nodes)
+    order = [v for v in added if not has_incoming[v]]
+    order += get_topological_order(old)
+    order += [v for v in added if has_incoming[v]]
+
+    position = [0] * n_nodes
+    for i, v in enumerate(order):
+        position[v] = i
+
+    windows = []
+    for low, high in sorted((position[t], position[s]) for s, t in zip(sources, targets) if position[s] >= position[t]):
+        if windows and low <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], high)
+        else:
+            windows.append([low, high])
+
+    if sum(high - low + 1 for low, high in windows) > n_nodes // 3:
+        return topological_order(new)
+
+    for low, high in windows:
+        order[low:high + 1] = sort_window(new, order, position, low, high)
+
+    return order
+
+
+def sort_window(graph: CompactGraph, order: list[int], position: list[int], low: int, high: int) -> list[int]:
+    window = order[low:high + 1]
+    offsets, targets = graph.offsets, graph.targets
+
+    in_degree = [0] * len(window)
+    for v in window:
+        for u in targets[offsets[v]:offsets[v + 1]]:
+            p = position[u]
+            if low <= p <= high:
+                in_degree[p - low] += 1
+
+    reordered = [v for v in window if in_degree[position[v] - low] == 0]
+    append = reordered.append
+
+    for v in reordered:
+        for u in targets[offsets[v]:offsets[v + 1]]:
+            p = position[u]
+            if low <= p <= high:
+                degree = in_degree[p - low] - 1
+                in_degree[p - low] = degree
+                if degree == 0:
+                    append(u)
+
+    if len(reordered) < len(window):
+        left = [0] * graph.n_nodes
+        for v in window:
+            left[v] = in_degree[position[v] - low]
+        cycle = find_cycle(graph, left)
+        raise GraphValidationError("Graph is not DAG", ["body", "edges"],
+                                   {"cycle": [graph.node_names[v] for v in cycle]})
+
+    return reordered
@@ -0,0 +1,127 @@
+from .graph import CompactGraph
+from .settings import REACHABILITY_CLOSURE_MAX_NODES
+from .ordering import get_topological_order
+
+DESCENDANTS = "descendants"
+ANCESTORS = "ancestors"
+# Directions of GET /api/graph/{id}/node/{name}/subgraph.
+SUBGRAPH_DIRECTIONS = {"up": (ANCESTORS,), "down": (DESCENDANTS,), "both": (ANCESTORS, DESCENDANTS)}
+
+
+def closure(graph: CompactGraph, direction: str) -> list[int]:
+    # One bitset (a Python int) per node, filled in reverse topological
+    # order so every neighbour's set is final before it is merged.
+    key = f"closure_{direction}"
+    bitsets = graph.derived.get(key)
+
+    if bitsets is None:
+        if direction == DESCENDANTS:
+            order = reversed(get_topological_order(graph))
+            offsets, neighbours = graph.offsets, graph.targets
+        else:
+            order = get_topological_order(graph)
+            offsets, neighbours = graph.reverse_offsets, graph.reverse_sources
+
+        bitsets = [0] * graph.n_nodes
+
+        for v in order:
+            bits = 0
+            for u in neighbours[offsets[v]:offsets[v + 1]]:
+                bits |= bitsets[u] | (1 << u)
+            bitsets[v] = bits
+
+        graph.derived[key] = bitsets
+
+    return bitsets
+
+
+def search(graph: CompactGraph, start: int, direction: str, stop: int | None = None) -> bytearray:
+    if direction == DESCENDANTS:
+        offsets, neighbours = graph.offsets, graph.targets
+    else:
+        offsets, neighbours = graph.reverse_offsets, graph.reverse_sources
+
+    visited = bytearray(graph.n_nodes)
+    stack = [start]
+    visited[start] = 1
+
+    while stack:
+        v = stack.pop()
+        for u in neighbours[offsets[v]:offsets[v + 1]]:
+            if not visited[u]:
+                if u == stop:
+                    visited[u] = 1
+                    return visited
+                visited[u] = 1
+                stack.append(u)
+
+    return visited
+
+
+def use_closure(graph: CompactGraph) -> bool:
+    return graph.n_nodes <= REACHABILITY_CLOSURE_MAX_NODES
+
+
+def reachable_nodes(graph: CompactGraph, start: int, direction: str) -> list[str]:
+    names = graph.node_names
+
+    if use_closure(graph):
+        # Bit v of the set is character v of the reversed binary string.
+        bits = format(closure(graph, direction)[start], "b")[::-1]
+        return [names[v] for v, bit in enumerate(bits) if bit == "1"]
+
+    visited = search(graph, start, direction)
+    visited[start] = 0
+    return [names[v] for v in range(graph.n_nodes) if visited[v]]
+
+
+def is_reachable(graph: CompactGraph, source: int, target: int) -> bool:
+    if source == target:
+        return True
+
+    if use_closure(graph):
+        return bool(closure(graph, DESCENDANTS)[source] >> target & 1)
+
+    return bool(search(graph, source, DESCENDANTS, stop=target)[target])
+
+
+def neighbourhood(graph: CompactGraph, start: int, directions: tuple[str, ...], depth: int | None) -> bytearray:
+    """Mark the nodes within ``depth`` edges of ``start`` in each of the
+    ``directions`` (all reachable nodes if ``depth`` is None).
+
+    Ancestors and descendants of a node in a DAG are disjoint, so both
+    searches can share one visited array.
+    """
+    visited = bytearray(graph.n_nodes)
+    visited[start] = 1
+
+    for direction in directions:
+        if direction == DESCENDANTS:
+            offsets, neighbours = graph.offsets, graph.targets
+        else:
+            offsets, neighbours = graph.reverse_offsets, graph.reverse_sources
+
+        frontier = [start]
+        distance = 0
+
+        while frontier and (depth is None or distance < depth):
+            next_frontier = []
+            for v in frontier:
+                for u in neighbours[offsets[v]:offsets[v + 1]]:
+                    if not visited[u]:
+                        visited[u] = 1
+                        next_frontier.append(u)
+            frontier = next_frontier
+            distance += 1
+
+    return visited
+
+
+def induced_subgraph(graph: CompactGraph, selected: bytearray) -> tuple[list[str], list[tuple[str, str]]]:
+    names = graph.node_names
+    offsets, targets = graph.offsets, graph.targets
+    nodes = [v for v in range(graph.n_nodes) if selected[v]]
+
+    return [names[v] for v in nodes], [
+        (names[v], names[u]) for v in nodes for u in targets[offsets[v]:offsets[v + 1]] if selected[u]
+    ]
@@ -1,60 +1,347 @@
-from fastapi import APIRouter, status
-from .schemas import GraphReadResponse, GraphCreateResponse, AdjacencyListResponse, GraphCreate, ErrorResponse, HTTPValidationError
-from .crud import db_create_graph, db_get_graph, db_get_adj_list, db_delete_node
+from typing import Annotated, Literal
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.routing import APIRoute
+from . import wire
+from .schemas import GraphsCreate, GraphsReadResponse, GraphBatchCreateResponse, GraphColumns, GraphColumnsResponse, GraphReadResponse, GraphCreateResponse, AdjacencyListResponse, GraphCreate, ErrorResponse, HTTPValidationError, CacheStatsResponse, NodesResponse, ReachabilityResponse, TopologicalOrderResponse, LevelsResponse, GraphStatsResponse, CriticalPath, CriticalPathRequest, NodesCreate, EdgesCreate, NodesDelete
+from .crud import db_create_graph, db_create_graph_wire, get_encoded_wire, db_create_graph_stream, db_load_graph, get_encoded_view, db_add_to_graph, db_delete_node, db_delete_nodes, db_check_graph_exists, db_stream_graph, db_stream_adj_list, db_get_related_nodes, db_is_reachable, db_get_critical_path, db_get_subgraph, db_create_graphs, get_encoded_graphs
+from .db import LocalSession
 from .deps import Session
+from .cache import graph_cache, name_cache, response_cache
+from .metrics import registry
+from .reachability import ANCESTORS, DESCENDANTS
+from .shared_cache import shared_cache
+from .serialization import GRAPH_VIEW, ADJACENCY_VIEW, REVERSE_ADJACENCY_VIEW, TOPOLOGICAL_ORDER_VIEW, LEVELS_VIEW, STATS_VIEW, dump_json, graph_content, graph_etag, etag_matches
 router = APIRouter(prefix="/api/graph")
+graphs_router = APIRouter(prefix="/api/graphs")
+cache_router = APIRouter(prefix="/api/cache")
+metrics_router = APIRouter()
+
+StreamFormat = Literal["json", "ndjson"]
+
+SubgraphDirection = Literal["up", "down", "both"]
+
+Accept = Annotated[str | None, Header(description="Формат ответа: `application/json` (по умолчанию), `application/vnd.dag.compact+json`, `application/msgpack` или `application/vnd.dag.int32`.")]
+
+IfNoneMatch = Annotated[str | None, Header(description="ETag ранее полученного ответа. Если версия графа не изменилась, ответ будет 304 Not Modified.")]
+
+
+def stream_response(chunks, format: StreamFormat) -> StreamingResponse:
+    media_type = "application/x-ndjson" if format == "ndjson" else "application/json"
+    return StreamingResponse(chunks, media_type=media_type)
+
+
+def json_response(content) -> Response:
+    # Skips response model validation and jsonable_encoder; the route's
+    # response_model still documents the body.
+    return Response(content=dump_json(content), media_type="application/json")
+
+
+async def render_view(db: Session, graph_id: int, view: str, if_none_match: str | None,
+                      wire_format: str = wire.JSON) -> Response:
+    # A cached graph already knows its version, so a matching
+    # If-None-Match is answered without touching the database.
+    graph = await db_load_graph(db, graph_id)
+    etag = graph_etag(graph_id, graph.version, wire.ETAG_VARIANTS[wire_format])
+    headers = {"ETag": etag}
+    if view == GRAPH_VIEW:
+        headers["Vary"] = "Accept"
+
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if wire_format == wire.JSON:
+        body = await get_encoded_view(graph_id, graph, view)
+    else:
+        body = await get_encoded_wire(graph_id, graph, wire_format)
+
+    return Response(content=body, media_type=wire_format, headers=headers)
+
+
+class GraphBodyRoute(APIRoute):
+    """Route that also takes a graph in one of the compact wire formats.
+
+    Such bodies skip FastAPI's JSON parsing and the per-node and per-edge
+    Pydantic models and are decoded straight into index arrays; any other
+    body goes to the endpoint as usual.
+    """
+
+    def get_route_handler(self):
+        json_handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            wire_format = wire.body_format(request.headers.get("content-type"))
+            if wire_format is None:
+                return await json_handler(request)
+            if wire_format not in wire.available_formats():
+                raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                                    detail=f"{wire_format} is not supported")
+
+            body = await request.body()
+            async with LocalSession() as db:
+                result = await db_create_graph_wire(db, body, wire_format)
+
+            return Response(content=dump_json(result.model_dump()), media_type=wire.JSON,
+                            status_code=status.HTTP_201_CREATED)
+
+        return route_handler
+
+
+WIRE_REQUEST_BODIES = {
+    wire.COMPACT_JSON: {"schema": GraphColumns.model_json_schema()},
+    wire.MSGPACK: {"schema": GraphColumns.model_json_schema()},
+    wire.INT32: {"schema": {"type": "string", "format": "binary"}},
+}
+
+WIRE_RESPONSES = {
+    wire.COMPACT_JSON: {"schema": GraphColumnsResponse.model_json_schema()},
+    wire.MSGPACK: {"schema": GraphColumnsResponse.model_json_schema()},
+    wire.INT32: {"schema": {"type": "string", "format": "binary"}},
+}
 
 
-@router.post("/", status_code=status.HTTP_201_CREATED, 
-            description="Ручка для создания графа, принимает граф в виде списка вершин и списка ребер.",
-            responses={
-                201: {"model": GraphCreateResponse, "description": "Successfull response"}, # опечатка? 
-                400: {"model": ErrorResponse, "description": "Failed to add graph"},
-                422: {"model": HTTPValidationError, "description": "Validation Error"},
-            })
 async def create_graph(db: Session, new_graph: GraphCreate) -> GraphCreateResponse:
     result_graph_id = await db_create_graph(db, new_graph)
 
     return result_graph_id
 
 
-@router.get("/{graph_id}/", 
-            description="Ручка для чтения графа в виде списка вершин и списка ребер.",
+# Registered by hand: only add_api_route takes a route class per route.
+router.add_api_route("/", create_graph, methods=["POST"], status_code=status.HTTP_201_CREATED,
+                     route_class_override=GraphBodyRoute,
+                     description="Ручка для создания графа, принимает граф в виде списка вершин и списка ребер. "
+                                 "Граф также можно передать в компактном виде - таблица имен вершин и ребра как пары индексов "
+                                 "(`application/vnd.dag.compact+json`, `application/msgpack`, `application/vnd.dag.int32`).",
+                     openapi_extra={"requestBody": {"content": WIRE_REQUEST_BODIES}},
+                     responses={
+                         201: {"model": GraphCreateResponse, "description": "Successfull response"}, # опечатка? 
+                         400: {"model": ErrorResponse, "description": "Failed to add graph"},
+                         415: {"model": ErrorResponse, "description": "Unsupported body format"},
+                         422: {"model": HTTPValidationError, "description": "Validation Error"},
+                     })
+
+
+@router.post("/stream", status_code=status.HTTP_201_CREATED,
+             description="Ручка для потокового создания большого графа. Тело запроса - NDJSON: по одному JSON-объекту на строку, "
+                         "вершины в виде `{\"name\": \"a\"}`, ребра в виде `{\"source\": \"a\", \"target\": \"b\"}`. "
+                         "Строки проверяются по мере чтения, вершины записываются в БД пачками, проверка на ацикличность выполняется в конце.",
+             openapi_extra={"requestBody": {"required": True, "content": {"application/x-ndjson": {"schema": {"type": "string"}}}}},
+             responses={
+                 201: {"model": GraphCreateResponse, "description": "Successfull response"},
+                 422: {"model": HTTPValidationError, "description": "Validation Error"},
+             })
+async def create_graph_stream(db: Session, request: Request) -> GraphCreateResponse:
+    return await db_create_graph_stream(db, request.stream())
+
+
+@router.get("/{graph_id}/", response_model=GraphReadResponse,
+            description="Ручка для чтения графа в виде списка вершин и списка ребер. "
+                        "По заголовку `Accept` граф отдается и в компактном виде: таблица имен вершин и ребра как два столбца индексов.",
             responses={
-                200: {"model": GraphReadResponse, "description": "Successfull Response"},
+                200: {"model": GraphReadResponse, "description": "Successfull Response", "content": WIRE_RESPONSES},
+                304: {"description": "Graph not modified"},
                 404: {"model": ErrorResponse, "description": "Graph entity not found"},
                 422: {"model": HTTPValidationError, "description": "Validation Error"},
             })
-async def read_graph(db: Session, graph_id: int) -> GraphReadResponse:
-    result_graph = await db_get_graph(db, graph_id)
-
-    return result_graph
+async def read_graph(db: Session, graph_id: int, accept: Accept = None, if_none_match: IfNoneMatch = None) -> Response:
+    return await render_view(db, graph_id, GRAPH_VIEW, if_none_match, wire.negotiate(accept))
 
 
-@router.get("/{graph_id}/adjacency_list",
+@router.get("/{graph_id}/adjacency_list", response_model=AdjacencyListResponse,
             description="Ручка для чтения графа в виде списка смежности.\nСписок смежности представлен в виде пар ключ - значение, где\n- ключ - имя вершины графа,\n- значение - список имен всех смежных вершин (всех потомков ключа).",
             responses={
                 200: {"model": AdjacencyListResponse, "description": "Successfull Response"},
+                304: {"description": "Graph not modified"},
                 404: {"model": ErrorResponse, "description": "Graph entity not found"},
                 422: {"model": HTTPValidationError, "description": "Validation Error"},
             })
-async def get_adjacency_list(db: Session, graph_id: int) -> AdjacencyListResponse:
-    result_adj_list = await db_get_adj_list(db, graph_id, transpose=False)
+async def get_adjacency_list(db: Session, graph_id: int, if_none_match: IfNoneMatch = None) -> Response:
+    return await render_view(db, graph_id, ADJACENCY_VIEW, if_none_match)
 
-    return result_adj_list
 
-
-@router.get("/{graph_id}/reverse_adjacency_list", 
+@router.get("/{graph_id}/reverse_adjacency_list", response_model=AdjacencyListResponse,
             description="Ручка для чтения транспонированного графа в виде списка смежности.\nСписок смежности представлен в виде пар ключ - значение, где\n- ключ - имя вершины графа,\n- значение - список имен всех смежных вершин (всех предков ключа в исходном графе).",
             responses={
                 200: {"model": AdjacencyListResponse, "description": "Successfull Response"},
+                304: {"description": "Graph not modified"},
+                404: {"model": ErrorResponse, "description": "Graph entity not found"},
+                422: {"model": HTTPValidationError, "description": "Validation Error"},
+            })
+async def get_reverse_adjacency_list(db: Session, graph_id: int, if_none_match: IfNoneMatch = None) -> Response:
+    return await render_view(db, graph_id, REVERSE_ADJACENCY_VIEW, if_none_match)
+
+
+@router.get("/{graph_id}/stream", response_model=GraphReadResponse,
+            description="Ручка для потокового чтения большого графа в виде списка вершин и списка ребер. "
+                        "С `format=json` тело ответа совпадает с ответом `GET /api/graph/{graph_id}`, "
+                        "с `format=ndjson` каждая вершина и каждое ребро пишутся отдельной строкой.",
+            responses={
+                200: {"model": GraphReadResponse, "description": "Successfull Response",
+                      "content": {"application/x-ndjson": {}}},
+                404: {"model": ErrorResponse, "description": "Graph entity not found"},
+                422: {"model": HTTPValidationError, "description": "Validation Error"},
+            })
+async def read_graph_stream(db: Session, graph_id: int, format: StreamFormat = "json") -> StreamingResponse:
+    await db_check_graph_exists(db, graph_id)
+
+    return stream_response(db_stream_graph(graph_id, format == "ndjson"), format)
+
+
+@router.get("/{graph_id}/adjacency_list/stream", response_model=AdjacencyListResponse,
+            description="Ручка для потокового чтения большого графа в виде списка смежности. "
+                        "С `format=ndjson` каждая вершина пишется отдельной строкой вида `{\"node\": ..., \"adjacent\": [...]}`.",
+            responses={
+                200: {"model": AdjacencyListResponse, "description": "Successfull Response",
+                      "content": {"application/x-ndjson": {}}},
+                404: {"model": ErrorResponse, "description": "Graph entity not found"},
+                422: {"model": HTTPValidationError, "description": "Validation Error"},
+            })
+async def get_adjacency_list_stream(db: Session, graph_id: int, format: StreamFormat = "json") -> StreamingResponse:
+    await db_check_graph_exists(db, graph_id)
+
+    return stream_response(db_stream_adj_list(graph_id, format == "ndjson", transpose=False), format)
+
+
+@router.get("/{graph_id}/reverse_adjacency_list/stream", response_model=AdjacencyListResponse,
+            description="Ручка для потокового чтения транспонированного графа в виде списка смежности. "
+                        "С `format=ndjson` каждая вершина пишется отдельной строкой вида `{\"node\": ..., \"adjacent\": [...]}`.",
+            responses={
+                200: {"model": AdjacencyListResponse, "description": "Successfull Response",
+                      "content": {"application/x-ndjson": {}}},
                 404: {"model": ErrorResponse, "description": "Graph entity not found"},
                 422: {"model": HTTPValidationError, "description": "Validation Error"},
             })
-async def get_reverse_adjacency_list(db: Session, graph_id: int) -> AdjacencyListResponse:
-    result_adj_list = await db_get_adj_list(db, graph_id, transpose=True)
+async def get_reverse_adjacency_list_stream(db: Session, graph_id: int, format: StreamFormat = "json") -> StreamingResponse:
+    await db_check_graph_exists(db, graph_id)
 
-    return result_adj_list
+    return stream_response(db_stream_adj_list(graph_id, format == "ndjson", transpose=True), format)
+
+
+@router.get("/{graph_id}/topological_order", response_model=TopologicalOrderResponse,
+            description="Ручка для получения топологического порядка вершин графа: каждое ребро ведет из более ранней вершины в более позднюю.",
+            responses={
+                200: {"model": TopologicalOrderResponse, "description": "Successfull Response"},
+                304: {"description": "Graph not modified"},
+                404: {"model": ErrorResponse, "description": "Graph entity not found"},
+                422: {"model": HTTPValidationError, "description": "Validation Error"},
+            })
+async def get_topological_order(db: Session, graph_id: int, if_none_match: IfNoneMatch = None) -> Response:
+    return await render_view(db, graph_id, TOPOLOGICAL_ORDER_VIEW, if_none_match)
+
+
+@router.get("/{graph_id}/levels", response_model=LevelsResponse,
+            description="Ручка для получения уровня каждой вершины графа - длины самого длинного пути до нее из вершины без входящих ребер.",
+            responses={
+                200: {"model": LevelsResponse, "description": "Successfull Response"},
+                304: {"description": "Graph not modified"},
+                404: {"model": ErrorResponse, "description": "Graph entity not found"},
+                422: {"model": HTTPValidationError, "description": "Validation Error"},
+            })
+async def get_levels(db: Session, graph_id: int, if_none_match: IfNoneMatch = None) -> Response:
+    return await render_view(db, graph_id, LEVELS_VIEW, if_none_match)
+
+
+@router.get("/{graph_id}/stats", response_model=GraphStatsResponse,
+            description="Ручка для получения сводки по графу: число вершин и ребер, вершины без входящих (`sources`) и без исходящих (`sinks`) ребер, "
+                        "критический путь (самый длинный путь по числу вершин), число вершин на каждом уровне (`level_widths`) и "
+                        "распределения входящих и исходящих степеней (степень - число вершин с такой степенью). "
+                        "Считается за один проход в топологическом порядке и кэшируется для версии графа.",
+            responses={
+                200: {"model": GraphStatsResponse, "description": "Successfull Response"},
+                304: {"description": "Graph not modified"},
+                404: {"model": ErrorResponse, "description": "Graph entity not found"},
+                422: {"model": HTTPValidationError, "description": "Validation Error"},
+            })
+async def get_stats(db: Session, graph_id: int, if_none_match: IfNoneMatch = None) -> Response:
+    return await render_view(db, graph_id, STATS_VIEW, if_none_match)
+
+
+@router.post("/{graph_id}/critical_path",
+             description="Ручка для поиска критического пути с заданной стоимостью вершин: путь с наибольшей суммой стоимостей вершин. "
+                         "Вершины, которых нет в `costs`, стоят `default_cost`.",
+             responses={
+                 200: {"model": CriticalPath, "description": "Successfull Response"},
+                 404: {"model": ErrorResponse, "description": "Graph entity not found"},
+                 422: {"model": HTTPValidationError, "description": "Validation Error"},
+             })
+async def get_critical_path(db: Session, graph_id: int, request: CriticalPathRequest) -> CriticalPath:
+    return await db_get_critical_path(db, graph_id, request)
+
+
+@router.get("/{graph_id}/node/{node_name}/descendants", response_model=NodesResponse,
+            description="Ручка для получения всех потомков вершины: вершин, достижимых из нее по ребрам графа.",
+            responses={
+                200: {"model": NodesResponse, "description": "Successfull Response"},
+                404: {"model": ErrorResponse, "description": "Graph entity not found"},
+                422: {"model": HTTPValidationError, "description": "Validation Error"},
+            })
+async def get_descendants(db: Session, graph_id: int, node_name: str) -> Response:
+    return json_response({"nodes": await db_get_related_nodes(db, graph_id, node_name, DESCENDANTS)})
+
+
+@router.get("/{graph_id}/node/{node_name}/ancestors", response_model=NodesResponse,
+            description="Ручка для получения всех предков вершины: вершин, из которых она достижима по ребрам графа.",
+            responses={
+                200: {"model": NodesResponse, "description": "Successfull Response"},
+                404: {"model": ErrorResponse, "description": "Graph entity not found"},
+                422: {"model": HTTPValidationError, "description": "Validation Error"},
+            })
+async def get_ancestors(db: Session, graph_id: int, node_name: str) -> Response:
+    return json_response({"nodes": await db_get_related_nodes(db, graph_id, node_name, ANCESTORS)})
+
+
+@router.get("/{graph_id}/node/{node_name}/subgraph", response_model=GraphReadResponse,
+            description="Ручка для получения окрестности вершины: подграфа на вершине, ее предках (`direction=up`), потомках (`direction=down`) "
+                        "или и тех и других (`direction=both`) не дальше `depth` ребер от нее, со всеми ребрами графа между этими вершинами. "
+                        "Без `depth` берутся все предки или потомки. Ответ в том же виде, что и у `GET /api/graph/{graph_id}`.",
+            responses={
+                200: {"model": GraphReadResponse, "description": "Successfull Response"},
+                404: {"model": ErrorResponse, "description": "Graph entity not found"},
+                422: {"model": HTTPValidationError, "description": "Validation Error"},
+            })
+async def get_subgraph(db: Session, graph_id: int, node_name: str, direction: SubgraphDirection = "both",
+                       depth: Annotated[int | None, Query(ge=0)] = None) -> Response:
+    nodes, edges = await db_get_subgraph(db, graph_id, node_name, direction, depth)
+    return json_response(graph_content(graph_id, nodes, edges))
+
+
+@router.get("/{graph_id}/node/{node_name}/reachable/{other_name}", response_model=ReachabilityResponse,
+            description="Ручка для проверки, достижима ли вершина `other_name` из вершины `node_name`. Вершина достижима сама из себя.",
+            responses={
+                200: {"model": ReachabilityResponse, "description": "Successfull Response"},
+                404: {"model": ErrorResponse, "description": "Graph entity not found"},
+                422: {"model": HTTPValidationError, "description": "Validation Error"},
+            })
+async def get_reachable(db: Session, graph_id: int, node_name: str, other_name: str) -> Response:
+    reachable = await db_is_reachable(db, graph_id, node_name, other_name)
+    return json_response({"source": node_name, "target": other_name, "reachable": reachable})
+
+
+@router.post("/{graph_id}/nodes", status_code=status.HTTP_204_NO_CONTENT,
+             description="Ручка для добавления вершин в существующий граф. Вершины добавляются без ребер, "
+                         "имена не должны совпадать с уже существующими.",
+             responses={
+                 204: {"description": "Successfull response"},
+                 404: {"model": ErrorResponse, "description": "Graph entity not found"},
+                 422: {"model": HTTPValidationError, "description": "Validation Error"},
+             })
+async def add_nodes(db: Session, graph_id: int, nodes: NodesCreate):
+    await db_add_to_graph(db, graph_id, [node.name for node in nodes.nodes], [])
+    return None
+
+
+@router.post("/{graph_id}/edges", status_code=status.HTTP_204_NO_CONTENT,
+             description="Ручка для добавления ребер в существующий граф. Обе вершины ребра должны уже быть в графе. "
+                         "Ацикличность проверяется инкрементально, относительно сохраненного топологического порядка. "
+                         "Если хотя бы одно ребро образует цикл, ни одно ребро не добавляется.",
+             responses={
+                 204: {"description": "Successfull response"},
+                 404: {"model": ErrorResponse, "description": "Graph entity not found"},
+                 422: {"model": HTTPValidationError, "description": "Validation Error"},
+             })
+async def add_edges(db: Session, graph_id: int, edges: EdgesCreate):
+    await db_add_to_graph(db, graph_id, [], [(edge.source, edge.target) for edge in edges.edges])
+    return None
 
 
 @router.delete("/{graph_id}/node/{node_name}", status_code=status.HTTP_204_NO_CONTENT,
@@ -67,3 +354,63 @@ async def get_reverse_adjacency_list(db: Session, graph_id: int) -> AdjacencyLis
 async def delete_node(db: Session, graph_id: int, node_name: str):
     await db_delete_node(db, graph_id, node_name)
     return None
+
+
+@router.delete("/{graph_id}/nodes", status_code=status.HTTP_204_NO_CONTENT,
+               description="Ручка для удаления нескольких вершин графа по их именам за одну транзакцию. "
+                           "Если хотя бы одной вершины нет в графе, ничего не удаляется.",
+               responses={
+                   204: {"description": "Successfull response"},
+                   404: {"model": ErrorResponse, "description": "Graph entity not found"},
+                   422: {"model": HTTPValidationError, "description": "Validation Error"},
+               })
+async def delete_nodes(db: Session, graph_id: int, nodes: NodesDelete):
+    await db_delete_nodes(db, graph_id, nodes.nodes)
+    return None
+
+
+@graphs_router.post("/batch",
+                    description="Ручка для создания нескольких графов одним запросом. Каждый граф проверяется отдельно, "
+                                "все прошедшие проверку графы записываются в одной транзакции. "
+                                "В ответе для каждого графа, в порядке запроса, - его `id` или ошибки проверки в `detail`.",
+                    responses={
+                        200: {"model": GraphBatchCreateResponse, "description": "Successfull response"},
+                        422: {"model": HTTPValidationError, "description": "Validation Error"},
+                    })
+async def create_graphs(db: Session, new_graphs: GraphsCreate) -> GraphBatchCreateResponse:
+    return await db_create_graphs(db, new_graphs.graphs)
+
+
+@graphs_router.get("", response_model=GraphsReadResponse,
+                   description="Ручка для чтения нескольких графов по списку id через запятую (`?ids=1,2,3`). "
+                               "Графы отдаются в том же виде, что и `GET /api/graph/{graph_id}`, в порядке запроса; "
+                               "id графов, которых нет, перечислены в `missing`.",
+                   responses={
+                       200: {"model": GraphsReadResponse, "description": "Successfull Response"},
+                       422: {"model": HTTPValidationError, "description": "Validation Error"},
+                   })
+async def read_graphs(db: Session, ids: Annotated[str, Query(pattern=r"^\d+(,\d+)*$")]) -> Response:
+    graph_ids = list(dict.fromkeys(int(graph_id) for graph_id in ids.split(",")))
+    return Response(content=await get_encoded_graphs(db, graph_ids), media_type="application/json")
+
+
+@cache_router.get("/stats",
+                  description="Ручка для получения счетчиков кэша графов и кэша готовых ответов: число записей, занятый объем, попадания, промахи и вытеснения.",
+                  responses={
+                      200: {"model": CacheStatsResponse, "description": "Successfull Response"},
+                  })
+async def get_cache_stats() -> CacheStatsResponse:
+    return CacheStatsResponse(graphs=graph_cache.stats(), responses=response_cache.stats(),
+                              shared=shared_cache.stats(), names=name_cache.stats())
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse,
+                    description="Ручка для сбора метрик в текстовом формате Prometheus: "
+                                "занятость пула соединений с БД и время ожидания соединения, "
+                                "время обработки запросов по маршрутам и гистограммы времени "
+                                "этапов обработки (чтение из БД, проверка, вставка, сериализация) по размеру графа.",
+                    responses={
+                        200: {"description": "Successfull Response", "content": {"text/plain": {}}},
+                    })
+async def get_metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,6 +1,10 @@
+from typing import Annotated
+
 from fastapi.exceptions import RequestValidationError
 from pydantic import BaseModel, Field, field_validator
 
+from .settings import BATCH_MAX_GRAPHS
+
 MAX_NODE_NAME_LENGTH = 255
 node_name_pattern = r'^[a-zA-Z]+$'
 
@@ -35,6 +39,39 @@ class GraphCreate(BaseModel):
         return nodes
 
 
+class GraphBatchNode(BaseModel):
+    name: str
+
+
+class GraphBatchEdge(BaseModel):
+    source: str
+    target: str
+
+
+class GraphBatchItem(BaseModel):
+    # Node names, edge ends and the empty nodes list are checked per
+    # graph when the batch is created, so one invalid graph is reported
+    # in its place in the results instead of failing the whole batch.
+    nodes: list[GraphBatchNode]
+    edges: list[GraphBatchEdge]
+
+
+class GraphsCreate(BaseModel):
+    graphs: list[GraphBatchItem] = Field(min_length=1, max_length=BATCH_MAX_GRAPHS)
+
+
+class NodesCreate(BaseModel):
+    nodes: list[Node] = Field(min_length=1)
+
+
+class EdgesCreate(BaseModel):
+    edges: list[Edge] = Field(min_length=1)
+
+
+class NodesDelete(BaseModel):
+    nodes: list[str] = Field(min_length=1)
+
+
 class GraphCreateResponse(BaseModel):
     id: int
 
@@ -45,10 +82,108 @@ class GraphReadResponse(BaseModel):
     edges: list[Edge]
 
 
+class GraphsReadResponse(BaseModel):
+    graphs: list[GraphReadResponse]
+    missing: list[int]
+
+
+class GraphColumns(BaseModel):
+    nodes: list[str]
+    sources: list[int]
+    targets: list[int]
+
+
+class GraphColumnsResponse(GraphColumns):
+    id: int
+
+
 class AdjacencyListResponse(BaseModel):
     adjacency_list: dict[str, list[str]]
 
 
+class TopologicalOrderResponse(BaseModel):
+    order: list[str]
+
+
+class LevelsResponse(BaseModel):
+    levels: dict[str, int]
+
+
+class CriticalPath(BaseModel):
+    length: float
+    nodes: list[str]
+
+
+class GraphStatsResponse(BaseModel):
+    nodes: int
+    edges: int
+    sources: list[str]
+    sinks: list[str]
+    critical_path: CriticalPath
+    level_widths: list[int]
+    in_degrees: dict[str, int]
+    out_degrees: dict[str, int]
+
+
+NodeCost = Annotated[float, Field(ge=0, allow_inf_nan=False)]
+
+
+class CriticalPathRequest(BaseModel):
+    costs: dict[str, NodeCost] = Field(default_factory=dict)
+    default_cost: NodeCost = 1
+
+
+class NodesResponse(BaseModel):
+    nodes: list[str]
+
+
+class ReachabilityResponse(BaseModel):
+    source: str
+    target: str
+    reachable: bool
+
+
+class GraphCacheStats(BaseModel):
+    entries: int
+    bytes: int
+    max_entries: int
+    max_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class ResponseCacheStats(BaseModel):
+    entries: int
+    bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class SharedCacheStats(BaseModel):
+    enabled: bool
+    hits: int
+    misses: int
+    errors: int
+    invalidations: int
+
+
+class NameCacheStats(BaseModel):
+    entries: int
+    max_entries: int
+    hits: int
+    misses: int
+
+
+class CacheStatsResponse(BaseModel):
+    graphs: GraphCacheStats
+    responses: ResponseCacheStats
+    shared: SharedCacheStats
+    names: NameCacheStats
+
+
 class ErrorResponse(BaseModel):
     message: str
 
@@ -57,7 +192,17 @@ class ValidationError(BaseModel):
     loc: list[str]
     msg: str
     type: str
+    ctx: dict | None = None
 
 
 class HTTPValidationError(BaseModel):
     detail: list[ValidationError] = None
+
+
+class GraphBatchResult(BaseModel):
+    id: int | None = None
+    detail: list[ValidationError] | None = None
+
+
+class GraphBatchCreateResponse(BaseModel):
+    results: list[GraphBatchResult]
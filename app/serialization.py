@@ -0,0 +1,81 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .analytics import graph_stats
+from .ordering import get_levels, get_topological_order
+
+GRAPH_VIEW = "graph"
+ADJACENCY_VIEW = "adjacency_list"
+REVERSE_ADJACENCY_VIEW = "reverse_adjacency_list"
+TOPOLOGICAL_ORDER_VIEW = "topological_order"
+LEVELS_VIEW = "levels"
+STATS_VIEW = "stats"
+
+
+def dump_json(content) -> bytes:
+    # Both branches produce the same bytes; orjson is several times faster
+    # on large graphs.
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def load_json(body: bytes):
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def graph_content(graph_id: int, node_names: list[str], edges: list[tuple[str, str]]) -> dict:
+    return {
+        "id": graph_id,
+        "nodes": [{"name": name} for name in node_names],
+        "edges": [{"source": source, "target": target} for source, target in edges]
+    }
+
+
+def build_view(graph_id: int, graph, view: str) -> dict:
+    if view == GRAPH_VIEW:
+        return graph_content(graph_id, graph.node_names, graph.edges())
+    if view == ADJACENCY_VIEW:
+        return {"adjacency_list": graph.adjacency_list()}
+    if view == REVERSE_ADJACENCY_VIEW:
+        return {"adjacency_list": graph.adjacency_list(transpose=True)}
+    if view == TOPOLOGICAL_ORDER_VIEW:
+        return {"order": [graph.node_names[v] for v in get_topological_order(graph)]}
+    if view == LEVELS_VIEW:
+        return {"levels": dict(zip(graph.node_names, get_levels(graph)))}
+    if view == STATS_VIEW:
+        return graph_stats(graph)
+    raise ValueError(f"Unknown graph view {view}")
+
+
+def encode_view(graph_id: int, graph, view: str) -> bytes:
+    return dump_json(build_view(graph_id, graph, view))
+
+
+def graph_etag(graph_id: int, version: int, variant: str = "") -> str:
+    # Each representation of a version needs its own strong ETag.
+    if variant:
+        return f'"{graph_id}-{version}-{variant}"'
+    return f'"{graph_id}-{version}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+
+    return False
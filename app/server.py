@@ -0,0 +1,23 @@
+"""Production entry point: ``python -m app.server``.
+
+Runs uvicorn with WORKERS processes. Workers only learn about each
+other's writes through the shared cache, so more than one worker needs
+a Redis SHARED_CACHE_URL; otherwise a worker would keep serving a graph
+from its own cache after another one changed it.
+"""
+import sys
+
+import uvicorn
+
+from .settings import HOST, PORT, SHARED_CACHE_URL, WORKERS
+
+
+def main():
+    if WORKERS > 1 and not SHARED_CACHE_URL.startswith(("redis://", "rediss://", "unix://")):
+        sys.exit("WORKERS > 1 needs SHARED_CACHE_URL pointing to Redis")
+
+    uvicorn.run("app.main:app", host=HOST, port=PORT, workers=WORKERS)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,70 @@
 import os
 
-DATABASE_URL = os.getenv("DATABASE_URL")
\ No newline at end of file
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+# Statements are logged synchronously when echo is on; keep it for debugging.
+DATABASE_ECHO = bool(int(os.getenv("DATABASE_ECHO", "0")))
+# Per process: with several workers the database sees workers times
+# (pool size + overflow) connections at most.
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "10"))
+DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", "10"))
+DATABASE_POOL_TIMEOUT = float(os.getenv("DATABASE_POOL_TIMEOUT", "30"))
+DATABASE_POOL_PRE_PING = bool(int(os.getenv("DATABASE_POOL_PRE_PING", "0")))
+DATABASE_POOL_RECYCLE = int(os.getenv("DATABASE_POOL_RECYCLE", "-1"))
+# Prepared statements cached per connection; 0 behind PgBouncer in
+# transaction mode.
+DATABASE_STATEMENT_CACHE_SIZE = int(os.getenv("DATABASE_STATEMENT_CACHE_SIZE", "100"))
+# Applied to every statement of every connection; 0 disables it.
+DATABASE_STATEMENT_TIMEOUT_MS = int(os.getenv("DATABASE_STATEMENT_TIMEOUT_MS", "0"))
+
+GRAPH_CACHE_MAX_ENTRIES = int(os.getenv("GRAPH_CACHE_MAX_ENTRIES", "1024"))
+GRAPH_CACHE_MAX_BYTES = int(os.getenv("GRAPH_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+STREAM_INSERT_CHUNK_SIZE = int(os.getenv("STREAM_INSERT_CHUNK_SIZE", "5000"))
+STREAM_FETCH_SIZE = int(os.getenv("STREAM_FETCH_SIZE", "10000"))
+
+REACHABILITY_CLOSURE_MAX_NODES = int(os.getenv("REACHABILITY_CLOSURE_MAX_NODES", "4096"))
+REACHABILITY_MEMORY_MAX_EDGES = int(os.getenv("REACHABILITY_MEMORY_MAX_EDGES", "1000000"))
+
+# Most graphs one POST /api/graphs/batch or GET /api/graphs takes.
+BATCH_MAX_GRAPHS = int(os.getenv("BATCH_MAX_GRAPHS", "1000"))
+
+# Only read when the schema is created or migrated.
+BIGINT_IDS = bool(int(os.getenv("BIGINT_IDS", "0")))
+
+# "rows" keeps a graph as node and edge rows only; "blob" also keeps one
+# compressed blob per graph, which reads of uncached graphs decode instead
+# of selecting every row.
+GRAPH_STORAGE = os.getenv("GRAPH_STORAGE", "rows")
+
+# "inline" writes node names into the nodes rows, "interned" writes them
+# once into the shared node_names table and only their ids into nodes.
+# Only decides how new nodes are written; nodes of both kinds are read.
+NODE_NAMES = os.getenv("NODE_NAMES", "inline")
+# Interned names kept in memory per process, so reads decode ids without
+# asking the database.
+NAME_CACHE_MAX_ENTRIES = int(os.getenv("NAME_CACHE_MAX_ENTRIES", "100000"))
+
+# Creates with at least VALIDATION_PROCESS_MIN_EDGES edges are checked
+# (names, duplicates, cycles) in a pool of VALIDATION_PROCESSES processes
+# per worker, so reads on the worker aren't blocked meanwhile. 0 processes
+# checks every graph inline.
+VALIDATION_PROCESSES = int(os.getenv("VALIDATION_PROCESSES", "1"))
+VALIDATION_PROCESS_MIN_EDGES = int(os.getenv("VALIDATION_PROCESS_MIN_EDGES", "50000"))
+
+# Read by app.server. Every worker process has its own event loop,
+# connection pool and caches.
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8080"))
+WORKERS = int(os.getenv("WORKERS", "1"))
+
+# "" keeps the caches per process, "memory://" adds a store inside this
+# process (tests), "redis://..." shares graphs and encoded responses
+# between workers and tells them about each other's writes. Required
+# with more than one worker.
+SHARED_CACHE_URL = os.getenv("SHARED_CACHE_URL", "")
+# Seconds; 0 keeps entries until Redis evicts them.
+SHARED_CACHE_TTL = int(os.getenv("SHARED_CACHE_TTL", "3600"))
+
+METRICS_ENABLED = bool(int(os.getenv("METRICS_ENABLED", "1")))
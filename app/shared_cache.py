@@ -0,0 +1,212 @@
+"""Cache shared by the worker processes of one deployment.
+
+Entries are keyed by graph id and version and never change once written,
+so workers can fill the store without coordinating, and an entry can't
+go stale. The per-process caches in app.cache can; a worker that changes
+a graph publishes its id on INVALIDATION_CHANNEL, and every other worker
+drops its copies when the message arrives.
+
+Only a few Redis commands are used (GET, SET with EX, PUBLISH and
+SUBSCRIBE), so ``redis.asyncio.Redis`` serves as the store as is.
+MemoryStore implements the same subset in one process for tests and
+single-worker runs.
+"""
+import asyncio
+import time
+import uuid
+
+from .blob import decode_graph, encode_graph
+from .cache import graph_cache, response_cache
+from .graph import CompactGraph
+
+INVALIDATION_CHANNEL = "dag:invalidate"
+# Delay before resubscribing after the store connection is lost.
+RECONNECT_DELAY = 1.0
+
+
+class MemoryPubSub:
+    def __init__(self, store: "MemoryStore"):
+        self.store = store
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.channels: set[str] = set()
+
+    async def subscribe(self, *channels: str):
+        for channel in channels:
+            self.channels.add(channel)
+            self.store.subscribers.setdefault(channel, set()).add(self)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self):
+        for channel in self.channels:
+            self.store.subscribers[channel].discard(self)
+        self.channels.clear()
+
+
+class MemoryStore:
+    """The part of the redis.asyncio.Redis interface used here, kept in
+    this process."""
+
+    def __init__(self):
+        self.data: dict[str, tuple[bytes, float | None]] = {}
+        self.subscribers: dict[str, set[MemoryPubSub]] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        item = self.data.get(key)
+        if item is None:
+            return None
+
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+
+        return value
+
+    async def set(self, key: str, value: bytes, ex: int | None = None):
+        self.data[key] = (value, time.monotonic() + ex if ex else None)
+
+    async def publish(self, channel: str, message: str | bytes) -> int:
+        if isinstance(message, str):
+            message = message.encode()
+
+        subscribers = self.subscribers.get(channel, ())
+        for pubsub in subscribers:
+            pubsub.queue.put_nowait({"type": "message", "channel": channel.encode(), "data": message})
+
+        return len(subscribers)
+
+    def pubsub(self) -> MemoryPubSub:
+        return MemoryPubSub(self)
+
+    async def aclose(self):
+        self.data.clear()
+
+
+def open_store(url: str):
+    if url == "memory://":
+        return MemoryStore()
+
+    import redis.asyncio
+
+    return redis.asyncio.Redis.from_url(url)
+
+
+class SharedCache:
+    def __init__(self):
+        self.store = None
+        self.ttl = None
+        # Lets a worker skip its own invalidation messages.
+        self.origin = uuid.uuid4().hex
+        self.listener: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.store is not None
+
+    async def start(self, store, ttl: int):
+        self.store = store
+        self.ttl = ttl
+        pubsub = self.store.pubsub()
+        await pubsub.subscribe(INVALIDATION_CHANNEL)
+        self.listener = asyncio.create_task(self._listen(pubsub))
+
+    async def stop(self):
+        if self.listener is not None:
+            self.listener.cancel()
+            try:
+                await self.listener
+            except asyncio.CancelledError:
+                pass
+            self.listener = None
+
+        if self.store is not None:
+            await self.store.aclose()
+            self.store = None
+
+    async def _get(self, key: str) -> bytes | None:
+        # The store is only a cache: when it is unreachable, requests fall
+        # back to the database instead of failing.
+        try:
+            value = await self.store.get(key)
+        except Exception:
+            self.errors += 1
+            return None
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def _set(self, key: str, value: bytes):
+        try:
+            await self.store.set(key, value, ex=self.ttl or None)
+        except Exception:
+            self.errors += 1
+
+    async def get_graph(self, graph_id: int, version: int) -> CompactGraph | None:
+        data = await self._get(f"dag:graph:{graph_id}:{version}")
+        return decode_graph(data, version) if data is not None else None
+
+    async def put_graph(self, graph_id: int, graph: CompactGraph):
+        await self._set(f"dag:graph:{graph_id}:{graph.version}", encode_graph(graph))
+
+    async def get_body(self, graph_id: int, version: int, view: str) -> bytes | None:
+        return await self._get(f"dag:response:{graph_id}:{version}:{view}")
+
+    async def put_body(self, graph_id: int, version: int, view: str, body: bytes):
+        await self._set(f"dag:response:{graph_id}:{version}:{view}", body)
+
+    async def announce(self, graph_id: int):
+        try:
+            await self.store.publish(INVALIDATION_CHANNEL, f"{self.origin} {graph_id}")
+        except Exception:
+            self.errors += 1
+
+    async def _listen(self, pubsub):
+        while True:
+            try:
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    origin, graph_id = message["data"].decode().split()
+                    if origin != self.origin:
+                        self.invalidations += 1
+                        graph_cache.invalidate(int(graph_id))
+                        response_cache.invalidate(int(graph_id))
+            except asyncio.CancelledError:
+                await pubsub.aclose()
+                raise
+            except Exception:
+                self.errors += 1
+
+            # Messages published while the subscription was down are lost,
+            # so nothing cached before can be trusted.
+            await asyncio.sleep(RECONNECT_DELAY)
+            try:
+                pubsub = self.store.pubsub()
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+            except Exception:
+                self.errors += 1
+                continue
+            graph_cache.clear()
+            response_cache.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "invalidations": self.invalidations,
+        }
+
+
+shared_cache = SharedCache()
@@ -0,0 +1,76 @@
+import json
+from typing import AsyncIterator
+
+from .validation import GraphValidationError
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, dict]]:
+    # Only the current line is kept in memory; the body is never joined.
+    buffer = b""
+    line_no = 0
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+
+        for line in lines:
+            line_no += 1
+            item = parse_ndjson_line(line, line_no)
+            if item is not None:
+                yield line_no, item
+
+    line_no += 1
+    item = parse_ndjson_line(buffer, line_no)
+    if item is not None:
+        yield line_no, item
+
+
+def parse_ndjson_line(line: bytes, line_no: int) -> dict | None:
+    line = line.strip()
+    if not line:
+        return None
+
+    try:
+        item = json.loads(line)
+    except ValueError:
+        raise GraphValidationError("Line is not valid JSON", ["body", str(line_no)])
+
+    if not isinstance(item, dict):
+        raise GraphValidationError("Line should be a JSON object", ["body", str(line_no)])
+
+    return item
+
+
+def encode_node(name: str) -> str:
+    return '{"name":' + json.dumps(name, ensure_ascii=False) + "}"
+
+
+def encode_edge(source: str, target: str) -> str:
+    return '{"source":' + json.dumps(source, ensure_ascii=False) + ',"target":' + json.dumps(target, ensure_ascii=False) + "}"
+
+
+def encode_adjacency(name: str, adjacent: list[str], ndjson: bool) -> str:
+    adjacent = json.dumps(adjacent, ensure_ascii=False, separators=(",", ":"))
+    if ndjson:
+        return '{"node":' + json.dumps(name, ensure_ascii=False) + ',"adjacent":' + adjacent + "}"
+    return json.dumps(name, ensure_ascii=False) + ":" + adjacent
+
+
+class ChunkWriter:
+    """Joins encoded items into JSON array/object members or NDJSON lines."""
+
+    def __init__(self, ndjson: bool):
+        self.ndjson = ndjson
+        self.first = True
+
+    def write(self, items: list[str]) -> bytes:
+        if not items:
+            return b""
+        if self.ndjson:
+            return ("\n".join(items) + "\n").encode("utf-8")
+
+        chunk = ",".join(items)
+        if not self.first:
+            chunk = "," + chunk
+        self.first = False
+        return chunk.encode("utf-8")
@@ -0,0 +1,259 @@
+import re
+from array import array
+
+from .graph import CompactGraph
+from .schemas import MAX_NODE_NAME_LENGTH, node_name_pattern
+
+node_name_regex = re.compile(node_name_pattern)
+
+
+class GraphValidationError(ValueError):
+    def __init__(self, message: str, loc: list[str], ctx: dict | None = None):
+        super().__init__(message)
+        self.message = message
+        self.loc = loc
+        self.ctx = ctx
+
+    def __reduce__(self):
+        # Raised in the validation process pool and re-raised here.
+        return GraphValidationError, (self.message, self.loc, self.ctx)
+
+
+def build_compact_graph(node_names: list[str], edges: list[tuple[str, str]]) -> CompactGraph:
+    node_index = dict()
+
+    for i, node_name in enumerate(node_names):
+        if node_name in node_index:
+            raise GraphValidationError(f"Node {node_name} is duplicated in the graph", ["body", "nodes"])
+        node_index[node_name] = i
+
+    n_nodes = len(node_names)
+    sources = array("i")
+    targets = array("i")
+    edges_set = set()
+
+    for source_name, target_name in edges:
+        source = node_index.get(source_name)
+        if source is None:
+            raise GraphValidationError(f"Node {source_name} not found in the graph", ["body", "edges", "source"])
+        target = node_index.get(target_name)
+        if target is None:
+            raise GraphValidationError(f"Node {target_name} not found in the graph", ["body", "edges", "target"])
+
+        edge_key = source * n_nodes + target
+        if edge_key in edges_set:
+            raise GraphValidationError("There are duplicate edges in the graph", ["body", "edges"])
+        edges_set.add(edge_key)
+
+        sources.append(source)
+        targets.append(target)
+
+    return CompactGraph(node_names, sources, targets, node_index=node_index)
+
+
+def build_indexed_graph(node_names: list[str], sources: array, targets: array) -> CompactGraph:
+    """Check a graph given as a name table and edges as node indices."""
+    if not node_names:
+        raise GraphValidationError("Nodes list cannot be empty", ["body", "nodes"])
+
+    node_index = dict()
+
+    for i, node_name in enumerate(node_names):
+        validate_node_name(node_name, ["body", "nodes", str(i)])
+        if node_name in node_index:
+            raise GraphValidationError(f"Node {node_name} is duplicated in the graph", ["body", "nodes"])
+        node_index[node_name] = i
+
+    if len(sources) != len(targets):
+        raise GraphValidationError("Sources and targets should have the same length", ["body", "targets"])
+
+    n_nodes = len(node_names)
+    for loc, column in (("sources", sources), ("targets", targets)):
+        if column and (min(column) < 0 or max(column) >= n_nodes):
+            raise GraphValidationError(f"Node indices should be between 0 and {n_nodes - 1}", ["body", loc])
+
+    graph = CompactGraph(node_names, sources, targets, node_index=node_index)
+
+    if find_duplicate_edge(graph) is not None:
+        raise GraphValidationError("There are duplicate edges in the graph", ["body", "edges"])
+
+    return graph
+
+
+def topological_order(graph: CompactGraph) -> list[int]:
+    # Kahn's algorithm: every node and every edge is visited exactly once,
+    # and the only working memory is the in-degree table and the output.
+    n_nodes = graph.n_nodes
+    offsets, targets = graph.offsets, graph.targets
+
+    in_degree = [0] * n_nodes
+    for target in targets:
+        in_degree[target] += 1
+
+    order = [v for v in range(n_nodes) if in_degree[v] == 0]
+    append = order.append
+
+    # Iterating over a list that is appended to visits the new items too,
+    # which makes `order` double as the queue.
+    for v in order:
+        for u in targets[offsets[v]:offsets[v + 1]]:
+            degree = in_degree[u] - 1
+            in_degree[u] = degree
+            if degree == 0:
+                append(u)
+
+    if len(order) < n_nodes:
+        cycle = find_cycle(graph, in_degree)
+        raise GraphValidationError("Graph is not DAG", ["body", "edges"],
+                                   {"cycle": [graph.node_names[v] for v in cycle]})
+
+    return order
+
+
+def find_cycle(graph: CompactGraph, in_degree: list[int]) -> list[int]:
+    # After Kahn's pass every node left with a positive in-degree has a
+    # predecessor that is also left, so walking predecessors through those
+    # nodes must eventually revisit one of them.
+    offsets, sources = graph.reverse_offsets, graph.reverse_sources
+    v = next(v for v, degree in enumerate(in_degree) if degree > 0)
+
+    path = []
+    position = [-1] * graph.n_nodes
+
+    while position[v] < 0:
+        position[v] = len(path)
+        path.append(v)
+
+        for u in sources[offsets[v]:offsets[v + 1]]:
+            if in_degree[u] > 0:
+                v = u
+                break
+
+    cycle = path[position[v]:]
+    cycle.reverse()
+
+    return cycle
+
+
+def resolve_additions(graph: CompactGraph, node_names: list[str],
+                      edges: list[tuple[str, str]]) -> tuple[array, array]:
+    """Check nodes and edges to be added to ``graph`` and return the edges
+    as index arrays, with new nodes numbered from ``graph.n_nodes`` on."""
+    node_index = graph.node_index
+    new_index = dict()
+
+    for node_name in node_names:
+        if node_name in node_index or node_name in new_index:
+            raise GraphValidationError(f"Node {node_name} is duplicated in the graph", ["body", "nodes"])
+        new_index[node_name] = graph.n_nodes + len(new_index)
+
+    n_nodes = graph.n_nodes + len(new_index)
+    sources = array("i")
+    targets = array("i")
+    edges_set = set()
+
+    for source_name, target_name in edges:
+        source = node_index.get(source_name, new_index.get(source_name))
+        if source is None:
+            raise GraphValidationError(f"Node {source_name} not found in the graph", ["body", "edges", "source"])
+        target = node_index.get(target_name, new_index.get(target_name))
+        if target is None:
+            raise GraphValidationError(f"Node {target_name} not found in the graph", ["body", "edges", "target"])
+
+        edge_key = source * n_nodes + target
+        if edge_key in edges_set or (source < graph.n_nodes and target in graph.successors(source)):
+            raise GraphValidationError("There are duplicate edges in the graph", ["body", "edges"])
+        edges_set.add(edge_key)
+
+        sources.append(source)
+        targets.append(target)
+
+    return sources, targets
+
+
+def validate_node_name(name, loc: list) -> str:
+    if not isinstance(name, str):
+        raise GraphValidationError("Input should be a valid string", loc)
+    if len(name) > MAX_NODE_NAME_LENGTH:
+        raise GraphValidationError(f"String should have at most {MAX_NODE_NAME_LENGTH} characters", loc)
+    if node_name_regex.fullmatch(name) is None:
+        raise GraphValidationError(f"String should match pattern '{node_name_pattern}'", loc)
+    return name
+
+
+def validate_graph_names(node_names: list[str], edges: list[tuple[str, str]]):
+    """The checks the request model makes on the names of a graph."""
+    if not node_names:
+        raise GraphValidationError("Nodes list cannot be empty", ["body", "nodes"])
+
+    for i, node_name in enumerate(node_names):
+        validate_node_name(node_name, ["body", "nodes", str(i), "name"])
+
+    for i, (source, target) in enumerate(edges):
+        validate_node_name(source, ["body", "edges", str(i), "source"])
+        validate_node_name(target, ["body", "edges", str(i), "target"])
+
+
+def find_duplicate_edge(graph: CompactGraph) -> tuple[int, int] | None:
+    offsets, targets = graph.offsets, graph.targets
+
+    for v in range(graph.n_nodes):
+        if offsets[v + 1] - offsets[v] < 2:
+            continue
+        seen = set()
+        for u in targets[offsets[v]:offsets[v + 1]]:
+            if u in seen:
+                return v, u
+            seen.add(u)
+
+    return None
+
+
+class GraphBuilder:
+    """Builds a CompactGraph from nodes and edges that arrive one at a time.
+
+    Names are interned on first mention, so an edge may reference a node
+    that is declared later. Duplicate edges are found once the CSR exists,
+    which keeps per-edge state down to two ints.
+    """
+
+    def __init__(self):
+        self.node_names: list[str] = []
+        self.node_index: dict[str, int] = {}
+        self.declared = bytearray()
+        self.sources = array("i")
+        self.targets = array("i")
+
+    def _intern(self, name: str) -> int:
+        index = self.node_index.get(name)
+        if index is None:
+            index = self.node_index[name] = len(self.node_names)
+            self.node_names.append(name)
+            self.declared.append(0)
+        return index
+
+    def add_node(self, name: str, loc: list):
+        index = self._intern(validate_node_name(name, loc))
+        if self.declared[index]:
+            raise GraphValidationError(f"Node {name} is duplicated in the graph", loc)
+        self.declared[index] = 1
+
+    def add_edge(self, source: str, target: str, loc: list):
+        self.sources.append(self._intern(validate_node_name(source, loc + ["source"])))
+        self.targets.append(self._intern(validate_node_name(target, loc + ["target"])))
+
+    def build(self) -> CompactGraph:
+        if not self.declared:
+            raise GraphValidationError("Nodes list cannot be empty", ["body", "nodes"])
+
+        for index, declared in enumerate(self.declared):
+            if not declared:
+                raise GraphValidationError(f"Node {self.node_names[index]} not found in the graph", ["body", "edges"])
+
+        graph = CompactGraph(self.node_names, self.sources, self.targets, node_index=self.node_index)
+        self.sources = self.targets = None
+
+        if find_duplicate_edge(graph) is not None:
+            raise GraphValidationError("There are duplicate edges in the graph", ["body", "edges"])
+
+        return graph
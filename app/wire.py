@@ -0,0 +1,160 @@
+"""Compact wire formats for whole graphs.
+
+Instead of repeating node names on every edge, a graph is sent as a name
+table plus two columns of node indices:
+
+- ``COMPACT_JSON`` and ``MSGPACK``: ``{"id": 1, "nodes": ["a", "b"],
+  "sources": [0], "targets": [1]}`` ("id" only in responses);
+- ``INT32``: a header (magic, graph id, node count, edge count), the
+  sources and targets as little-endian int32, then the node names joined
+  by "\\n" (names are ASCII letters only).
+"""
+import struct
+from array import array
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from .blob import int32_array, int32_bytes
+from .graph import CompactGraph
+from .serialization import dump_json, load_json
+from .validation import GraphValidationError, build_indexed_graph
+
+JSON = "application/json"
+COMPACT_JSON = "application/vnd.dag.compact+json"
+MSGPACK = "application/msgpack"
+INT32 = "application/vnd.dag.int32"
+WIRE_FORMATS = (COMPACT_JSON, MSGPACK, INT32)
+ETAG_VARIANTS = {JSON: "", COMPACT_JSON: "compact", MSGPACK: "msgpack", INT32: "int32"}
+
+INT32_MAGIC = b"DAGW"
+INT32_HEADER = struct.Struct("<4sqII")
+
+
+def media_type(content_type: str) -> str:
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+def available_formats() -> tuple[str, ...]:
+    if msgpack is None:
+        return JSON, COMPACT_JSON, INT32
+    return JSON, COMPACT_JSON, MSGPACK, INT32
+
+
+def negotiate(accept: str | None) -> str:
+    """Pick the response format for an Accept header. Anything that can't
+    be served gets plain JSON, as before formats were negotiated."""
+    if not accept:
+        return JSON
+
+    formats = available_formats()
+    best, best_quality = JSON, 0.0
+
+    for item in accept.split(","):
+        name, *params = item.split(";")
+        name = media_type(name)
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        if name in ("*/*", "application/*"):
+            name = JSON
+        if name in formats and quality > best_quality:
+            best, best_quality = name, quality
+
+    return best
+
+
+def body_format(content_type: str | None) -> str | None:
+    """Return the wire format of a request body, or None for plain JSON."""
+    if content_type is None:
+        return None
+    name = media_type(content_type)
+    return name if name in WIRE_FORMATS else None
+
+
+def encode_graph_wire(graph_id: int, graph: CompactGraph, wire_format: str) -> bytes:
+    sources = graph.edge_sources()
+
+    if wire_format == INT32:
+        names = "\n".join(graph.node_names).encode("ascii")
+        return b"".join((
+            INT32_HEADER.pack(INT32_MAGIC, graph_id, graph.n_nodes, graph.n_edges),
+            int32_bytes(sources),
+            int32_bytes(graph.targets),
+            names,
+        ))
+
+    content = {
+        "id": graph_id,
+        "nodes": graph.node_names,
+        "sources": sources.tolist(),
+        "targets": graph.targets.tolist(),
+    }
+    if wire_format == MSGPACK:
+        return msgpack.packb(content)
+    return dump_json(content)
+
+
+def decode_graph_wire(body: bytes, wire_format: str) -> CompactGraph:
+    """Parse and check a graph sent in one of the wire formats."""
+    if wire_format == INT32:
+        return build_indexed_graph(*decode_int32(body))
+
+    try:
+        content = msgpack.unpackb(body) if wire_format == MSGPACK else load_json(body)
+    except ValueError:
+        raise GraphValidationError("Body could not be decoded", ["body"])
+
+    if not isinstance(content, dict):
+        raise GraphValidationError("Body should be an object with nodes, sources and targets", ["body"])
+
+    node_names = content.get("nodes")
+    if not isinstance(node_names, list):
+        raise GraphValidationError("Input should be a valid list", ["body", "nodes"])
+
+    columns = []
+    for loc in ("sources", "targets"):
+        column = content.get(loc)
+        if not isinstance(column, list):
+            raise GraphValidationError("Input should be a valid list", ["body", loc])
+        try:
+            columns.append(array("i", column))
+        except (TypeError, OverflowError):
+            raise GraphValidationError("Input should be a list of node indices", ["body", loc])
+
+    return build_indexed_graph(node_names, *columns)
+
+
+def decode_int32(body: bytes) -> tuple[list[str], array, array]:
+    if len(body) < INT32_HEADER.size:
+        raise GraphValidationError("Body is shorter than the header", ["body"])
+
+    magic, _, n_nodes, n_edges = INT32_HEADER.unpack_from(body)
+    if magic != INT32_MAGIC:
+        raise GraphValidationError("Unknown graph buffer format", ["body"])
+
+    data = memoryview(body)
+    sources_end = INT32_HEADER.size + 4 * n_edges
+    targets_end = sources_end + 4 * n_edges
+    if len(body) < targets_end:
+        raise GraphValidationError("Body is shorter than its edge count", ["body"])
+
+    try:
+        names = str(data[targets_end:], "ascii")
+    except UnicodeDecodeError:
+        raise GraphValidationError("Node names should be ASCII", ["body", "nodes"])
+
+    node_names = names.split("\n") if n_nodes else []
+    if len(node_names) != n_nodes:
+        raise GraphValidationError("Node count does not match the names", ["body", "nodes"])
+
+    return (node_names, int32_array(data[INT32_HEADER.size:sources_end]),
+            int32_array(data[sources_end:targets_end]))
@@ -0,0 +1,81 @@
+"""Compare re-sorting the whole graph with extending its cached topological order when edges are added.
+
+Usage:
+    python -m benchmarks.bench_add_edges
+"""
+import argparse
+import random
+import time
+
+from app.ordering import extend_topological_order, get_topological_order
+from app.validation import GraphValidationError, resolve_additions, topological_order
+from benchmarks.bench_compact_graph import build_compact, make_dag
+from benchmarks.bench_create_graph import name_range
+
+
+def batches(graph, batch: int, rng: random.Random) -> list[tuple[str, list[str], list[tuple[str, str]]]]:
+    names = graph.node_names
+    order = get_topological_order(graph)
+    position = {v: i for i, v in enumerate(order)}
+    new_names = [f"new{name}" for name in name_range(batch)]
+
+    def forward_pair(span: int) -> tuple[str, str]:
+        while True:
+            i = rng.randrange(len(order) - span)
+            source, target = order[i], order[i + rng.randint(1, span)]
+            if target not in graph.successors(source):
+                return names[source], names[target]
+
+    def backward_pair(span: int) -> tuple[str, str]:
+        source, target = forward_pair(span)
+        return target, source
+
+    return [
+        ("new sinks", new_names, [(rng.choice(names), name) for name in new_names]),
+        ("new sources", new_names, [(name, rng.choice(names)) for name in new_names]),
+        ("forward", [], list({forward_pair(len(order) // 2) for _ in range(batch)})),
+        ("local back", [], list({backward_pair(1) for _ in range(batch)})),
+        ("wide back", [], [backward_pair(len(order) // 2)]),
+    ]
+
+
+def has_cycle(sort) -> bool:
+    try:
+        sort()
+    except GraphValidationError:
+        return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    graph = build_compact(*make_dag(args.edges))
+
+    for label, node_names, edges in batches(graph, args.batch, rng):
+        sources, targets = resolve_additions(graph, node_names, edges)
+
+        start = time.perf_counter()
+        new_graph = graph.with_additions(node_names, sources, targets, graph.version + 1)
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        full_cycle = has_cycle(lambda: topological_order(new_graph))
+        full_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        extend_cycle = has_cycle(lambda: extend_topological_order(graph, new_graph, sources, targets))
+        extend_s = time.perf_counter() - start
+
+        assert full_cycle == extend_cycle
+
+        print(f"{label:>12} nodes={new_graph.n_nodes:<8} edges={new_graph.n_edges:<8} added={len(edges):<6} "
+              f"cycle={str(full_cycle):<5} csr={build_s * 1000:8.1f}ms full sort={full_s * 1000:8.1f}ms extend={extend_s * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
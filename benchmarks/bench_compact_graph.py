@@ -0,0 +1,118 @@
+"""Compare the dict-of-lists adjacency representation with CompactGraph.
+
+Usage:
+    python -m benchmarks.bench_compact_graph
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from array import array
+
+from app.graph import CompactGraph
+from app.validation import topological_order
+from benchmarks.bench_create_graph import name_range
+
+
+def make_dag(n_edges: int, seed: int = 0) -> tuple[list[str], list[tuple[str, str]]]:
+    rng = random.Random(seed)
+    n_nodes = max(2, n_edges // 5)
+    names = list(name_range(n_nodes))
+    edges = set()
+
+    while len(edges) < n_edges:
+        source, target = sorted(rng.sample(range(n_nodes), 2))
+        edges.add((source, target))
+
+    return names, [(names[s], names[t]) for s, t in edges]
+
+
+def build_dict(names: list[str], edges: list[tuple[str, str]]) -> dict[str, list[str]]:
+    adj_list = {name: [] for name in names}
+    for source, target in edges:
+        adj_list[source].append(target)
+    return adj_list
+
+
+def dict_has_cycle(adj_list: dict[str, list[str]]) -> bool:
+    nodes_status = dict.fromkeys(adj_list, 0)
+
+    for node_name in adj_list:
+        if nodes_status[node_name] != 0:
+            continue
+        dfs_stack = [node_name]
+        while dfs_stack:
+            v = dfs_stack[-1]
+            if nodes_status[v] != 0:
+                nodes_status[v] = 1
+                dfs_stack.pop()
+                continue
+            nodes_status[v] = 2
+            for v_neighbour in adj_list[v]:
+                if nodes_status[v_neighbour] == 2:
+                    return True
+                if nodes_status[v_neighbour] == 0:
+                    dfs_stack.append(v_neighbour)
+
+    return False
+
+
+def build_compact(names: list[str], edges: list[tuple[str, str]]) -> CompactGraph:
+    node_index = {name: i for i, name in enumerate(names)}
+    sources = array("i", [node_index[source] for source, _ in edges])
+    targets = array("i", [node_index[target] for _, target in edges])
+    return CompactGraph(names, sources, targets, node_index=node_index)
+
+
+def measure(build, *args):
+    # Time and memory are measured in separate runs: tracemalloc slows
+    # allocation-heavy code down by an order of magnitude.
+    gc.collect()
+    start = time.perf_counter()
+    result = build(*args)
+    elapsed = time.perf_counter() - start
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = build(*args)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, retained, peak
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def report(label: str, n_edges: int, build_s: float, retained: int, peak: int, cycle_s: float, adj_s: float):
+    print(f"{label:>7} edges={n_edges:<8} build={build_s * 1000:9.1f}ms retained={retained / 2 ** 20:8.2f}MiB "
+          f"peak={peak / 2 ** 20:8.2f}MiB cycle_check={cycle_s * 1000:9.1f}ms adjacency={adj_s * 1000:9.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for n_edges in args.sizes:
+        names, edges = make_dag(n_edges)
+
+        adj_list, build_s, retained, peak = measure(build_dict, names, edges)
+        cycle_s = timed(dict_has_cycle, adj_list)
+        adj_s = timed(lambda: {name: list(targets) for name, targets in adj_list.items()})
+        report("dict", n_edges, build_s, retained, peak, cycle_s, adj_s)
+        del adj_list
+
+        graph, build_s, retained, peak = measure(build_compact, names, edges)
+        cycle_s = timed(topological_order, graph)
+        adj_s = timed(graph.adjacency_list)
+        report("compact", n_edges, build_s, retained, peak, cycle_s, adj_s)
+        del graph
+
+
+if __name__ == "__main__":
+    main()
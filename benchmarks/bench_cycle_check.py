@@ -0,0 +1,106 @@
+"""Compare the previous stack-based DFS cycle check with Kahn's topological sort.
+
+Usage:
+    python -m benchmarks.bench_cycle_check
+"""
+import argparse
+import time
+from array import array
+
+from app.graph import CompactGraph
+from app.validation import GraphValidationError, topological_order
+from benchmarks.bench_compact_graph import build_compact, make_dag
+from benchmarks.bench_create_graph import name_range
+
+
+def dfs_has_cycle(graph: CompactGraph) -> tuple[bool, int]:
+    # Cycle check as it was before the validation module, also reporting the
+    # largest stack it needed.
+    offsets, targets = graph.offsets, graph.targets
+    nodes_status = bytearray(graph.n_nodes)
+    max_stack = 0
+
+    for node in range(graph.n_nodes):
+        if nodes_status[node] != 0:
+            continue
+
+        dfs_stack = [node]
+
+        while dfs_stack:
+            max_stack = max(max_stack, len(dfs_stack))
+            v = dfs_stack[-1]
+
+            if nodes_status[v] != 0:
+                nodes_status[v] = 1
+                dfs_stack.pop()
+                continue
+
+            nodes_status[v] = 2
+
+            for v_neighbour in targets[offsets[v]:offsets[v + 1]]:
+                if nodes_status[v_neighbour] == 2:
+                    return True, max_stack
+                if nodes_status[v_neighbour] == 0:
+                    dfs_stack.append(v_neighbour)
+
+    return False, max_stack
+
+
+def kahn_has_cycle(graph: CompactGraph) -> bool:
+    try:
+        topological_order(graph)
+    except GraphValidationError:
+        return True
+    return False
+
+
+def dense_dag(n_nodes: int) -> CompactGraph:
+    names = list(name_range(n_nodes))
+    sources = array("i")
+    targets = array("i")
+    for source in range(n_nodes):
+        for target in range(source + 1, n_nodes):
+            sources.append(source)
+            targets.append(target)
+    return CompactGraph(names, sources, targets)
+
+
+def chain(n_nodes: int, closed: bool) -> CompactGraph:
+    names = list(name_range(n_nodes))
+    sources = array("i", range(n_nodes - 1))
+    targets = array("i", range(1, n_nodes))
+    if closed:
+        sources.append(n_nodes - 1)
+        targets.append(0)
+    return CompactGraph(names, sources, targets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    dense_nodes = int((2 * args.edges) ** 0.5)
+    workloads = [
+        ("random dag", build_compact(*make_dag(args.edges))),
+        ("dense dag", dense_dag(dense_nodes)),
+        ("chain", chain(args.edges, closed=False)),
+        ("cycle", chain(args.edges, closed=True)),
+    ]
+
+    for label, graph in workloads:
+        start = time.perf_counter()
+        dfs_cycle, max_stack = dfs_has_cycle(graph)
+        dfs_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        kahn_cycle = kahn_has_cycle(graph)
+        kahn_s = time.perf_counter() - start
+
+        assert dfs_cycle == kahn_cycle
+        print(f"{label:>10} nodes={graph.n_nodes:<8} edges={graph.n_edges:<8} cycle={str(kahn_cycle):<5} "
+              f"dfs={dfs_s * 1000:9.1f}ms (max stack {max_stack:>8}) kahn={kahn_s * 1000:9.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
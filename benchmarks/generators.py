@@ -0,0 +1,74 @@
+"""Synthetic DAG shapes for the benchmark suite.
+
+Every generator takes a target edge count and returns node names and
+edges, deterministically for a given seed. Nothing here imports the app,
+so the suite can pick the database before the settings are read.
+"""
+import random
+
+
+def name_range(n: int) -> list[str]:
+    # Node names are letters only: a, b, ..., z, aa, ab, ...
+    names = []
+    for i in range(1, n + 1):
+        name = ""
+        while i > 0:
+            i, rem = divmod(i - 1, 26)
+            name = chr(ord("a") + rem) + name
+        names.append(name)
+    return names
+
+
+def chain(n_edges: int, seed: int = 0) -> tuple[list[str], list[tuple[str, str]]]:
+    names = name_range(n_edges + 1)
+    return names, list(zip(names, names[1:]))
+
+
+def fanout(n_edges: int, seed: int = 0) -> tuple[list[str], list[tuple[str, str]]]:
+    names = name_range(n_edges + 1)
+    return names, [(names[0], name) for name in names[1:]]
+
+
+def layered(n_edges: int, seed: int = 0, width: int = 50, out_degree: int = 5) -> tuple[list[str], list[tuple[str, str]]]:
+    # Nodes are split into layers of `width`; each node gets edges to random
+    # nodes of the next layer.
+    rng = random.Random(seed)
+    n_layers = max(2, n_edges // (width * out_degree) + 1)
+    names = name_range(n_layers * width)
+    edges = []
+
+    for layer in range(n_layers - 1):
+        next_layer = names[(layer + 1) * width:(layer + 2) * width]
+        for name in names[layer * width:(layer + 1) * width]:
+            for target in rng.sample(next_layer, out_degree):
+                edges.append((name, target))
+                if len(edges) == n_edges:
+                    return names, edges
+
+    return names, edges
+
+
+def dense(n_edges: int, seed: int = 0) -> tuple[list[str], list[tuple[str, str]]]:
+    # Edges from every node to every later one, stopping at n_edges.
+    n_nodes = 2
+    while n_nodes * (n_nodes - 1) // 2 < n_edges:
+        n_nodes += 1
+
+    names = name_range(n_nodes)
+    edges = []
+
+    for i, source in enumerate(names):
+        for target in names[i + 1:]:
+            edges.append((source, target))
+            if len(edges) == n_edges:
+                return names, edges
+
+    return names, edges
+
+
+GENERATORS = {
+    "chain": chain,
+    "fanout": fanout,
+    "layered": layered,
+    "dense": dense,
+}
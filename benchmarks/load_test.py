@@ -0,0 +1,75 @@
+"""Concurrent read load against a running service.
+
+Creates one graph, then keeps --concurrency clients reading it for
+--duration seconds and prints throughput and latency percentiles. The
+default path is a streaming read, which always goes to the database and
+so exercises the connection pool; cached reads don't.
+
+Usage:
+    uvicorn app.main:app --port 8080 &
+    python -m benchmarks.load_test --url http://localhost:8080 --concurrency 64
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from benchmarks.bench_compact_graph import make_dag
+
+
+async def create_graph(client: httpx.AsyncClient, n_edges: int) -> int:
+    names, edges = make_dag(n_edges)
+    response = await client.post("/api/graph/", json={
+        "nodes": [{"name": name} for name in names],
+        "edges": [{"source": source, "target": target} for source, target in edges],
+    })
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+async def worker(client: httpx.AsyncClient, path: str, deadline: float, latencies: list[float], errors: list[int]):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get(path)
+        await response.aread()
+        if response.status_code != 200:
+            errors.append(response.status_code)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(url: str, path: str, n_edges: int, concurrency: int, duration: float):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        graph_id = await create_graph(client, n_edges)
+        path = path.format(graph_id=graph_id)
+
+        latencies = []
+        errors = []
+        deadline = time.perf_counter() + duration
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client, path, deadline, latencies, errors) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{path} concurrency={concurrency} requests={len(latencies)} errors={len(errors)} "
+          f"throughput={len(latencies) / elapsed:8.1f}/s "
+          f"p50={quantiles[49] * 1000:7.1f}ms p95={quantiles[94] * 1000:7.1f}ms p99={quantiles[98] * 1000:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8080")
+    parser.add_argument("--path", default="/api/graph/{graph_id}/adjacency_list/stream")
+    parser.add_argument("--edges", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.url, args.path, args.edges, args.concurrency, args.duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
 from fastapi.testclient import TestClient
 import pytest
+from sqlalchemy import select
+
+from app import crud
+from app.cache import graph_cache, name_cache, response_cache
+from app.db import engine
 from app.main import app
+from app.models import GraphBlob
 
 
 @pytest.fixture(scope="module")
@@ -8,3 +14,32 @@ def test_client():
     with TestClient(app) as client:
         yield client
 
+
+@pytest.fixture
+def blob_storage(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(crud, "GRAPH_STORAGE", crud.BLOB_STORAGE)
+
+
+def run(test_client: TestClient, func, *args):
+    # The engine's connections belong to the app's event loop.
+    return test_client.portal.call(func, *args)
+
+
+def drop_caches():
+    graph_cache.clear()
+    response_cache.clear()
+    name_cache.clear()
+
+
+def get_blob(test_client: TestClient, graph_id: int) -> tuple[int, bytes] | None:
+    async def fetch():
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                select(GraphBlob.version, GraphBlob.data).where(GraphBlob.graph_id == graph_id))
+            return result.first()
+
+    return run(test_client, fetch)
+
+
+def as_sets(graph: dict) -> tuple[set[str], set[tuple[str, str]]]:
+    return {node["name"] for node in graph["nodes"]}, {(edge["source"], edge["target"]) for edge in graph["edges"]}
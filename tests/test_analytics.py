@@ -0,0 +1,104 @@
+import random
+from array import array
+
+from fastapi.testclient import TestClient
+
+from app.analytics import critical_path, graph_stats
+from app.graph import CompactGraph
+from tests.test_get_graph import create_test_graph
+
+NODES = ["a", "b", "c", "d", "e", "f"]
+EDGES = [("a", "b"), ("a", "c"), ("b", "d"), ("c", "d"), ("d", "e"), ("f", "e")]
+
+
+def test_graph_stats(test_client: TestClient):
+    graph_id = create_test_graph(test_client, NODES, EDGES)
+
+    response = test_client.get(f"/api/graph/{graph_id}/stats")
+    assert response.status_code == 200
+
+    stats = response.json()
+    assert stats["nodes"] == 6 and stats["edges"] == 6
+    assert stats["sources"] == ["a", "f"]
+    assert stats["sinks"] == ["e"]
+    assert stats["critical_path"]["length"] == 4
+    assert stats["critical_path"]["nodes"] in (["a", "b", "d", "e"], ["a", "c", "d", "e"])
+    assert stats["level_widths"] == [2, 2, 1, 1]
+    assert stats["in_degrees"] == {"0": 2, "1": 2, "2": 2}
+    assert stats["out_degrees"] == {"0": 1, "1": 4, "2": 1}
+
+
+def test_graph_stats_follow_version(test_client: TestClient):
+    graph_id = create_test_graph(test_client, NODES, EDGES)
+    response = test_client.get(f"/api/graph/{graph_id}/stats")
+
+    etag = response.headers["ETag"]
+    assert test_client.get(f"/api/graph/{graph_id}/stats", headers={"If-None-Match": etag}).status_code == 304
+
+    assert test_client.delete(f"/api/graph/{graph_id}/node/d").status_code == 204
+
+    response = test_client.get(f"/api/graph/{graph_id}/stats", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["critical_path"]["length"] == 2
+    assert response.json()["sinks"] == ["b", "c", "e"]
+
+
+def test_weighted_critical_path(test_client: TestClient):
+    graph_id = create_test_graph(test_client, NODES, EDGES)
+
+    response = test_client.post(f"/api/graph/{graph_id}/critical_path",
+                                json={"costs": {"c": 5, "f": 20}, "default_cost": 1})
+    assert response.status_code == 200
+    assert response.json() == {"length": 21, "nodes": ["f", "e"]}
+
+    response = test_client.post(f"/api/graph/{graph_id}/critical_path", json={"costs": {"c": 5}})
+    assert response.json() == {"length": 8, "nodes": ["a", "c", "d", "e"]}
+
+
+def test_weighted_critical_path_invalid(test_client: TestClient):
+    graph_id = create_test_graph(test_client, NODES, EDGES)
+
+    response = test_client.post(f"/api/graph/{graph_id}/critical_path", json={"costs": {"x": 1}})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "costs", "x"]
+
+    response = test_client.post(f"/api/graph/{graph_id}/critical_path", json={"costs": {"a": -1}})
+    assert response.status_code == 422
+
+    assert test_client.post("/api/graph/9999/critical_path", json={}).status_code == 404
+    assert test_client.get("/api/graph/9999/stats").status_code == 404
+
+
+def longest_path_weight(n_nodes: int, edges: list[tuple[int, int]], costs: list[float]) -> float:
+    # Memoised DFS over the successors, for comparison.
+    successors = [[] for _ in range(n_nodes)]
+    for source, target in edges:
+        successors[source].append(target)
+
+    best = {}
+
+    def heaviest(v: int) -> float:
+        if v not in best:
+            best[v] = costs[v] + max((heaviest(u) for u in successors[v]), default=0)
+        return best[v]
+
+    return max(heaviest(v) for v in range(n_nodes))
+
+
+def test_critical_path_matches_search():
+    rng = random.Random(0)
+
+    for _ in range(50):
+        n_nodes = rng.randint(1, 30)
+        edges = list({(s, t) for s, t in ((rng.randrange(n_nodes), rng.randrange(n_nodes)) for _ in range(60)) if s < t})
+        graph = CompactGraph([f"n{v}" for v in range(n_nodes)],
+                             array("i", [s for s, _ in edges]), array("i", [t for _, t in edges]))
+        costs = [rng.choice([0, 1, 2.5, 7]) for _ in range(n_nodes)]
+
+        length, path = critical_path(graph, costs)
+        assert length == longest_path_weight(n_nodes, edges, costs)
+        assert sum(costs[v] for v in path) == length
+        assert all((path[i], path[i + 1]) in edges for i in range(len(path) - 1))
+
+        unit_length = graph_stats(graph)["critical_path"]["length"]
+        assert unit_length == longest_path_weight(n_nodes, edges, [1] * n_nodes)
@@ -0,0 +1,133 @@
+from fastapi.testclient import TestClient
+
+from app import crud
+from app.cache import graph_cache, response_cache
+from tests.conftest import as_sets, drop_caches, get_blob
+from tests.test_get_graph import create_test_graph
+
+
+def graph_body(nodes: list[str], edges: list[tuple[str, str]]) -> dict:
+    return {
+        "nodes": [{"name": node} for node in nodes],
+        "edges": [{"source": source, "target": target} for source, target in edges],
+    }
+
+
+def test_create_graphs_batch(test_client: TestClient):
+    graphs = [
+        graph_body(["a", "b", "c"], [("a", "b"), ("b", "c")]),
+        graph_body(["x"], []),
+        graph_body(["a", "b"], [("b", "a")]),
+    ]
+
+    response = test_client.post("/api/graphs/batch", json={"graphs": graphs})
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert len(results) == 3
+    assert len({result["id"] for result in results}) == 3
+
+    for result, (nodes, edges) in zip(results, [({"a", "b", "c"}, {("a", "b"), ("b", "c")}),
+                                                ({"x"}, set()), ({"a", "b"}, {("b", "a")})]):
+        graph_cache.invalidate(result["id"])
+        response = test_client.get(f"/api/graph/{result['id']}/")
+        assert as_sets(response.json()) == (nodes, edges)
+
+
+def test_create_graphs_batch_reports_invalid_graphs(test_client: TestClient):
+    graphs = [
+        graph_body(["a", "b"], [("a", "b")]),
+        graph_body(["a", "b", "c"], [("a", "b"), ("b", "c"), ("c", "a")]),
+        graph_body(["a"], [("a", "z")]),
+        graph_body(["c", "d"], [("c", "d")]),
+    ]
+
+    response = test_client.post("/api/graphs/batch", json={"graphs": graphs})
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert results[1]["id"] is None
+    assert results[1]["detail"][0]["msg"] == "Graph is not DAG"
+    assert results[1]["detail"][0]["loc"] == ["body", "graphs", "1", "edges"]
+    assert results[2]["detail"][0]["loc"] == ["body", "graphs", "2", "edges", "target"]
+
+    for result, nodes in [(results[0], {"a", "b"}), (results[3], {"c", "d"})]:
+        assert result["detail"] is None
+        response = test_client.get(f"/api/graph/{result['id']}/")
+        assert as_sets(response.json())[0] == nodes
+
+
+def test_create_graphs_batch_reports_invalid_nodes(test_client: TestClient):
+    graphs = [
+        graph_body(["a"], []),
+        graph_body([], []),
+        graph_body(["a", "b1"], []),
+    ]
+
+    response = test_client.post("/api/graphs/batch", json={"graphs": graphs})
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert results[0]["id"] is not None
+    assert results[1]["detail"][0]["msg"] == "Nodes list cannot be empty"
+    assert results[1]["detail"][0]["loc"] == ["body", "graphs", "1", "nodes"]
+    assert results[2]["detail"][0]["msg"] == "String should match pattern '^[a-zA-Z]+$'"
+    assert results[2]["detail"][0]["loc"] == ["body", "graphs", "2", "nodes", "1", "name"]
+
+
+def test_create_graphs_batch_all_invalid(test_client: TestClient):
+    response = test_client.post("/api/graphs/batch", json={"graphs": [graph_body(["a", "a"], [])]})
+    assert response.status_code == 200
+    assert response.json()["results"][0]["detail"][0]["msg"] == "Node a is duplicated in the graph"
+
+    assert test_client.post("/api/graphs/batch", json={"graphs": []}).status_code == 422
+
+
+def test_batch_with_blob_storage(test_client: TestClient, blob_storage):
+    graphs = [graph_body(["a", "b"], [("a", "b")]), graph_body(["c", "d", "e"], [("d", "e")])]
+    results = test_client.post("/api/graphs/batch", json={"graphs": graphs}).json()["results"]
+    ids = [result["id"] for result in results]
+
+    assert all(get_blob(test_client, graph_id) is not None for graph_id in ids)
+
+    drop_caches()
+    data = test_client.get("/api/graphs", params={"ids": ",".join(map(str, ids))}).json()
+    assert [as_sets(graph) for graph in data["graphs"]] == [({"a", "b"}, {("a", "b")}), ({"c", "d", "e"}, {("d", "e")})]
+
+
+def test_read_graphs(test_client: TestClient):
+    first = create_test_graph(test_client, ["a", "b"], [("a", "b")])
+    second = create_test_graph(test_client, ["c", "d", "e"], [("c", "d"), ("c", "e")])
+    single = test_client.get(f"/api/graph/{second}/").json()
+
+    # One from the cache, one read from the database.
+    graph_cache.invalidate(first)
+    response_cache.invalidate(first)
+
+    response = test_client.get(f"/api/graphs?ids={second},9999,{first},{second}")
+    assert response.status_code == 200
+
+    data = response.json()
+    assert [graph["id"] for graph in data["graphs"]] == [second, first]
+    assert data["graphs"][0] == single
+    assert as_sets(data["graphs"][1]) == ({"a", "b"}, {("a", "b")})
+    assert data["missing"] == [9999]
+
+
+def test_read_graphs_rows_in_one_pass(test_client: TestClient, monkeypatch):
+    ids = [create_test_graph(test_client, ["a", "b", "c"], [("a", "b"), ("a", "c")]) for _ in range(5)]
+    for graph_id in ids:
+        graph_cache.invalidate(graph_id)
+    monkeypatch.setattr(crud, "GRAPH_STORAGE", "rows")
+
+    response = test_client.get("/api/graphs", params={"ids": ",".join(map(str, ids))})
+
+    assert [as_sets(graph) for graph in response.json()["graphs"]] == [({"a", "b", "c"}, {("a", "b"), ("a", "c")})] * 5
+
+
+def test_read_graphs_invalid_ids(test_client: TestClient, monkeypatch):
+    assert test_client.get("/api/graphs?ids=1,a").status_code == 422
+    assert test_client.get("/api/graphs").status_code == 422
+
+    monkeypatch.setattr(crud, "BATCH_MAX_GRAPHS", 2)
+    assert test_client.get("/api/graphs?ids=1,2,3").status_code == 422
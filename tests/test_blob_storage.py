@@ -0,0 +1,81 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import crud
+from app.blob import BlobFormatError, decode_graph, encode_graph
+from app.graph import CompactGraph
+from app.ordering import TOPOLOGICAL_ORDER
+from tests.conftest import drop_caches, get_blob
+from tests.test_get_graph import create_test_graph
+from tests.test_mutate_graph import add_edges
+
+
+def get_adjacency_list(test_client: TestClient, graph_id: int) -> dict:
+    response = test_client.get(f"/api/graph/{graph_id}/adjacency_list")
+    assert response.status_code == 200
+    return response.json()["adjacency_list"]
+
+
+def test_blob_round_trip():
+    graph = CompactGraph.from_edges(["a", "b", "c", "d"], [("a", "c"), ("b", "c"), ("c", "d")], version=3)
+
+    decoded = decode_graph(encode_graph(graph), 3)
+
+    assert decoded.node_names == graph.node_names
+    assert decoded.version == 3
+    assert decoded.edges() == graph.edges()
+    assert decoded.derived[TOPOLOGICAL_ORDER] == graph.derived[TOPOLOGICAL_ORDER]
+
+
+def test_blob_with_unknown_format():
+    data = encode_graph(CompactGraph.from_edges(["a"], []))
+
+    with pytest.raises(BlobFormatError):
+        decode_graph(b"XXXX" + data[4:], 1)
+
+
+def test_uncached_graph_is_read_from_blob(test_client: TestClient, blob_storage):
+    graph_id = create_test_graph(test_client, ["a", "b", "c"], [("a", "b"), ("b", "c")])
+
+    version, data = get_blob(test_client, graph_id)
+    assert version == 1
+    assert decode_graph(data, version).edges() == [("a", "b"), ("b", "c")]
+
+    drop_caches()
+    assert get_adjacency_list(test_client, graph_id) == {"a": ["b"], "b": ["c"], "c": []}
+    order = test_client.get(f"/api/graph/{graph_id}/topological_order").json()["order"]
+    assert order == ["a", "b", "c"]
+
+
+def test_mutations_rewrite_blob(test_client: TestClient, blob_storage):
+    graph_id = create_test_graph(test_client, ["a", "b", "c"], [("a", "b"), ("b", "c")])
+
+    drop_caches()
+    assert test_client.delete(f"/api/graph/{graph_id}/node/b").status_code == 204
+    version, data = get_blob(test_client, graph_id)
+    assert version == 2
+    assert decode_graph(data, version).node_names == ("a", "c")
+
+    drop_caches()
+    assert add_edges(test_client, graph_id, [("a", "c")]).status_code == 204
+    assert get_blob(test_client, graph_id)[0] == 3
+
+    drop_caches()
+    assert get_adjacency_list(test_client, graph_id) == {"a": ["c"], "c": []}
+
+
+def test_graph_without_blob_is_read_from_rows(test_client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    graph_id = create_test_graph(test_client, ["a", "b"], [("a", "b")])
+    assert get_blob(test_client, graph_id) is None
+
+    monkeypatch.setattr(crud, "GRAPH_STORAGE", crud.BLOB_STORAGE)
+    drop_caches()
+
+    assert get_adjacency_list(test_client, graph_id) == {"a": ["b"], "b": []}
+
+
+def test_deleting_graph_deletes_blob(test_client: TestClient, blob_storage):
+    graph_id = create_test_graph(test_client, ["a"], [])
+
+    assert test_client.delete(f"/api/graph/{graph_id}/node/a").status_code == 204
+    assert get_blob(test_client, graph_id) is None
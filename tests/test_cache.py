@@ -0,0 +1,155 @@
+from array import array
+
+from fastapi.testclient import TestClient
+from app.cache import GraphCache
+from app.graph import CompactGraph
+from tests.test_get_graph import create_test_graph
+
+
+def get_cache_stats(test_client: TestClient) -> dict:
+    response = test_client.get("/api/cache/stats")
+    assert response.status_code == 200
+    return response.json()["graphs"]
+
+
+def make_compact_graph(n_nodes: int) -> CompactGraph:
+    return CompactGraph([f"n{i}" for i in range(n_nodes)], array("i"), array("i"))
+
+
+def test_created_graph_is_served_from_cache(test_client: TestClient):
+    graph_id = create_test_graph(test_client, ["a", "b", "c"], [("a", "b"), ("b", "c")])
+
+    before = get_cache_stats(test_client)
+
+    assert test_client.get(f"/api/graph/{graph_id}").status_code == 200
+    assert test_client.get(f"/api/graph/{graph_id}/adjacency_list").status_code == 200
+    assert test_client.get(f"/api/graph/{graph_id}/reverse_adjacency_list").status_code == 200
+
+    after = get_cache_stats(test_client)
+    assert after["hits"] - before["hits"] == 3
+    assert after["misses"] == before["misses"]
+
+
+def test_delete_node_updates_cached_graph(test_client: TestClient):
+    graph_id = create_test_graph(test_client, ["a", "b", "c"], [("a", "b"), ("b", "c")])
+
+    response = test_client.get(f"/api/graph/{graph_id}/adjacency_list")
+    assert response.json()["adjacency_list"]["b"] == ["c"]
+
+    assert test_client.delete(f"/api/graph/{graph_id}/node/c").status_code == 204
+
+    before = get_cache_stats(test_client)
+
+    response = test_client.get(f"/api/graph/{graph_id}/adjacency_list")
+    assert response.json()["adjacency_list"] == {"a": ["b"], "b": []}
+
+    # the cached graph is patched in place, so the read after the delete
+    # does not go to the database
+    after = get_cache_stats(test_client)
+    assert after["misses"] == before["misses"]
+    assert after["hits"] - before["hits"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = GraphCache(max_entries=2, max_bytes=10 ** 9)
+
+    cache.put(1, make_compact_graph(1))
+    cache.put(2, make_compact_graph(1))
+    assert cache.get(1) is not None
+
+    cache.put(3, make_compact_graph(1))
+
+    assert cache.get(2) is None
+    assert cache.get(1) is not None
+    assert cache.get(3) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_is_bounded_by_bytes():
+    graph = make_compact_graph(100)
+    cache = GraphCache(max_entries=100, max_bytes=graph.nbytes * 2)
+
+    for graph_id in range(5):
+        cache.put(graph_id, make_compact_graph(100))
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert stats["evictions"] == 3
+
+
+def test_cache_counts_derived_data():
+    graph = make_compact_graph(100)
+    other = make_compact_graph(100)
+    cache = GraphCache(max_entries=100, max_bytes=graph.nbytes * 3)
+    cache.put(1, graph)
+    cache.put(2, other)
+
+    graph.derived["closure"] = [1 << 100] * 100
+    assert graph.nbytes > other.nbytes
+    assert cache.stats()["bytes"] == graph.nbytes + other.nbytes
+
+    # Grown past the limit: the least recently used graph goes.
+    other.derived["closure"] = [1 << 100] * 100
+    stats = cache.stats()
+    assert cache.peek(1) is None and cache.peek(2) is other
+    assert stats["bytes"] == other.nbytes <= stats["max_bytes"]
+    assert stats["evictions"] == 1
+
+    del other.derived["closure"]
+    assert cache.stats()["bytes"] == other.nbytes
+
+    # An evicted graph no longer changes the cache's size.
+    graph.derived.clear()
+    assert cache.stats()["bytes"] == other.nbytes
+
+
+def test_stale_read_is_not_cached_after_invalidation():
+    cache = GraphCache(max_entries=10, max_bytes=10 ** 9)
+
+    epoch = cache.epoch
+    cache.invalidate(1)
+    cache.put(1, make_compact_graph(1), epoch)
+
+    assert cache.get(1) is None
+
+
+def test_etag_not_modified(test_client: TestClient):
+    graph_id = create_test_graph(test_client, ["a", "b"], [("a", "b")])
+
+    for url in (f"/api/graph/{graph_id}", f"/api/graph/{graph_id}/adjacency_list",
+                f"/api/graph/{graph_id}/reverse_adjacency_list"):
+        response = test_client.get(url)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+
+        response = test_client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+
+def test_etag_changes_after_delete(test_client: TestClient):
+    graph_id = create_test_graph(test_client, ["a", "b", "c"], [("a", "b"), ("b", "c")])
+
+    response = test_client.get(f"/api/graph/{graph_id}/adjacency_list")
+    etag = response.headers["etag"]
+
+    assert test_client.delete(f"/api/graph/{graph_id}/node/c").status_code == 204
+
+    response = test_client.get(f"/api/graph/{graph_id}/adjacency_list", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json() == {"adjacency_list": {"a": ["b"], "b": []}}
+
+
+def test_repeated_reads_use_response_cache(test_client: TestClient):
+    graph_id = create_test_graph(test_client, ["a", "b"], [("a", "b")])
+
+    first = test_client.get(f"/api/graph/{graph_id}/adjacency_list")
+    before = test_client.get("/api/cache/stats").json()["responses"]
+    second = test_client.get(f"/api/graph/{graph_id}/adjacency_list")
+    after = test_client.get("/api/cache/stats").json()["responses"]
+
+    assert first.content == second.content
+    assert after["hits"] - before["hits"] == 1
@@ -56,6 +56,20 @@ def test_create_graph_with_cycle(test_client: TestClient):
     assert data['detail'][0]['msg'] == "Graph is not DAG"
 
 
+def test_create_graph_with_cycle_reports_cycle(test_client: TestClient):
+    response = post_graph(test_client, ["a", "b", "c", "d"], [
+                          ("a", "b"), ("b", "c"), ("c", "d"), ("d", "b")])
+
+    assert response.status_code == 422
+
+    data = response.json()
+    cycle = data['detail'][0]['ctx']['cycle']
+    assert sorted(cycle) == ["b", "c", "d"]
+    # each node of the witness points to the next one
+    edges = {("b", "c"), ("c", "d"), ("d", "b")}
+    assert all((cycle[i], cycle[(i + 1) % len(cycle)]) in edges for i in range(len(cycle)))
+
+
 def test_create_graph_with_duplicate_edges(test_client: TestClient):
     response = post_graph(test_client, ["a", "b", "c"], [
                           ("a", "b"), ("b", "c"), ("a", "b")])
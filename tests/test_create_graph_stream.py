@@ -0,0 +1,108 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.cache import graph_cache, response_cache
+
+
+def post_graph_ndjson(test_client: TestClient, lines: list[dict]):
+    body = "\n".join(json.dumps(line) for line in lines) + "\n"
+    return test_client.post("/api/graph/stream", content=body.encode(),
+                            headers={"Content-Type": "application/x-ndjson"})
+
+
+def test_stream_create_graph(test_client: TestClient):
+    response = post_graph_ndjson(test_client, [
+        {"name": "a"}, {"name": "b"}, {"source": "a", "target": "b"},
+        {"source": "b", "target": "c"}, {"name": "c"},
+    ])
+
+    assert response.status_code == 201
+    graph_id = response.json()["id"]
+
+    response = test_client.get(f"/api/graph/{graph_id}/adjacency_list")
+    assert response.json()["adjacency_list"] == {"a": ["b"], "b": ["c"], "c": []}
+
+
+def test_stream_create_graph_in_small_chunks(test_client: TestClient):
+    body = b'{"name": "a"}\n{"name": "b"}\n\n{"source": "a", "target": "b"}'
+
+    def chunks():
+        for i in range(0, len(body), 3):
+            yield body[i:i + 3]
+
+    response = test_client.post("/api/graph/stream", content=chunks(),
+                                headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.status_code == 201
+    graph_id = response.json()["id"]
+    data = test_client.get(f"/api/graph/{graph_id}").json()
+    assert data["edges"] == [{"source": "a", "target": "b"}]
+
+
+def test_stream_create_graph_with_cycle(test_client: TestClient):
+    response = post_graph_ndjson(test_client, [
+        {"name": "a"}, {"name": "b"}, {"source": "a", "target": "b"}, {"source": "b", "target": "a"},
+    ])
+
+    assert response.status_code == 422
+    detail = response.json()["detail"][0]
+    assert detail["msg"] == "Graph is not DAG"
+    assert sorted(detail["ctx"]["cycle"]) == ["a", "b"]
+
+
+def test_stream_create_graph_errors(test_client: TestClient):
+    response = post_graph_ndjson(test_client, [{"name": "a"}, {"source": "a", "target": "d"}])
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["msg"] == "Node d not found in the graph"
+
+    response = post_graph_ndjson(test_client, [{"name": "a"}, {"name": "b"},
+                                                {"source": "a", "target": "b"}, {"source": "a", "target": "b"}])
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["msg"] == "There are duplicate edges in the graph"
+
+    response = post_graph_ndjson(test_client, [{"name": "a1"}])
+    assert response.status_code == 422
+    assert response.json()["detail"][0] == {
+        "loc": ["body", "1"], "msg": "String should match pattern '^[a-zA-Z]+$'", "type": "value_error"}
+
+    response = post_graph_ndjson(test_client, [{"name": "a\n"}])
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "1"]
+
+    response = post_graph_ndjson(test_client, [])
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["msg"] == "Nodes list cannot be empty"
+
+    response = test_client.post("/api/graph/stream", content=b'{"name": "a"}\nnot json\n')
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "2"]
+
+
+def test_stream_create_graph_with_several_node_chunks(test_client: TestClient, monkeypatch):
+    from app import crud
+    monkeypatch.setattr(crud, "STREAM_INSERT_CHUNK_SIZE", 2)
+
+    names = ["a", "b", "c", "d", "e"]
+    response = post_graph_ndjson(test_client, [{"name": name} for name in names] + [
+        {"source": source, "target": target} for source, target in zip(names, names[1:])])
+
+    assert response.status_code == 201
+    graph_id = response.json()["id"]
+    adj_list = test_client.get(f"/api/graph/{graph_id}/adjacency_list").json()["adjacency_list"]
+    assert adj_list == {"a": ["b"], "b": ["c"], "c": ["d"], "d": ["e"], "e": []}
+
+
+def test_stream_create_graph_with_forward_reference(test_client: TestClient):
+    # c is numbered by the edge before its own line, after a but before b.
+    response = post_graph_ndjson(test_client, [
+        {"name": "a"}, {"source": "a", "target": "c"}, {"name": "b"}, {"name": "c"},
+    ])
+
+    assert response.status_code == 201
+    graph_id = response.json()["id"]
+
+    graph_cache.clear()
+    response_cache.clear()
+    adj_list = test_client.get(f"/api/graph/{graph_id}/adjacency_list").json()["adjacency_list"]
+    assert adj_list == {"a": ["c"], "b": [], "c": []}
@@ -88,4 +88,46 @@ def test_delete_last_node(test_client: TestClient):
     response = test_client.get(f"/api/graph/{graph_id}")
 
     assert response.status_code == 404
-    assert response.json() == {"message": "Graph entity not found"}
\ No newline at end of file
+    assert response.json() == {"message": "Graph entity not found"}
+
+
+def delete_nodes(test_client: TestClient, graph_id: int, nodes: list[str]):
+    return test_client.request("DELETE", f"/api/graph/{graph_id}/nodes", json={"nodes": nodes})
+
+
+def test_delete_many_nodes(test_client: TestClient):
+    nodes = ["a", "b", "c", "d", "e"]
+    edges = [("a", "b"), ("b", "c"), ("c", "d"), ("a", "e"), ("e", "d")]
+    graph_id = create_test_graph(test_client, nodes, edges)
+
+    response = delete_nodes(test_client, graph_id, ["b", "e", "b"])
+    assert response.status_code == 204
+
+    data = test_client.get(f"/api/graph/{graph_id}").json()
+    assert sorted(node["name"] for node in data["nodes"]) == ["a", "c", "d"]
+    assert [(edge["source"], edge["target"]) for edge in data["edges"]] == [("c", "d")]
+
+
+def test_delete_many_nodes_with_missing_node(test_client: TestClient):
+    graph_id = create_test_graph(test_client, ["a", "b", "c"], [("a", "b"), ("b", "c")])
+
+    response = delete_nodes(test_client, graph_id, ["a", "z"])
+    assert response.status_code == 404
+    assert response.json() == {"message": "Graph entity not found"}
+
+    data = test_client.get(f"/api/graph/{graph_id}").json()
+    assert sorted(node["name"] for node in data["nodes"]) == ["a", "b", "c"]
+    assert len(data["edges"]) == 2
+
+
+def test_delete_all_nodes(test_client: TestClient):
+    graph_id = create_test_graph(test_client, ["a", "b"], [("a", "b")])
+
+    assert delete_nodes(test_client, graph_id, ["a", "b"]).status_code == 204
+    assert test_client.get(f"/api/graph/{graph_id}").status_code == 404
+
+
+def test_delete_empty_nodes_list(test_client: TestClient):
+    graph_id = create_test_graph(test_client, ["a"], [])
+
+    assert delete_nodes(test_client, graph_id, []).status_code == 422
@@ -1,4 +1,8 @@
+import pytest
 from fastapi.testclient import TestClient
+
+from app import serialization
+from app.cache import response_cache
 from tests.test_create_graph import post_graph
 
 
@@ -90,4 +94,26 @@ def test_get_graph_with_no_edges(test_client: TestClient):
     adj_list = data["adjacency_list"]
 
     for node in ["a", "b", "c", "d"]:
-        assert adj_list[node] == []
\ No newline at end of file
+        assert adj_list[node] == []
+
+
+def test_stdlib_json_fallback(test_client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    graph_id = create_test_graph(test_client, ["a", "b", "c"], [("a", "b"), ("a", "c")])
+    paths = [f"/api/graph/{graph_id}/", f"/api/graph/{graph_id}/adjacency_list",
+             f"/api/graph/{graph_id}/levels", f"/api/graph/{graph_id}/node/a/descendants"]
+
+    response_cache.clear()
+    bodies = [test_client.get(path).content for path in paths]
+
+    monkeypatch.setattr(serialization, "orjson", None)
+    response_cache.clear()
+    assert [test_client.get(path).content for path in paths] == bodies
+
+
+def test_pre_encoded_routes_keep_response_schema(test_client: TestClient):
+    paths = test_client.get("/openapi.json").json()["paths"]
+
+    for path, model in [("/api/graph/{graph_id}/", "GraphReadResponse"),
+                        ("/api/graph/{graph_id}/node/{node_name}/descendants", "NodesResponse")]:
+        schema = paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert schema == {"$ref": f"#/components/schemas/{model}"}
@@ -0,0 +1,36 @@
+from array import array
+
+from app.graph import CompactGraph
+
+
+def test_compact_graph_csr():
+    graph = CompactGraph.from_edges(["a", "b", "c", "d"], [("a", "c"), ("b", "c"), ("a", "b"), ("c", "d")])
+
+    assert graph.n_nodes == 4
+    assert graph.n_edges == 4
+    assert sorted(graph.successors(graph.node_index["a"])) == [1, 2]
+    assert sorted(graph.predecessors(graph.node_index["c"])) == [0, 1]
+    assert sorted(graph.edges()) == [("a", "b"), ("a", "c"), ("b", "c"), ("c", "d")]
+
+
+def test_compact_graph_adjacency_lists():
+    graph = CompactGraph.from_edges(["a", "b", "c"], [("a", "b"), ("a", "c")])
+
+    assert graph.adjacency_list() == {"a": ["b", "c"], "b": [], "c": []}
+    assert graph.adjacency_list(transpose=True) == {"a": [], "b": ["a"], "c": ["a"]}
+
+
+
+def test_with_additions():
+    graph = CompactGraph.from_edges(["a", "b", "c"], [("a", "b"), ("b", "c")])
+    sources = array("i", [3, 0, 2, 0])
+    targets = array("i", [0, 2, 3, 3])
+
+    extended = graph.with_additions(["d"], sources, targets, 2)
+
+    assert extended.node_names == ("a", "b", "c", "d")
+    assert extended.version == 2
+    assert extended.node_index["d"] == 3
+    assert sorted(extended.edges()) == sorted([("a", "b"), ("b", "c"), ("d", "a"), ("a", "c"), ("c", "d"), ("a", "d")])
+    assert list(extended.predecessors(3)) == [0, 2]
+    assert graph.n_edges == 2
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import db
+from app.cache import graph_cache, response_cache
+from app.metrics import Histogram, Registry, graph_size_label
+from app.settings import DATABASE_URL
+from tests.test_get_graph import create_test_graph
+
+
+def parse_metrics(body: str) -> dict[str, float]:
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in body.splitlines() if line and not line.startswith("#")
+    }
+
+
+def test_histogram_rendering():
+    registry = Registry()
+    histogram = registry.register(Histogram("wait_seconds", "Wait.", labels=("route",), buckets=(0.1, 1.0)))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5, "/a")
+
+    body = registry.render()
+
+    assert "# TYPE wait_seconds histogram" in body
+    assert parse_metrics(body) == {
+        'wait_seconds_bucket{route="/a",le="0.1"}': 1,
+        'wait_seconds_bucket{route="/a",le="1"}': 2,
+        'wait_seconds_bucket{route="/a",le="+Inf"}': 3,
+        'wait_seconds_count{route="/a"}': 3,
+        'wait_seconds_sum{route="/a"}': 5.55,
+    }
+
+
+def test_pool_metrics(test_client: TestClient):
+    before = parse_metrics(test_client.get("/metrics").text)
+
+    graph_id = create_test_graph(test_client, ["a", "b"], [("a", "b")])
+    assert test_client.get(f"/api/graph/{graph_id}/stream").status_code == 200
+
+    response = test_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    after = parse_metrics(response.text)
+    assert after["db_pool_wait_seconds_count"] >= before.get("db_pool_wait_seconds_count", 0) + 2
+    assert after["db_pool_size"] == db.DATABASE_POOL_SIZE
+    assert after["db_pool_checked_out"] == 0
+    assert "db_pool_checked_in" in after and "db_pool_overflow" in after
+
+
+def test_echo_is_off_by_default():
+    assert db.engine.echo is False
+
+
+@pytest.mark.skipif(db.engine.dialect.name != "postgresql", reason="statement_timeout is a PostgreSQL setting")
+def test_statement_timeout(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(db, "DATABASE_STATEMENT_TIMEOUT_MS", 1500)
+    args = db.connect_args()
+    assert args["server_settings"] == {"statement_timeout": "1500"}
+
+    async def show_timeout():
+        engine = create_async_engine(DATABASE_URL, connect_args=args)
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SHOW statement_timeout"))
+            value = result.scalar()
+        await engine.dispose()
+        return value
+
+    assert asyncio.run(show_timeout()) == "1500ms"
+
+
+def test_graph_size_label():
+    assert graph_size_label(0) == "<1k"
+    assert graph_size_label(999) == "<1k"
+    assert graph_size_label(1000) == "<10k"
+    assert graph_size_label(5_000_000) == ">=1M"
+
+
+def test_request_latency_per_route(test_client: TestClient):
+    graph_id = create_test_graph(test_client, ["a", "b"], [("a", "b")])
+    test_client.get(f"/api/graph/{graph_id}/adjacency_list")
+    test_client.get("/api/nothing/here")
+
+    metrics = parse_metrics(test_client.get("/metrics").text)
+
+    route = 'method="GET",route="/api/graph/{graph_id}/adjacency_list",status="200"'
+    assert metrics[f"http_request_duration_seconds_count{{{route}}}"] >= 1
+    assert metrics[f'http_request_duration_seconds_bucket{{{route},le="+Inf"}}'] >= 1
+    assert metrics['http_request_duration_seconds_count{method="POST",route="/api/graph/",status="201"}'] >= 1
+    assert metrics['http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}'] >= 1
+
+
+def test_stage_timings(test_client: TestClient):
+    before = parse_metrics(test_client.get("/metrics").text)
+
+    graph_id = create_test_graph(test_client, ["a", "b"], [("a", "b")])
+    graph_cache.clear()
+    response_cache.clear()
+    assert test_client.get(f"/api/graph/{graph_id}").status_code == 200
+
+    after = parse_metrics(test_client.get("/metrics").text)
+
+    for stage in ("validate", "cycle-check", "insert-nodes", "insert-edges", "fetch", "build-view", "serialize"):
+        key = f'dag_stage_duration_seconds_count{{stage="{stage}",graph_size="<1k"}}'
+        assert after[key] == before.get(key, 0) + 1, stage
@@ -0,0 +1,145 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.graph import CompactGraph
+from app.ordering import extend_topological_order, get_topological_order
+from app.validation import GraphValidationError, resolve_additions
+from tests.test_get_graph import create_test_graph
+from tests.test_ordering import assert_topological
+
+
+def add_nodes(test_client: TestClient, graph_id: int, nodes: list[str]):
+    return test_client.post(f"/api/graph/{graph_id}/nodes", json={"nodes": [{"name": name} for name in nodes]})
+
+
+def add_edges(test_client: TestClient, graph_id: int, edges: list[tuple[str, str]]):
+    return test_client.post(f"/api/graph/{graph_id}/edges",
+                            json={"edges": [{"source": source, "target": target} for source, target in edges]})
+
+
+def get_edges(test_client: TestClient, graph_id: int) -> set[tuple[str, str]]:
+    data = test_client.get(f"/api/graph/{graph_id}").json()
+    return {(edge["source"], edge["target"]) for edge in data["edges"]}
+
+
+def test_add_nodes_and_edges(test_client: TestClient):
+    graph_id = create_test_graph(test_client, ["a", "b"], [("a", "b")])
+
+    assert add_nodes(test_client, graph_id, ["c", "d"]).status_code == 204
+    assert add_edges(test_client, graph_id, [("b", "c"), ("d", "a")]).status_code == 204
+
+    edges = {("a", "b"), ("b", "c"), ("d", "a")}
+    assert get_edges(test_client, graph_id) == edges
+
+    order = test_client.get(f"/api/graph/{graph_id}/topological_order").json()["order"]
+    assert sorted(order) == ["a", "b", "c", "d"]
+    assert_topological(order, edges)
+
+    levels = test_client.get(f"/api/graph/{graph_id}/levels").json()["levels"]
+    assert levels == {"d": 0, "a": 1, "b": 2, "c": 3}
+
+
+def test_add_edges_bumps_etag(test_client: TestClient):
+    graph_id = create_test_graph(test_client, ["a", "b"], [])
+    etag = test_client.get(f"/api/graph/{graph_id}").headers["ETag"]
+
+    assert add_edges(test_client, graph_id, [("a", "b")]).status_code == 204
+
+    response = test_client.get(f"/api/graph/{graph_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_add_edge_with_cycle(test_client: TestClient):
+    graph_id = create_test_graph(test_client, ["a", "b", "c"], [("a", "b"), ("b", "c")])
+
+    response = add_edges(test_client, graph_id, [("a", "c"), ("c", "a")])
+    assert response.status_code == 422
+    error = response.json()["detail"][0]
+    assert error["msg"] == "Graph is not DAG"
+    assert set(error["ctx"]["cycle"]) in ({"a", "c"}, {"a", "b", "c"})
+
+    assert get_edges(test_client, graph_id) == {("a", "b"), ("b", "c")}
+
+
+def test_add_self_loop(test_client: TestClient):
+    graph_id = create_test_graph(test_client, ["a"], [])
+
+    response = add_edges(test_client, graph_id, [("a", "a")])
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["ctx"] == {"cycle": ["a"]}
+
+
+@pytest.mark.parametrize("edges, message", [
+    ([("a", "b")], "There are duplicate edges in the graph"),
+    ([("b", "c"), ("b", "c")], "There are duplicate edges in the graph"),
+    ([("a", "z")], "Node z not found in the graph"),
+])
+def test_add_invalid_edges(test_client: TestClient, edges, message):
+    graph_id = create_test_graph(test_client, ["a", "b", "c"], [("a", "b")])
+
+    response = add_edges(test_client, graph_id, edges)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["msg"] == message
+
+
+def test_add_duplicate_node(test_client: TestClient):
+    graph_id = create_test_graph(test_client, ["a"], [])
+
+    response = add_nodes(test_client, graph_id, ["a"])
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["msg"] == "Node a is duplicated in the graph"
+
+
+def test_add_to_missing_graph(test_client: TestClient):
+    assert add_nodes(test_client, 10 ** 9, ["a"]).status_code == 404
+    assert add_edges(test_client, 10 ** 9, [("a", "b")]).status_code == 404
+
+
+def test_concurrent_additions(test_client: TestClient):
+    names = [f"n{chr(ord('a') + i)}" for i in range(16)]
+    graph_id = create_test_graph(test_client, ["root"] + names, [])
+
+    with ThreadPoolExecutor(8) as executor:
+        responses = list(executor.map(lambda name: add_edges(test_client, graph_id, [("root", name)]), names))
+
+    assert all(response.status_code == 204 for response in responses)
+    assert get_edges(test_client, graph_id) == {("root", name) for name in names}
+    assert test_client.get(f"/api/graph/{graph_id}").headers["ETag"] == f'"{graph_id}-{len(names) + 1}"'
+
+
+def test_extend_topological_order_random():
+    rng = random.Random(7)
+
+    for _ in range(50):
+        n_nodes = rng.randint(2, 30)
+        rank = list(range(n_nodes))
+        rng.shuffle(rank)
+        pairs = {(u, v) for u in range(n_nodes) for v in range(n_nodes) if rank[u] < rank[v] and rng.random() < 0.15}
+        pairs = list(pairs)
+        rng.shuffle(pairs)
+        split = len(pairs) // 2
+
+        node_names = [f"n{chr(ord('a') + i // 26)}{chr(ord('a') + i % 26)}" for i in range(n_nodes)]
+        kept = n_nodes - rng.randint(0, 3)
+        old_edges = [(node_names[u], node_names[v]) for u, v in pairs[:split] if u < kept and v < kept]
+        new_edges = [(node_names[u], node_names[v]) for u, v in pairs if (node_names[u], node_names[v]) not in old_edges]
+
+        old = CompactGraph.from_edges(node_names[:kept], old_edges)
+        get_topological_order(old)
+        sources, targets = resolve_additions(old, node_names[kept:], new_edges)
+        new = old.with_additions(node_names[kept:], sources, targets, 2)
+
+        order = extend_topological_order(old, new, sources, targets)
+        assert sorted(order) == list(range(n_nodes))
+        assert_topological([new.node_names[v] for v in order], old_edges + new_edges)
+
+        if new_edges:
+            source, target = new_edges[0]
+            sources, targets = resolve_additions(new, [], [(target, source)])
+            with pytest.raises(GraphValidationError) as error:
+                extend_topological_order(new, new.with_additions([], sources, targets, 3), sources, targets)
+            assert target in error.value.ctx["cycle"] and source in error.value.ctx["cycle"]
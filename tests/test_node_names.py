@@ -0,0 +1,124 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app import crud
+from app.cache import NameCache, graph_cache, name_cache, response_cache
+from app.db import engine
+from app.models import Node, NodeName
+from app.shared_cache import shared_cache
+from tests.conftest import as_sets, drop_caches, run
+from tests.test_create_graph_stream import post_graph_ndjson
+from tests.test_get_graph import create_test_graph
+from tests.test_mutate_graph import add_edges, add_nodes
+from tests.test_stream_graph import read_ndjson
+
+
+@pytest.fixture
+def interned_names(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(crud, "NODE_NAMES", crud.INTERNED_NAMES)
+
+
+def stored_names(test_client: TestClient, graph_id: int) -> list[tuple[str | None, int | None]]:
+    async def fetch():
+        async with engine.connect() as conn:
+            result = await conn.execute(select(Node.name, Node.name_id).where(Node.graph_id == graph_id))
+            return result.tuples().all()
+
+    return run(test_client, fetch)
+
+
+def count_interned(test_client: TestClient, name: str) -> int:
+    async def fetch():
+        async with engine.connect() as conn:
+            result = await conn.execute(select(func.count()).where(NodeName.name == name))
+            return result.scalar()
+
+    return run(test_client, fetch)
+
+
+def test_interned_graph_round_trip(test_client: TestClient, interned_names, monkeypatch: pytest.MonkeyPatch):
+    graph_id = create_test_graph(test_client, ["a", "b", "c"], [("a", "b"), ("b", "c")])
+
+    assert all(name is None and name_id is not None for name, name_id in stored_names(test_client, graph_id))
+
+    drop_caches()
+    response = test_client.get(f"/api/graph/{graph_id}/")
+    assert as_sets(response.json()) == ({"a", "b", "c"}, {("a", "b"), ("b", "c")})
+
+    # Read from the database again and decoded from the name cache.
+    monkeypatch.setattr(shared_cache, "store", None)
+    graph_cache.clear()
+    response_cache.clear()
+    before = name_cache.stats()
+    assert as_sets(test_client.get(f"/api/graph/{graph_id}/").json()) == ({"a", "b", "c"}, {("a", "b"), ("b", "c")})
+    assert name_cache.stats()["hits"] - before["hits"] == 3
+    assert name_cache.stats()["misses"] == before["misses"]
+    assert test_client.get("/api/cache/stats").json()["names"]["entries"] >= 3
+
+
+def test_names_are_shared_between_graphs(test_client: TestClient, interned_names):
+    name = "sharedtaskname"
+    first = create_test_graph(test_client, [name, "x"], [(name, "x")])
+    second = create_test_graph(test_client, ["y", name], [("y", name)])
+
+    assert count_interned(test_client, name) == 1
+
+    first_ids = {name_id for _, name_id in stored_names(test_client, first)}
+    second_ids = {name_id for _, name_id in stored_names(test_client, second)}
+    assert len(first_ids & second_ids) == 1
+
+
+def test_interned_batch_and_stream_create(test_client: TestClient, interned_names):
+    graphs = [{"nodes": [{"name": "a"}, {"name": "b"}], "edges": [{"source": "a", "target": "b"}]},
+              {"nodes": [{"name": "b"}, {"name": "c"}], "edges": [{"source": "c", "target": "b"}]}]
+    results = test_client.post("/api/graphs/batch", json={"graphs": graphs}).json()["results"]
+
+    response = post_graph_ndjson(test_client, [{"name": "d"}, {"name": "a"}, {"source": "d", "target": "a"}])
+    ids = [result["id"] for result in results] + [response.json()["id"]]
+
+    drop_caches()
+    data = test_client.get("/api/graphs", params={"ids": ",".join(map(str, ids))}).json()
+    assert [as_sets(graph) for graph in data["graphs"]] == [
+        ({"a", "b"}, {("a", "b")}), ({"b", "c"}, {("c", "b")}), ({"d", "a"}, {("d", "a")})]
+
+
+def test_mixed_graph(test_client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    # Written inline, then extended with interned names.
+    graph_id = create_test_graph(test_client, ["a", "b"], [("a", "b")])
+    monkeypatch.setattr(crud, "NODE_NAMES", crud.INTERNED_NAMES)
+
+    assert add_nodes(test_client, graph_id, ["c", "d"]).status_code == 204
+    assert add_edges(test_client, graph_id, [("b", "c"), ("c", "d")]).status_code == 204
+    assert add_nodes(test_client, graph_id, ["a"]).status_code == 422
+
+    drop_caches()
+    monkeypatch.setattr(crud, "REACHABILITY_MEMORY_MAX_EDGES", -1)
+
+    assert test_client.get(f"/api/graph/{graph_id}/node/b/descendants").json()["nodes"] == ["c", "d"]
+    subgraph = test_client.get(f"/api/graph/{graph_id}/node/c/subgraph", params={"depth": 1}).json()
+    assert as_sets(subgraph) == ({"b", "c", "d"}, {("b", "c"), ("c", "d")})
+
+    streamed = read_ndjson(test_client.get(f"/api/graph/{graph_id}/stream", params={"format": "ndjson"}).content)
+    assert {item["name"] for item in streamed if "name" in item} == {"a", "b", "c", "d"}
+    assert {(item["source"], item["target"]) for item in streamed if "source" in item} == {("a", "b"), ("b", "c"), ("c", "d")}
+
+    response = test_client.get(f"/api/graph/{graph_id}/adjacency_list/stream")
+    assert response.json()["adjacency_list"] == {"a": ["b"], "b": ["c"], "c": ["d"], "d": []}
+
+    assert test_client.delete(f"/api/graph/{graph_id}/node/a").status_code == 204
+    assert test_client.delete(f"/api/graph/{graph_id}/node/d").status_code == 204
+    drop_caches()
+    assert as_sets(test_client.get(f"/api/graph/{graph_id}/").json()) == ({"b", "c"}, {("b", "c")})
+
+
+def test_name_cache_evicts_least_recently_used():
+    cache = NameCache(max_entries=2)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.get_id("a") == 1
+
+    cache.put(3, "c")
+
+    assert cache.get_name(2) is None and cache.get_id("b") is None
+    assert cache.get_name(1) == "a" and cache.get_id("c") == 3
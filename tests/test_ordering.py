@@ -0,0 +1,78 @@
+import random
+
+from fastapi.testclient import TestClient
+
+from app.graph import CompactGraph
+from app.ordering import LEVELS, TOPOLOGICAL_ORDER, carry_over_ordering, get_levels, get_topological_order
+from tests.test_get_graph import create_test_graph
+
+NODES = ["a", "b", "c", "d", "e"]
+EDGES = [("a", "b"), ("b", "c"), ("a", "c"), ("c", "d"), ("e", "d")]
+
+
+def assert_topological(order: list[str], edges: list[tuple[str, str]]):
+    position = {name: i for i, name in enumerate(order)}
+    for source, target in edges:
+        assert position[source] < position[target]
+
+
+def test_topological_order(test_client: TestClient):
+    graph_id = create_test_graph(test_client, NODES, EDGES)
+
+    response = test_client.get(f"/api/graph/{graph_id}/topological_order")
+    assert response.status_code == 200
+    order = response.json()["order"]
+    assert sorted(order) == NODES
+    assert_topological(order, EDGES)
+
+
+def test_levels(test_client: TestClient):
+    graph_id = create_test_graph(test_client, NODES, EDGES)
+
+    response = test_client.get(f"/api/graph/{graph_id}/levels")
+    assert response.status_code == 200
+    assert response.json() == {"levels": {"a": 0, "b": 1, "c": 2, "d": 3, "e": 0}}
+
+
+def test_ordering_after_delete(test_client: TestClient):
+    graph_id = create_test_graph(test_client, NODES, EDGES)
+    test_client.get(f"/api/graph/{graph_id}/levels")
+
+    assert test_client.delete(f"/api/graph/{graph_id}/node/b").status_code == 204
+
+    response = test_client.get(f"/api/graph/{graph_id}/levels")
+    assert response.json() == {"levels": {"a": 0, "c": 1, "d": 2, "e": 0}}
+
+    response = test_client.get(f"/api/graph/{graph_id}/topological_order")
+    order = response.json()["order"]
+    assert sorted(order) == ["a", "c", "d", "e"]
+    assert_topological(order, [("a", "c"), ("c", "d"), ("e", "d")])
+
+
+def test_ordering_nonexistent_graph(test_client: TestClient):
+    assert test_client.get("/api/graph/9999/topological_order").status_code == 404
+    assert test_client.get("/api/graph/9999/levels").status_code == 404
+
+
+def test_carry_over_matches_recomputation():
+    rng = random.Random(0)
+
+    for _ in range(50):
+        n = rng.randint(2, 30)
+        names = [f"n{i}" for i in range(n)]
+        edges = {tuple(sorted(rng.sample(range(n), 2))) for _ in range(rng.randint(0, 3 * n))}
+        graph = CompactGraph.from_edges(names, [(names[s], names[t]) for s, t in edges])
+        get_levels(graph)
+
+        removed = set(rng.sample(range(n), rng.randint(1, n - 1)))
+        new_graph, new_index = graph.without_nodes(removed, version=2)
+        carry_over_ordering(graph, new_graph, new_index, removed)
+
+        carried_levels = new_graph.derived[LEVELS]
+        carried_order = new_graph.derived[TOPOLOGICAL_ORDER]
+
+        fresh = CompactGraph.from_edges(list(new_graph.node_names), new_graph.edges())
+        assert carried_levels == get_levels(fresh)
+        position = {v: i for i, v in enumerate(carried_order)}
+        assert all(position[s] < position[t] for s, t in new_graph.edge_pairs())
+        assert sorted(carried_order) == sorted(get_topological_order(fresh))
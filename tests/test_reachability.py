@@ -0,0 +1,96 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import crud, reachability
+from app.cache import graph_cache
+from app.graph import CompactGraph
+from app.ordering import TOPOLOGICAL_ORDER
+from tests.test_get_graph import create_test_graph
+
+NODES = ["a", "b", "c", "d", "e", "f"]
+EDGES = [("a", "b"), ("a", "c"), ("b", "d"), ("c", "d"), ("d", "e")]
+
+
+@pytest.fixture(params=["closure", "search", "cte"])
+def strategy(request, monkeypatch):
+    if request.param == "search":
+        monkeypatch.setattr(reachability, "REACHABILITY_CLOSURE_MAX_NODES", 0)
+    elif request.param == "cte":
+        monkeypatch.setattr(crud, "REACHABILITY_MEMORY_MAX_EDGES", -1)
+    return request.param
+
+
+def create_graph(test_client: TestClient, strategy: str) -> int:
+    graph_id = create_test_graph(test_client, NODES, EDGES)
+    if strategy == "cte":
+        graph_cache.invalidate(graph_id)
+    return graph_id
+
+
+def test_descendants(test_client: TestClient, strategy: str):
+    graph_id = create_graph(test_client, strategy)
+
+    response = test_client.get(f"/api/graph/{graph_id}/node/a/descendants")
+    assert response.status_code == 200
+    assert sorted(response.json()["nodes"]) == ["b", "c", "d", "e"]
+
+    response = test_client.get(f"/api/graph/{graph_id}/node/f/descendants")
+    assert response.json() == {"nodes": []}
+
+
+def test_ancestors(test_client: TestClient, strategy: str):
+    graph_id = create_graph(test_client, strategy)
+
+    response = test_client.get(f"/api/graph/{graph_id}/node/d/ancestors")
+    assert response.status_code == 200
+    assert sorted(response.json()["nodes"]) == ["a", "b", "c"]
+
+
+def test_reachable(test_client: TestClient, strategy: str):
+    graph_id = create_graph(test_client, strategy)
+
+    response = test_client.get(f"/api/graph/{graph_id}/node/a/reachable/e")
+    assert response.status_code == 200
+    assert response.json() == {"source": "a", "target": "e", "reachable": True}
+
+    response = test_client.get(f"/api/graph/{graph_id}/node/e/reachable/a")
+    assert response.json()["reachable"] is False
+
+    response = test_client.get(f"/api/graph/{graph_id}/node/b/reachable/c")
+    assert response.json()["reachable"] is False
+
+    response = test_client.get(f"/api/graph/{graph_id}/node/f/reachable/f")
+    assert response.json()["reachable"] is True
+
+
+def test_reachability_unknown_node(test_client: TestClient, strategy: str):
+    graph_id = create_graph(test_client, strategy)
+
+    response = test_client.get(f"/api/graph/{graph_id}/node/z/descendants")
+    assert response.status_code == 404
+    assert response.json() == {"message": "Graph entity not found"}
+
+    response = test_client.get(f"/api/graph/{graph_id}/node/a/reachable/z")
+    assert response.status_code == 404
+
+
+def test_reachability_after_delete(test_client: TestClient):
+    graph_id = create_test_graph(test_client, NODES, EDGES)
+
+    response = test_client.get(f"/api/graph/{graph_id}/node/a/descendants")
+    assert sorted(response.json()["nodes"]) == ["b", "c", "d", "e"]
+
+    assert test_client.delete(f"/api/graph/{graph_id}/node/d").status_code == 204
+
+    response = test_client.get(f"/api/graph/{graph_id}/node/a/descendants")
+    assert sorted(response.json()["nodes"]) == ["b", "c"]
+
+
+def test_closure_caches_topological_order():
+    graph = CompactGraph.from_edges(NODES, EDGES)
+
+    reachability.closure(graph, reachability.DESCENDANTS)
+    order = graph.derived[TOPOLOGICAL_ORDER]
+    reachability.closure(graph, reachability.ANCESTORS)
+
+    assert graph.derived[TOPOLOGICAL_ORDER] is order
@@ -0,0 +1,117 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from app.db import engine
+from app.migrations import current_version, migrations, run_migrations
+from app.models import Base, Edge, Node
+from tests.conftest import run
+from tests.test_get_graph import create_test_graph
+
+pytestmark = pytest.mark.skipif(engine.dialect.name != "postgresql",
+                                reason="migrations and query plans are PostgreSQL-specific")
+
+
+async def migrate_scratch_schema(*checks):
+    # DDL is transactional in PostgreSQL, so the scratch schema disappears
+    # with the rollback.
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            await conn.execute(text("CREATE SCHEMA migration_test"))
+            await conn.execute(text("SET LOCAL search_path TO migration_test"))
+            await run_migrations(conn)
+            return [await check(conn) for check in checks]
+        finally:
+            await transaction.rollback()
+
+
+async def constraint_names(conn) -> set[str]:
+    result = await conn.execute(text(
+        "SELECT conname FROM pg_constraint WHERE connamespace = 'migration_test'::regnamespace "
+        "UNION SELECT indexname FROM pg_indexes WHERE schemaname = 'migration_test'"
+    ))
+    return set(result.scalars())
+
+
+async def column_types(conn) -> dict[str, str]:
+    result = await conn.execute(text(
+        "SELECT table_name || '.' || column_name, data_type FROM information_schema.columns "
+        "WHERE table_schema = 'migration_test' AND table_name IN ('graphs', 'nodes', 'edges')"
+    ))
+    return dict(result.tuples().all())
+
+
+async def rerun_migrations(conn) -> int:
+    await run_migrations(conn)
+    return await current_version(conn)
+
+
+def test_migrations_build_model_schema(test_client: TestClient):
+    names, version, types = run(test_client, migrate_scratch_schema, constraint_names, rerun_migrations, column_types)
+
+    expected = {constraint.name for table in Base.metadata.tables.values()
+                for constraint in list(table.constraints) + list(table.indexes) if constraint.name}
+    assert expected <= names
+    assert not {"ix_nodes_name", "ix_nodes_id", "ix_edges_id", "ix_graphs_id"} & names
+
+    assert version == migrations()[-1][0]
+    assert types["nodes.id"] == "integer"
+    assert types["nodes.name"] == "character varying"
+    assert types["nodes.name_id"] == "integer"
+
+
+def test_migrations_bigint_ids(test_client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    migration = dict(migrations())[3]
+    monkeypatch.setattr(migration, "BIGINT_IDS", True)
+
+    types, = run(test_client, migrate_scratch_schema, column_types)
+
+    for column in ("graphs.id", "nodes.id", "nodes.graph_id", "edges.id",
+                   "edges.source_id", "edges.target_id", "edges.graph_id"):
+        assert types[column] == "bigint"
+
+
+async def explain(statement) -> str:
+    sql = statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    async with engine.connect() as conn:
+        async with conn.begin():
+            # The test tables are small enough for a sequential scan to win,
+            # which would hide a missing index.
+            await conn.execute(text("SET LOCAL enable_seqscan = off"))
+            result = await conn.execute(text(f"EXPLAIN {sql}"))
+            return "\n".join(result.scalars())
+
+
+@pytest.mark.parametrize("statement, index", [
+    (lambda graph_id: select(Node.id, Node.name).where(Node.graph_id == graph_id), "uq_nodes_graph_id_"),
+    (lambda graph_id: select(Node.id).where(Node.graph_id == graph_id, Node.name == "a"), "uq_nodes_graph_id_name"),
+    (lambda graph_id: select(Edge.source_id, Edge.target_id).where(Edge.graph_id == graph_id), "_graph_id_"),
+    (lambda graph_id: select(Edge.target_id).where(Edge.graph_id == graph_id, Edge.source_id == 1),
+     "uq_edges_graph_id_source_id_target_id"),
+    (lambda graph_id: select(Edge.source_id).where(Edge.graph_id == graph_id, Edge.target_id == 1),
+     "ix_edges_graph_id_target_id"),
+])
+def test_graph_scoped_queries_use_indexes(test_client: TestClient, statement, index):
+    graph_id = create_test_graph(test_client, ["a", "b", "c"], [("a", "b"), ("b", "c")])
+
+    plan = run(test_client, explain, statement(graph_id))
+
+    assert index in plan
+    assert f"Index Cond: (graph_id = {graph_id})" in plan or f"(graph_id = {graph_id}) AND" in plan
+    assert "Filter" not in plan
+
+
+def test_delete_graph_cascades(test_client: TestClient):
+    graph_id = create_test_graph(test_client, ["a", "b"], [("a", "b")])
+
+    response = test_client.request("DELETE", f"/api/graph/{graph_id}/nodes", json={"nodes": ["a", "b"]})
+    assert response.status_code == 204
+
+    async def count_rows():
+        async with engine.connect() as conn:
+            result = await conn.execute(select(Edge.id).where(Edge.graph_id == graph_id))
+            return len(result.all())
+
+    assert run(test_client, count_rows) == 0
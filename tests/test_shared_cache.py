@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, update
+
+from app.cache import graph_cache, response_cache
+from app.crud import node_name_in
+from app.db import engine
+from app.models import Graph, Node
+from app.shared_cache import INVALIDATION_CHANNEL, MemoryStore, SharedCache, shared_cache
+from tests.conftest import run
+from tests.test_get_graph import create_test_graph
+
+
+@pytest.fixture
+def store(test_client: TestClient):
+    started = not shared_cache.enabled
+    if started:
+        run(test_client, shared_cache.start, MemoryStore(), 60)
+
+    yield shared_cache.store
+
+    if started:
+        run(test_client, shared_cache.stop)
+
+
+def node_names(test_client: TestClient, graph_id: int) -> set[str]:
+    response = test_client.get(f"/api/graph/{graph_id}/")
+    assert response.status_code == 200
+    return {node["name"] for node in response.json()["nodes"]}
+
+
+async def delete_node_elsewhere(graph_id: int, name: str):
+    # What another worker's DELETE leaves in the database.
+    async with engine.begin() as conn:
+        await conn.execute(delete(Node).where(Node.graph_id == graph_id, node_name_in([name])))
+        await conn.execute(update(Graph).where(Graph.id == graph_id).values(version=Graph.version + 1))
+
+
+async def next_message(pubsub) -> dict:
+    async for message in pubsub.listen():
+        if message["type"] == "message":
+            return message
+
+
+async def wait_for(condition):
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+def test_graph_is_shared_between_workers(test_client: TestClient, store):
+    graph_id = create_test_graph(test_client, ["a", "b", "c"], [("a", "b"), ("b", "c")])
+
+    graph_cache.clear()
+    response_cache.clear()
+    first = test_client.get(f"/api/graph/{graph_id}/").content
+
+    # A worker that has never seen the graph.
+    graph_cache.clear()
+    response_cache.clear()
+    before = shared_cache.stats()
+    assert test_client.get(f"/api/graph/{graph_id}/").content == first
+    assert test_client.get(f"/api/graph/{graph_id}/adjacency_list").status_code == 200
+
+    after = shared_cache.stats()
+    assert after["hits"] - before["hits"] == 2
+    assert after["misses"] - before["misses"] == 1
+    assert test_client.get("/api/cache/stats").json()["shared"]["enabled"] is True
+
+
+def test_delete_node_broadcasts_invalidation(test_client: TestClient, store):
+    graph_id = create_test_graph(test_client, ["a", "b", "c"], [("a", "b"), ("b", "c")])
+    pubsub = store.pubsub()
+    run(test_client, pubsub.subscribe, INVALIDATION_CHANNEL)
+
+    assert test_client.delete(f"/api/graph/{graph_id}/node/c").status_code == 204
+
+    message = run(test_client, asyncio.wait_for, next_message(pubsub), 1)
+    assert message["data"].decode() == f"{shared_cache.origin} {graph_id}"
+    run(test_client, pubsub.aclose)
+
+
+def test_invalidation_from_other_worker(test_client: TestClient, store):
+    graph_id = create_test_graph(test_client, ["a", "b", "c"], [("a", "b"), ("b", "c")])
+    assert node_names(test_client, graph_id) == {"a", "b", "c"}
+
+    other_worker = SharedCache()
+    other_worker.store = store
+    run(test_client, delete_node_elsewhere, graph_id, "c")
+
+    # Served from this worker's cache until the broadcast arrives.
+    assert node_names(test_client, graph_id) == {"a", "b", "c"}
+
+    before = shared_cache.stats()["invalidations"]
+    run(test_client, other_worker.announce, graph_id)
+    run(test_client, wait_for, lambda: graph_id not in graph_cache)
+
+    assert shared_cache.stats()["invalidations"] == before + 1
+    assert node_names(test_client, graph_id) == {"a", "b"}
+
+
+def test_own_invalidation_keeps_cache(test_client: TestClient, store):
+    graph_id = create_test_graph(test_client, ["a", "b", "c"], [("a", "b"), ("b", "c")])
+
+    assert test_client.delete(f"/api/graph/{graph_id}/node/c").status_code == 204
+    run(test_client, asyncio.sleep, 0.05)
+
+    assert graph_cache.peek(graph_id) is not None
+    assert node_names(test_client, graph_id) == {"a", "b"}
+
+
+def test_memory_store_expiry():
+    async def check():
+        store = MemoryStore()
+        await store.set("kept", b"1")
+        await store.set("expired", b"2", ex=-1)
+        return await store.get("kept"), await store.get("expired"), await store.get("missing")
+
+    assert asyncio.run(check()) == (b"1", None, None)
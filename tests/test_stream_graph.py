@@ -0,0 +1,58 @@
+import json
+
+from fastapi.testclient import TestClient
+from tests.test_get_graph import create_test_graph
+
+
+def read_ndjson(content: bytes) -> list[dict]:
+    return [json.loads(line) for line in content.splitlines() if line]
+
+
+def test_stream_graph_json_matches_regular_read(test_client: TestClient):
+    graph_id = create_test_graph(test_client, ["a", "b", "c", "d"], [("a", "b"), ("b", "c"), ("a", "c")])
+
+    response = test_client.get(f"/api/graph/{graph_id}/stream")
+    assert response.status_code == 200
+    data = response.json()
+
+    regular = test_client.get(f"/api/graph/{graph_id}").json()
+    assert data["id"] == graph_id
+    assert sorted(node["name"] for node in data["nodes"]) == sorted(node["name"] for node in regular["nodes"])
+    assert sorted(map(tuple, (e.values() for e in data["edges"]))) == \
+        sorted(map(tuple, (e.values() for e in regular["edges"])))
+
+
+def test_stream_graph_ndjson(test_client: TestClient):
+    graph_id = create_test_graph(test_client, ["a", "b"], [("a", "b")])
+
+    response = test_client.get(f"/api/graph/{graph_id}/stream", params={"format": "ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert read_ndjson(response.content) == [{"name": "a"}, {"name": "b"}, {"source": "a", "target": "b"}]
+
+
+def test_stream_adjacency_lists(test_client: TestClient):
+    nodes = ["a", "b", "c", "d"]
+    edges = [("a", "b"), ("a", "c"), ("b", "d"), ("c", "d")]
+    graph_id = create_test_graph(test_client, nodes, edges)
+
+    for view in ("adjacency_list", "reverse_adjacency_list"):
+        regular = test_client.get(f"/api/graph/{graph_id}/{view}").json()["adjacency_list"]
+
+        response = test_client.get(f"/api/graph/{graph_id}/{view}/stream")
+        assert response.status_code == 200
+        streamed = response.json()["adjacency_list"]
+        assert {k: sorted(v) for k, v in streamed.items()} == {k: sorted(v) for k, v in regular.items()}
+
+        response = test_client.get(f"/api/graph/{graph_id}/{view}/stream", params={"format": "ndjson"})
+        lines = read_ndjson(response.content)
+        assert {line["node"]: sorted(line["adjacent"]) for line in lines} == \
+            {k: sorted(v) for k, v in regular.items()}
+
+
+def test_stream_nonexistent_graph(test_client: TestClient):
+    for url in ("/api/graph/9999/stream", "/api/graph/9999/adjacency_list/stream",
+                "/api/graph/9999/reverse_adjacency_list/stream"):
+        response = test_client.get(url)
+        assert response.status_code == 404
+        assert response.json() == {"message": "Graph entity not found"}
@@ -0,0 +1,88 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import crud
+from app.cache import graph_cache
+from tests.test_get_graph import create_test_graph
+
+#   a -> b -> d -> e -> f
+#   c ------> d
+#   a -----------> e
+#   g
+NODES = ["a", "b", "c", "d", "e", "f", "g"]
+EDGES = [("a", "b"), ("b", "d"), ("c", "d"), ("d", "e"), ("e", "f"), ("a", "e")]
+
+
+@pytest.fixture(params=["memory", "cte"])
+def strategy(request, monkeypatch):
+    if request.param == "cte":
+        monkeypatch.setattr(crud, "REACHABILITY_MEMORY_MAX_EDGES", -1)
+    return request.param
+
+
+def create_graph(test_client: TestClient, strategy: str) -> int:
+    graph_id = create_test_graph(test_client, NODES, EDGES)
+    if strategy == "cte":
+        graph_cache.invalidate(graph_id)
+    return graph_id
+
+
+def get_subgraph(test_client: TestClient, graph_id: int, node: str, **params) -> tuple[set[str], set[tuple[str, str]]]:
+    response = test_client.get(f"/api/graph/{graph_id}/node/{node}/subgraph", params=params)
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["id"] == graph_id
+    return {node["name"] for node in data["nodes"]}, {(edge["source"], edge["target"]) for edge in data["edges"]}
+
+
+@pytest.mark.parametrize("direction, depth, nodes, edges", [
+    ("up", 1, {"b", "c", "d"}, {("b", "d"), ("c", "d")}),
+    ("up", None, {"a", "b", "c", "d"}, {("a", "b"), ("b", "d"), ("c", "d")}),
+    ("down", 1, {"d", "e"}, {("d", "e")}),
+    ("down", None, {"d", "e", "f"}, {("d", "e"), ("e", "f")}),
+    ("both", 1, {"b", "c", "d", "e"}, {("b", "d"), ("c", "d"), ("d", "e")}),
+    ("both", 2, {"a", "b", "c", "d", "e", "f"}, {("a", "b"), ("b", "d"), ("c", "d"), ("d", "e"), ("e", "f"), ("a", "e")}),
+    ("both", 0, {"d"}, set()),
+])
+def test_subgraph(test_client: TestClient, strategy: str, direction: str, depth: int | None, nodes, edges):
+    graph_id = create_graph(test_client, strategy)
+    params = {"direction": direction} if depth is None else {"direction": direction, "depth": depth}
+
+    assert get_subgraph(test_client, graph_id, "d", **params) == (nodes, edges)
+
+
+def test_subgraph_shortest_distance(test_client: TestClient, strategy: str):
+    # e is one edge from a directly and three edges along a -> b -> d -> e.
+    graph_id = create_graph(test_client, strategy)
+
+    assert get_subgraph(test_client, graph_id, "a", direction="down", depth=1) == (
+        {"a", "b", "e"}, {("a", "b"), ("a", "e")})
+
+
+def test_subgraph_isolated_node(test_client: TestClient, strategy: str):
+    graph_id = create_graph(test_client, strategy)
+
+    assert get_subgraph(test_client, graph_id, "g") == ({"g"}, set())
+
+
+def test_subgraph_errors(test_client: TestClient, strategy: str):
+    graph_id = create_graph(test_client, strategy)
+
+    assert test_client.get(f"/api/graph/{graph_id}/node/z/subgraph").status_code == 404
+    assert test_client.get("/api/graph/9999/node/a/subgraph").status_code == 404
+    assert test_client.get(f"/api/graph/{graph_id}/node/a/subgraph", params={"direction": "left"}).status_code == 422
+    assert test_client.get(f"/api/graph/{graph_id}/node/a/subgraph", params={"depth": -1}).status_code == 422
+
+
+def test_large_graph_counted_once(test_client: TestClient, monkeypatch):
+    monkeypatch.setattr(crud, "REACHABILITY_MEMORY_MAX_EDGES", -1)
+    graph_id = create_graph(test_client, "cte")
+
+    assert get_subgraph(test_client, graph_id, "d", direction="down") == ({"d", "e", "f"}, {("d", "e"), ("e", "f")})
+    assert graph_id in crud.large_graphs
+
+    # Still answered by CTE, without counting the edges again.
+    monkeypatch.undo()
+    assert get_subgraph(test_client, graph_id, "d", direction="down") == ({"d", "e", "f"}, {("d", "e"), ("e", "f")})
+    assert graph_id not in graph_cache
@@ -0,0 +1,55 @@
+import pytest
+
+from app.graph import CompactGraph
+from app.validation import GraphValidationError, build_compact_graph, topological_order
+
+
+def assert_topological(graph: CompactGraph, order):
+    position = {v: i for i, v in enumerate(order)}
+    assert len(position) == graph.n_nodes
+    for source, target in graph.edge_pairs():
+        assert position[source] < position[target]
+
+
+def test_topological_order():
+    graph = CompactGraph.from_edges(["d", "c", "b", "a"], [("a", "b"), ("b", "c"), ("a", "c"), ("c", "d")])
+
+    assert_topological(graph, topological_order(graph))
+
+
+def test_topological_order_disconnected():
+    graph = CompactGraph.from_edges(["a", "b", "c", "d"], [("b", "a")])
+
+    assert_topological(graph, topological_order(graph))
+
+
+def test_cycle_witness():
+    graph = CompactGraph.from_edges(["a", "b", "c", "d", "e"],
+                                    [("a", "b"), ("b", "c"), ("c", "d"), ("d", "b"), ("d", "e")])
+
+    with pytest.raises(GraphValidationError) as e:
+        topological_order(graph)
+
+    cycle = e.value.ctx["cycle"]
+    assert sorted(cycle) == ["b", "c", "d"]
+    assert cycle[cycle.index("b") - 2] == "c"
+
+
+def test_self_loop_witness():
+    graph = CompactGraph.from_edges(["a", "b"], [("a", "b"), ("b", "b")])
+
+    with pytest.raises(GraphValidationError) as e:
+        topological_order(graph)
+
+    assert e.value.ctx["cycle"] == ["b"]
+
+
+def test_build_compact_graph_errors():
+    with pytest.raises(GraphValidationError, match="Node a is duplicated in the graph"):
+        build_compact_graph(["a", "a"], [])
+
+    with pytest.raises(GraphValidationError, match="Node c not found in the graph"):
+        build_compact_graph(["a", "b"], [("a", "c")])
+
+    with pytest.raises(GraphValidationError, match="There are duplicate edges in the graph"):
+        build_compact_graph(["a", "b"], [("a", "b"), ("a", "b")])
@@ -0,0 +1,103 @@
+import asyncio
+import pickle
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import executor, wire
+from app.validation import GraphValidationError
+from tests.test_create_graph import post_graph
+from tests.test_wire_formats import EDGES, NODES, decode, encode
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    # Sends every create through the process pool.
+    monkeypatch.setattr(executor, "VALIDATION_PROCESSES", 1)
+    monkeypatch.setattr(executor, "VALIDATION_PROCESS_MIN_EDGES", 0)
+    yield
+    executor.shutdown()
+
+
+def test_create_graph_in_pool(test_client: TestClient, pool):
+    response = post_graph(test_client, NODES, EDGES)
+    assert response.status_code == 201
+    assert executor.pool is not None
+
+    response = test_client.get(f"/api/graph/{response.json()['id']}/", headers={"Accept": wire.INT32})
+    assert decode(response) == (set(NODES), set(EDGES))
+
+
+@pytest.mark.parametrize("wire_format", [wire.COMPACT_JSON, wire.INT32])
+def test_create_graph_wire_format_in_pool(test_client: TestClient, pool, wire_format: str):
+    response = test_client.post("/api/graph/", content=encode(wire_format, NODES, EDGES),
+                                headers={"Content-Type": wire_format})
+    assert response.status_code == 201
+
+    response = test_client.get(f"/api/graph/{response.json()['id']}/", headers={"Accept": wire.INT32})
+    assert decode(response) == (set(NODES), set(EDGES))
+
+
+def test_cycle_in_pool(test_client: TestClient, pool):
+    response = post_graph(test_client, ["a", "b", "c", "d"], [("a", "b"), ("b", "c"), ("c", "d"), ("d", "b")])
+
+    assert response.status_code == 422
+    detail = response.json()["detail"][0]
+    assert detail["msg"] == "Graph is not DAG"
+    assert sorted(detail["ctx"]["cycle"]) == ["b", "c", "d"]
+
+
+def test_create_graphs_batch_in_pool(test_client: TestClient, pool):
+    graphs = [
+        {"nodes": [{"name": name} for name in ["a", "b", "c", "d"]],
+         "edges": [{"source": "a\nb", "target": "c"}, {"source": "c", "target": "d"}]},
+        {"nodes": [{"name": "a"}, {"name": "b"}], "edges": [{"source": "a", "target": "b"}]},
+    ]
+
+    response = test_client.post("/api/graphs/batch", json={"graphs": graphs})
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert results[0]["id"] is None
+    assert results[0]["detail"][0]["msg"] == "String should match pattern '^[a-zA-Z]+$'"
+    assert results[0]["detail"][0]["loc"] == ["body", "graphs", "0", "edges", "0", "source"]
+    assert results[1]["detail"] is None
+
+
+@pytest.mark.parametrize("names, edges", [
+    (["a", "b", "c", "d"], [("a\nb", "c"), ("c", "d")]),
+    (["a\nb", "c"], [("a\nb", "c")]),
+    (["a", ""], [("a", "")]),
+])
+def test_pool_agrees_with_inline(monkeypatch, names: list[str], edges: list[tuple[str, str]]):
+    # The pool gets names with any content the same as the inline check.
+    def check() -> tuple:
+        try:
+            graph = asyncio.run(executor.check_named_graph(names, edges))
+        except GraphValidationError as e:
+            return e.message, e.loc
+        return graph.node_names, graph.edges()
+
+    monkeypatch.setattr(executor, "VALIDATION_PROCESSES", 0)
+    inline = check()
+
+    monkeypatch.setattr(executor, "VALIDATION_PROCESSES", 1)
+    monkeypatch.setattr(executor, "VALIDATION_PROCESS_MIN_EDGES", 0)
+    try:
+        assert check() == inline
+    finally:
+        executor.shutdown()
+
+
+def test_small_graph_stays_inline(test_client: TestClient, monkeypatch):
+    monkeypatch.setattr(executor, "VALIDATION_PROCESSES", 1)
+    monkeypatch.setattr(executor, "VALIDATION_PROCESS_MIN_EDGES", 1000)
+
+    assert post_graph(test_client, NODES, EDGES).status_code == 201
+    assert executor.pool is None
+
+
+def test_validation_error_pickles():
+    error = pickle.loads(pickle.dumps(GraphValidationError("Graph is not DAG", ["body", "edges"], {"cycle": ["a"]})))
+
+    assert (error.message, error.loc, error.ctx) == ("Graph is not DAG", ["body", "edges"], {"cycle": ["a"]})
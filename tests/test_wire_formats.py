@@ -0,0 +1,134 @@
+import json
+import struct
+
+import msgpack
+import pytest
+from fastapi.testclient import TestClient
+
+from app import wire
+from tests.test_get_graph import create_test_graph
+
+NODES = ["a", "b", "c", "d"]
+EDGES = [("a", "b"), ("a", "c"), ("b", "d"), ("c", "d")]
+
+
+def columns(nodes: list[str], edges: list[tuple[str, str]]) -> dict:
+    index = {name: i for i, name in enumerate(nodes)}
+    return {
+        "nodes": nodes,
+        "sources": [index[source] for source, _ in edges],
+        "targets": [index[target] for _, target in edges],
+    }
+
+
+def int32_body(nodes: list[str], edges: list[tuple[str, str]]) -> bytes:
+    content = columns(nodes, edges)
+    return (wire.INT32_HEADER.pack(wire.INT32_MAGIC, 0, len(nodes), len(edges))
+            + struct.pack(f"<{len(edges)}i", *content["sources"])
+            + struct.pack(f"<{len(edges)}i", *content["targets"])
+            + "\n".join(nodes).encode("ascii"))
+
+
+def decode(response) -> tuple[set[str], set[tuple[str, str]]]:
+    content_type = response.headers["content-type"]
+
+    if content_type == wire.INT32:
+        _, _, n_nodes, n_edges = wire.INT32_HEADER.unpack_from(response.content)
+        offset = wire.INT32_HEADER.size
+        sources = struct.unpack_from(f"<{n_edges}i", response.content, offset)
+        targets = struct.unpack_from(f"<{n_edges}i", response.content, offset + 4 * n_edges)
+        names = response.content[offset + 8 * n_edges:].decode("ascii").split("\n")
+    else:
+        content = msgpack.unpackb(response.content) if content_type == wire.MSGPACK else response.json()
+        names, sources, targets = content["nodes"], content["sources"], content["targets"]
+
+    return set(names), {(names[s], names[t]) for s, t in zip(sources, targets)}
+
+
+def encode(wire_format: str, nodes: list[str], edges: list[tuple[str, str]]) -> bytes:
+    if wire_format == wire.INT32:
+        return int32_body(nodes, edges)
+    if wire_format == wire.MSGPACK:
+        return msgpack.packb(columns(nodes, edges))
+    return json.dumps(columns(nodes, edges)).encode()
+
+
+@pytest.mark.parametrize("wire_format", [wire.COMPACT_JSON, wire.MSGPACK, wire.INT32])
+def test_read_graph_wire_format(test_client: TestClient, wire_format: str):
+    graph_id = create_test_graph(test_client, NODES, EDGES)
+
+    response = test_client.get(f"/api/graph/{graph_id}/", headers={"Accept": wire_format})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == wire_format
+    assert response.headers["vary"] == "Accept"
+    assert decode(response) == (set(NODES), set(EDGES))
+
+    etag = response.headers["etag"]
+    assert etag != test_client.get(f"/api/graph/{graph_id}/").headers["etag"]
+    response = test_client.get(f"/api/graph/{graph_id}/", headers={"Accept": wire_format, "If-None-Match": etag})
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize("wire_format", [wire.COMPACT_JSON, wire.MSGPACK, wire.INT32])
+def test_create_graph_wire_format(test_client: TestClient, wire_format: str):
+    response = test_client.post("/api/graph/", content=encode(wire_format, NODES, EDGES),
+                                headers={"Content-Type": wire_format})
+
+    assert response.status_code == 201
+    graph_id = response.json()["id"]
+
+    data = test_client.get(f"/api/graph/{graph_id}/").json()
+    assert {node["name"] for node in data["nodes"]} == set(NODES)
+    assert {(edge["source"], edge["target"]) for edge in data["edges"]} == set(EDGES)
+
+
+@pytest.mark.parametrize("wire_format", [wire.COMPACT_JSON, wire.MSGPACK, wire.INT32])
+@pytest.mark.parametrize("nodes, edges, message", [
+    ([], [], "Nodes list cannot be empty"),
+    (["a", "a"], [], "Node a is duplicated in the graph"),
+    (["a", "b1"], [], "String should match pattern '^[a-zA-Z]+$'"),
+    (["a", "b"], [("a", "b"), ("a", "b")], "There are duplicate edges in the graph"),
+    (["a", "b"], [("a", "b"), ("b", "a")], "Graph is not DAG"),
+])
+def test_create_graph_wire_format_invalid(test_client: TestClient, wire_format: str, nodes, edges, message):
+    response = test_client.post("/api/graph/", content=encode(wire_format, nodes, edges),
+                                headers={"Content-Type": wire_format})
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["msg"] == message
+
+
+@pytest.mark.parametrize("wire_format", [wire.COMPACT_JSON, wire.MSGPACK])
+def test_create_graph_wire_format_name_with_newline(test_client: TestClient, wire_format: str):
+    # "$" alone would also match before a trailing newline.
+    response = test_client.post("/api/graph/", content=encode(wire_format, ["a\n", "b"], [("a\n", "b")]),
+                                headers={"Content-Type": wire_format})
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["msg"] == "String should match pattern '^[a-zA-Z]+$'"
+
+
+def test_create_graph_wire_format_bad_indices(test_client: TestClient):
+    body = {"nodes": ["a", "b"], "sources": [0, 1], "targets": [2, 0]}
+    response = test_client.post("/api/graph/", content=json.dumps(body), headers={"Content-Type": wire.COMPACT_JSON})
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "targets"]
+
+    response = test_client.post("/api/graph/", content=b"DAGW", headers={"Content-Type": wire.INT32})
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["msg"] == "Body is shorter than the header"
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, wire.JSON),
+    ("*/*", wire.JSON),
+    ("text/html", wire.JSON),
+    (f"{wire.INT32}", wire.INT32),
+    (f"application/json;q=0.5, {wire.MSGPACK}", wire.MSGPACK),
+    (f"{wire.COMPACT_JSON};q=0.2, application/json", wire.JSON),
+])
+def test_negotiate(accept, expected):
+    assert wire.negotiate(accept) == expected